@@ -0,0 +1,179 @@
+"""
+Response cache for the report endpoints.
+
+Responses are cached as JSON bytes keyed on the warehouse version plus the
+request path and query string. The version lives in marts.warehouse_version
+and is bumped by a dbt on-run-end hook, so one refresh invalidates every
+entry at once; the version itself is re-read at most every
+`version_check_seconds`, so repeated dashboard refreshes do not touch Postgres.
+
+Clients get an ETag derived from the same key and a matching If-None-Match
+is answered with 304 Not Modified. Until the first dbt run creates the
+marker, entries only expire by TTL and no ETag is sent.
+
+The cache is an in-process LRU with a TTL by default; API_CACHE_BACKEND=disk
+shares it between worker processes through diskcache.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from api.database import engine
+from src.config import API_CONFIG
+
+try:
+    import diskcache
+except ImportError:  # optional shared backend
+    diskcache = None
+
+logger = logging.getLogger("api.cache")
+
+
+class LRUCache:
+    """
+    Bounded in-process cache; entries expire `ttl` seconds after they are set
+    """
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = (value, self._clock() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class DiskCache:
+    """
+    diskcache-backed cache shared by every worker process on the host
+    """
+
+    def __init__(self, directory, ttl, size_limit):
+        if diskcache is None:
+            raise ImportError("diskcache is required for API_CACHE_BACKEND=disk (pip install diskcache)")
+        self.ttl = ttl
+        self._cache = diskcache.Cache(str(directory), size_limit=size_limit)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value, expire=self.ttl)
+
+    def clear(self):
+        self._cache.clear()
+
+
+def build_cache():
+    if API_CONFIG["cache_backend"] == "disk":
+        return DiskCache(API_CONFIG["cache_dir"], API_CONFIG["cache_ttl_seconds"], API_CONFIG["cache_disk_bytes"])
+    return LRUCache(API_CONFIG["cache_max_entries"], API_CONFIG["cache_ttl_seconds"])
+
+
+response_cache = build_cache()
+
+
+# --------------------------------------------------
+# Warehouse version
+# --------------------------------------------------
+
+_version = {"value": None, "checked_at": float("-inf"), "warned": False}
+
+
+async def warehouse_version(clock=time.monotonic):
+    """
+    Current marts.warehouse_version, re-read at most every `version_check_seconds`
+    """
+    if clock() - _version["checked_at"] < API_CONFIG["version_check_seconds"]:
+        return _version["value"]
+
+    try:
+        async with engine.connect() as conn:
+            version = (await conn.execute(
+                text("SELECT version FROM marts.warehouse_version WHERE id = 1")
+            )).scalar()
+    except ProgrammingError:
+        # dbt has not run with the on-run-end hook yet; entries then only expire by TTL
+        if not _version["warned"]:
+            logger.warning("marts.warehouse_version is missing; caching by TTL only")
+            _version["warned"] = True
+        version = None
+
+    _version.update(value=version, checked_at=clock())
+    return _version["value"]
+
+
+# --------------------------------------------------
+# Responses
+# --------------------------------------------------
+
+def cache_key(request: Request):
+    params = sorted(request.query_params.multi_items())
+    return f"{request.url.path}?{json.dumps(params)}"
+
+
+def _etag(version, key):
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def _not_modified(request: Request, etag):
+    candidates = request.headers.get("if-none-match", "")
+    return etag in {c.strip().removeprefix("W/") for c in candidates.split(",")} or candidates.strip() == "*"
+
+
+async def cached_response(request: Request, compute, response_type):
+    """
+    Serve `await compute(conn)` through the cache.
+
+    The result is validated against `response_type` once, on a miss; a
+    connection is only taken from the pool when the entry has to be built.
+    """
+    version = await warehouse_version()
+    key = f"v{version}:{cache_key(request)}"
+    headers = {"Cache-Control": API_CONFIG["cache_control"]}
+
+    # Without a version marker nothing says when data changed, so no revalidation
+    if version is not None:
+        headers["ETag"] = _etag(version, key)
+        if _not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key)
+    if body is None:
+        async with engine.connect() as conn:
+            data = await compute(conn)
+        validated = TypeAdapter(response_type).validate_python(data)
+        body = json.dumps(jsonable_encoder(validated)).encode("utf-8")
+        response_cache.set(key, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
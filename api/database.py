@@ -1,18 +1,41 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from src.config import DATABASE_CONFIG
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.config import API_CONFIG, DATABASE_CONFIG
 
 DATABASE_URL = (
-    f"postgresql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}"
+    f"postgresql+psycopg://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}"
     f"@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['dbname']}"
 )
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+def _connect_args(statement_timeout_ms):
+    return {
+        "options": f"-c statement_timeout={statement_timeout_ms}",
+        # psycopg prepares the fixed report queries server-side and caches them per connection
+        "prepare_threshold": None if API_CONFIG["prepare_threshold"] < 0 else API_CONFIG["prepare_threshold"],
+    }
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# One pool for the whole app; every request borrows a connection for its single query
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=API_CONFIG["pool_size"],
+    max_overflow=API_CONFIG["max_overflow"],
+    pool_timeout=API_CONFIG["pool_timeout"],
+    pool_recycle=API_CONFIG["pool_recycle"],
+    pool_pre_ping=API_CONFIG["pool_pre_ping"],
+    connect_args=_connect_args(API_CONFIG["statement_timeout_ms"]),
+)
+
+# Bulk exports hold a connection for the whole download, so they get their own
+# small pool; its size caps concurrent exports and they never starve the reports
+export_engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=API_CONFIG["export_connections"],
+    max_overflow=0,
+    pool_timeout=API_CONFIG["export_pool_timeout"],
+    pool_recycle=API_CONFIG["pool_recycle"],
+    pool_pre_ping=API_CONFIG["pool_pre_ping"],
+    connect_args=_connect_args(API_CONFIG["export_statement_timeout_ms"]),
+)
+
+async def get_db():
+    async with engine.connect() as conn:
+        yield conn
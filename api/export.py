@@ -0,0 +1,201 @@
+"""
+Streaming bulk export of warehouse rows.
+
+Rows are read through a server-side cursor (`AsyncConnection.stream` with
+`yield_per`), so at most one fetch of `export_fetch_rows` rows is held in
+memory per export however large the result is.
+
+Backpressure comes from the ASGI server: `send` only returns once the client
+has taken the previous chunk, so the cursor is only advanced as fast as the
+client reads. A client that stalls for longer than `export_send_timeout` on a
+single chunk has its export aborted and the connection returned to the pool.
+`idle_in_transaction_session_timeout` is a server-side backstop in case the
+process itself hangs with the cursor open.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import text
+from starlette.responses import StreamingResponse
+
+from src.config import API_CONFIG
+
+logger = logging.getLogger("api.export")
+
+DATASETS = {
+    "messages": {
+        "table": "marts.fct_messages",
+        "columns": (
+            "message_id",
+            "channel_key",
+            "date_key",
+            "message_date",
+            "message_text",
+            "view_count",
+            "forward_count",
+            "has_image",
+        ),
+        # served by the (message_date, message_id, channel_key) index
+        "order_by": "f.message_date, f.message_id",
+    },
+    "detections": {
+        "table": "marts.fct_image_detections",
+        "columns": (
+            "message_id",
+            "channel_key",
+            "date_key",
+            "detected_class",
+            "confidence_score",
+            "image_category",
+            "model_version",
+            "reused_from",
+        ),
+        "order_by": None,
+    },
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _date_key(day):
+    return int(day.strftime("%Y%m%d"))
+
+
+def build_export_query(dataset, channel_key=None, date_from=None, date_to=None, category=None):
+    """
+    (sql, params) selecting the dataset's columns with the given filters
+    """
+    spec = DATASETS[dataset]
+    filters, params = [], {}
+
+    if channel_key is not None:
+        filters.append("f.channel_key = :channel_key")
+        params["channel_key"] = channel_key
+
+    if dataset == "messages":
+        if date_from is not None:
+            filters.append("f.message_date >= :date_from")
+            params["date_from"] = datetime.combine(date_from, datetime.min.time())
+        if date_to is not None:
+            filters.append("f.message_date < :date_to")
+            params["date_to"] = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+        if category is not None:
+            # messages with at least one image of that category
+            filters.append(
+                "EXISTS (SELECT 1 FROM marts.fct_image_detections d "
+                "WHERE d.channel_key = f.channel_key AND d.message_id = f.message_id "
+                "AND d.image_category = :category)"
+            )
+            params["category"] = category
+    else:
+        if date_from is not None:
+            filters.append("f.date_key >= :date_from")
+            params["date_from"] = _date_key(date_from)
+        if date_to is not None:
+            filters.append("f.date_key <= :date_to")
+            params["date_to"] = _date_key(date_to)
+        if category is not None:
+            filters.append("f.image_category = :category")
+            params["category"] = category
+
+    sql = f"SELECT {', '.join(f'f.{c}' for c in spec['columns'])} FROM {spec['table']} f"
+    if filters:
+        sql += f" WHERE {' AND '.join(filters)}"
+    if spec["order_by"]:
+        sql += f" ORDER BY {spec['order_by']}"
+    return text(sql), params
+
+
+# --------------------------------------------------
+# Encoding
+# --------------------------------------------------
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_rows(fmt, columns, rows):
+    """
+    One chunk of NDJSON lines or CSV records
+    """
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [v.isoformat() if isinstance(v, (datetime, date)) else v for v in row] for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+# --------------------------------------------------
+# Streaming
+# --------------------------------------------------
+
+async def stream_rows(conn, sql, params, fmt, columns):
+    async with conn.begin():
+        idle_ms = int(API_CONFIG["export_send_timeout"] * 2000)
+        await conn.execute(text(f"SET LOCAL idle_in_transaction_session_timeout = {idle_ms}"))
+
+        fetch_rows = API_CONFIG["export_fetch_rows"]
+        result = await conn.stream(sql, params, execution_options={"yield_per": fetch_rows})
+        if fmt == "csv":
+            yield encode_rows(fmt, columns, [columns])
+        async for rows in result.partitions(fetch_rows):
+            yield encode_rows(fmt, columns, rows)
+
+
+class ExportResponse(StreamingResponse):
+    """
+    StreamingResponse that owns its database connection and gives up on
+    clients that stop reading.
+    """
+
+    def __init__(self, content, conn, send_timeout, **kwargs):
+        super().__init__(content, **kwargs)
+        self.conn = conn
+        self.send_timeout = send_timeout
+
+    async def stream_response(self, send):
+        async def send_with_timeout(message):
+            await asyncio.wait_for(send(message), self.send_timeout)
+
+        try:
+            await super().stream_response(send_with_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Export aborted: client did not read a chunk within {self.send_timeout}s")
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # closes the server-side cursor even if the stream never finished
+            await self.body_iterator.aclose()
+            await self.conn.close()
+
+
+def export_response(conn, dataset, fmt, sql, params):
+    columns = DATASETS[dataset]["columns"]
+    return ExportResponse(
+        stream_rows(conn, sql, params, fmt, columns),
+        conn=conn,
+        send_timeout=API_CONFIG["export_send_timeout"],
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'},
+    )
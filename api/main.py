@@ -1,18 +1,41 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import logging
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy import text
 
-from api.database import get_db
-from api import schemas
+from api.cache import cached_response
+from api.database import engine, export_engine, get_db
+from api import export, schemas, search
+from src.config import API_CONFIG
+
+logger = logging.getLogger("api")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await engine.dispose()
+    await export_engine.dispose()
 
 app = FastAPI(
     title="Medical Telegram Analytics API",
     description="Analytical API exposing insights from the Medical Telegram Data Warehouse",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(SQLAlchemyError)
+async def database_error_handler(request: Request, exc: SQLAlchemyError):
+    logger.error(f"Database error on {request.url.path}: {exc}")
+    return JSONResponse(status_code=500, content={"detail": "Database error"})
+
 @app.get("/")
-def root():
+async def root():
     return {"message": "Welcome to the Medical Telegram Analytics API. Visit /docs for API documentation."}
 
 @app.get(
@@ -20,93 +43,164 @@ def root():
     response_model=list[schemas.TopProduct],
     summary="Top mentioned products across all channels"
 )
-def top_products(limit: int = Query(10, ge=1), db: Session = Depends(get_db)):
+async def top_products(request: Request, limit: int = Query(10, ge=1)):
+    # Pre-aggregated by dbt; the top N come straight off the frequency index
     query = text("""
-        SELECT term, COUNT(*) AS frequency
-        FROM marts.fct_message_terms
-        GROUP BY term
-        ORDER BY frequency DESC
+        SELECT term, frequency
+        FROM marts.agg_term_frequency
+        ORDER BY frequency DESC, term
         LIMIT :limit
     """)
 
-    results = db.execute(query, {"limit": limit}).fetchall()
-    return [{"term": r.term, "frequency": r.frequency} for r in results]
+    async def compute(db: AsyncConnection):
+        results = (await db.execute(query, {"limit": limit})).fetchall()
+        return [{"term": r.term, "frequency": r.frequency} for r in results]
+
+    return await cached_response(request, compute, list[schemas.TopProduct])
 @app.get(
     "/api/channels/{channel_key}/activity",
     response_model=list[schemas.ChannelActivity],
     summary="Posting activity over time for a channel"
 )
-def channel_activity(channel_key: str, db: Session = Depends(get_db)):
-    query = text("""
-        SELECT d.date, COUNT(*) AS message_count
-        FROM marts.fct_messages f
-        JOIN marts.dim_date d ON f.date_key = d.date_key
-        WHERE f.channel_key = :channel_key
-        GROUP BY d.date
-        ORDER BY d.date
+async def channel_activity(
+    request: Request,
+    channel_key: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    channel_query = text("SELECT channel_name FROM marts.dim_channels WHERE channel_key = :channel_key")
+
+    filters, params = ["channel_name = :channel_name"], {}
+    if date_from is not None:
+        filters.append("activity_date >= :date_from")
+        params["date_from"] = date_from
+    if date_to is not None:
+        filters.append("activity_date <= :date_to")
+        params["date_to"] = date_to
+
+    # Daily rollup maintained by dbt, so the cost is one row per day
+    query = text(f"""
+        SELECT activity_date, message_count, view_count, forward_count
+        FROM marts.agg_channel_daily_activity
+        WHERE {" AND ".join(filters)}
+        ORDER BY activity_date
     """)
 
-    results = db.execute(query, {"channel_key": channel_key}).fetchall()
+    async def compute(db: AsyncConnection):
+        channel_name = (await db.execute(channel_query, {"channel_key": channel_key})).scalar()
+
+        if channel_name is None:
+            raise HTTPException(status_code=404, detail="Channel not found")
 
-    if not results:
-        raise HTTPException(status_code=404, detail="Channel not found")
+        results = (await db.execute(query, {"channel_name": channel_name, **params})).fetchall()
 
-    return [{"date": r.date, "message_count": r.message_count} for r in results]
+        return [
+            {
+                "date": r.activity_date,
+                "message_count": r.message_count,
+                "view_count": r.view_count,
+                "forward_count": r.forward_count
+            }
+            for r in results
+        ]
+
+    return await cached_response(request, compute, list[schemas.ChannelActivity])
 @app.get(
     "/api/search/messages",
-    response_model=list[schemas.MessageSearchResult],
+    response_model=schemas.MessageSearchPage,
     summary="Search messages by keyword"
 )
-def search_messages(
-    query: str,
-    limit: int = Query(20, ge=1),
-    db: Session = Depends(get_db)
+async def search_messages(
+    query: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=API_CONFIG["search_max_limit"]),
+    sort: Literal["relevance", "recent"] = "relevance",
+    channel_key: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    db: AsyncConnection = Depends(get_db)
 ):
-    sql = text("""
-        SELECT message_id, channel_key, message_text, message_date
-        FROM marts.fct_messages
-        WHERE message_text ILIKE :pattern
-        ORDER BY message_date DESC
-        LIMIT :limit
-    """)
+    try:
+        after = search.decode_cursor(cursor, sort) if cursor else None
+    except search.InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    results = db.execute(
-        sql,
-        {"pattern": f"%{query}%", "limit": limit}
-    ).fetchall()
-
-    return [
-        {
-            "message_id": r.message_id,
-            "channel_key": r.channel_key,
-            "message_text": r.message_text,
-            "date": r.message_date
-        }
-        for r in results
-    ]
+    sql, params = search.build_search_query(
+        query.strip(), limit, sort=sort, channel_key=channel_key,
+        date_from=date_from, date_to=date_to, after=after
+    )
+    rows = (await db.execute(sql, params)).fetchall()
+    items, next_cursor = search.page(rows, limit, sort)
+
+    return {
+        "results": [
+            {
+                "message_id": r["message_id"],
+                "channel_key": r["channel_key"],
+                "message_text": r["message_text"],
+                "date": r["message_date"],
+                "rank": r["rank"]
+            }
+            for r in items
+        ],
+        "next_cursor": next_cursor
+    }
 @app.get(
     "/api/reports/visual-content",
     response_model=list[schemas.VisualContentStat],
     summary="Image usage statistics across channels"
 )
-def visual_content_stats(db: Session = Depends(get_db)):
+async def visual_content_stats(request: Request):
+    # Sums the per-day image rollup instead of scanning every detection row
     query = text("""
         SELECT
-            channel_key,
-            COUNT(*) AS image_count,
-            COUNT(*) FILTER (WHERE image_category = 'promotional') AS promotional_count
-        FROM marts.fct_image_detections
-        GROUP BY channel_key
+            c.channel_key,
+            SUM(a.image_count)::BIGINT AS image_count,
+            SUM(a.promotional_count)::BIGINT AS promotional_count
+        FROM marts.agg_channel_daily_images a
+        JOIN marts.dim_channels c
+          ON a.channel_name = c.channel_name
+        GROUP BY c.channel_key
         ORDER BY image_count DESC
     """)
 
-    results = db.execute(query).fetchall()
+    async def compute(db: AsyncConnection):
+        results = (await db.execute(query)).fetchall()
+
+        return [
+            {
+                "channel_key": r.channel_key,
+                "image_count": r.image_count,
+                "promotional_count": r.promotional_count
+            }
+            for r in results
+        ]
+
+    return await cached_response(request, compute, list[schemas.VisualContentStat])
+@app.get(
+    "/api/export/{dataset}",
+    summary="Stream message or detection rows as NDJSON or CSV"
+)
+async def export_rows(
+    dataset: Literal["messages", "detections"],
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    channel_key: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    category: Optional[str] = None
+):
+    sql, params = export.build_export_query(
+        dataset, channel_key=channel_key, date_from=date_from, date_to=date_to, category=category
+    )
+
+    # The export pool is small on purpose; a full pool means too many downloads at once
+    try:
+        conn = await export_engine.connect()
+    except PoolTimeout:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent exports, retry shortly",
+            headers={"Retry-After": "5"}
+        )
 
-    return [
-        {
-            "channel_key": r.channel_key,
-            "image_count": r.image_count,
-            "promotional_count": r.promotional_count
-        }
-        for r in results
-    ]
+    return export.export_response(conn, dataset, fmt, sql, params)
@@ -1,21 +1,30 @@
+from datetime import date, datetime
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class TopProduct(BaseModel):
     term: str
     frequency: int
 
 class ChannelActivity(BaseModel):
-    date: str
+    date: date
     message_count: int
+    view_count: int
+    forward_count: int
 
 class MessageSearchResult(BaseModel):
     message_id: int
-    channel_key: str
+    channel_key: int
     message_text: str
-    date: str
+    date: datetime
+    rank: Optional[float] = None
+
+class MessageSearchPage(BaseModel):
+    results: List[MessageSearchResult]
+    # Pass back as `cursor` for the next page; null on the last page
+    next_cursor: Optional[str] = None
 
 class VisualContentStat(BaseModel):
-    channel_key: str
+    channel_key: int
     image_count: int
     promotional_count: int
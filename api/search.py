@@ -0,0 +1,158 @@
+"""
+Message search over marts.fct_messages.
+
+Matching uses two GIN indexes that dbt builds on the table (see
+models/marts/fct_messages.sql):
+
+* message_tsv @@ websearch_to_tsquery('simple', query)   whole words
+* message_text ILIKE '%query%' via pg_trgm                substrings
+
+The 'simple' text search configuration only lowercases and splits on
+whitespace/punctuation. Postgres has no Amharic stemmer, so this keeps Ge'ez
+words intact, and trigrams still catch partial words and affixed forms.
+
+Relevance ordering puts whole-word matches first and orders each group by
+ts_rank_cd plus trigram word similarity, so a substring-only hit never
+outranks a whole-word one.
+
+Results are paged with an opaque keyset cursor, the sort key of the last row
+returned, instead of OFFSET. Each page then costs the same however deep the
+client pages. message_id is only unique within a channel, so the key ends
+with (message_id, channel_key).
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from src.config import API_CONFIG
+
+SORTS = ("relevance", "recent")
+
+# Trigrams need at least three characters to narrow the index scan
+MIN_SUBSTRING_LENGTH = 3
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Keyset columns per sort, compared as one row in descending order
+SORT_KEYS = {
+    "relevance": ("word_hit", "rank", "message_id", "channel_key"),
+    "recent": ("message_date", "message_id", "channel_key"),
+}
+
+
+def encode_cursor(sort, row):
+    key = [row[c] for c in SORT_KEYS[sort]]
+    if sort == "recent":
+        key[0] = key[0].isoformat()
+    payload = json.dumps([sort, *key]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """
+    Sort key of the last row, as a tuple in SORT_KEYS[sort] order, encoded in `cursor`
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, *key = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort == sort == "relevance":
+            word_hit, rank, message_id, channel_key = key
+            if not isinstance(word_hit, bool):
+                raise TypeError("word_hit must be a boolean")
+            key = (word_hit, float(rank), int(message_id), int(channel_key))
+        elif cursor_sort == sort:
+            message_date, message_id, channel_key = key
+            key = (datetime.fromisoformat(message_date), int(message_id), int(channel_key))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+
+    if cursor_sort != sort:
+        raise InvalidCursor(f"Cursor was issued for sort={cursor_sort}")
+    return key
+
+
+def _like_pattern(query):
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def build_search_query(query, limit, sort="relevance", channel_key=None,
+                       date_from=None, date_to=None, after=None):
+    """
+    (sql, params) for one page of matches; fetches `limit + 1` rows so the
+    caller can tell whether another page exists.
+    """
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort: {sort}")
+
+    params = {"query": query, "limit": limit + 1, "text_config": API_CONFIG["search_text_config"]}
+
+    match = "f.message_tsv @@ q.tsq"
+    if len(query) >= MIN_SUBSTRING_LENGTH:
+        match = f"({match} OR f.message_text ILIKE :pattern)"
+        params["pattern"] = _like_pattern(query)
+
+    filters = [match]
+    if channel_key is not None:
+        filters.append("f.channel_key = :channel_key")
+        params["channel_key"] = channel_key
+    if date_from is not None:
+        filters.append("f.message_date >= :date_from")
+        params["date_from"] = datetime.combine(date_from, datetime.min.time())
+    if date_to is not None:
+        # inclusive end date
+        filters.append("f.message_date < :date_to")
+        params["date_to"] = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+
+    if sort == "relevance":
+        # within the whole-word and substring-only groups, by text rank plus trigram closeness
+        rank = "ts_rank_cd(f.message_tsv, q.tsq) + word_similarity(:query, f.message_text)"
+    else:
+        rank = "NULL"
+
+    sort_keys = SORT_KEYS[sort]
+    keyset = ""
+    if after is not None:
+        keyset = (
+            f"WHERE ({', '.join(f'm.{c}' for c in sort_keys)}) "
+            f"< ({', '.join(f':after_{c}' for c in sort_keys)})"
+        )
+        params.update((f"after_{c}", value) for c, value in zip(sort_keys, after))
+
+    sql = f"""
+        WITH q AS (
+            SELECT websearch_to_tsquery(CAST(:text_config AS regconfig), :query) AS tsq
+        )
+        SELECT m.*
+        FROM (
+            SELECT
+                f.message_id,
+                f.channel_key,
+                f.message_text,
+                f.message_date,
+                COALESCE(f.message_tsv @@ q.tsq, false) AS word_hit,
+                ({rank})::float8 AS rank
+            FROM marts.fct_messages f, q
+            WHERE {" AND ".join(filters)}
+        ) m
+        {keyset}
+        ORDER BY {", ".join(f"m.{c} DESC" for c in sort_keys)}
+        LIMIT :limit
+    """
+    return text(sql), params
+
+
+def page(rows, limit, sort):
+    """
+    (items, next_cursor) from the `limit + 1` rows of a page query
+    """
+    items = [dict(r._mapping) for r in rows[:limit]]
+    next_cursor = encode_cursor(sort, items[-1]) if len(rows) > limit else None
+    return items, next_cursor
@@ -0,0 +1,21 @@
+{#
+    Bump marts.warehouse_version after a run that built at least one model.
+    The API keys its response cache and ETags on this version, so every cached
+    report is invalidated together when the warehouse is refreshed.
+#}
+{% macro bump_warehouse_version(results) %}
+    {% if execute and flags.WHICH in ('run', 'build')
+          and results | selectattr('status', 'equalto', 'success') | list | length > 0 %}
+        CREATE SCHEMA IF NOT EXISTS marts;
+        CREATE TABLE IF NOT EXISTS marts.warehouse_version (
+            id INT PRIMARY KEY,
+            version BIGINT NOT NULL,
+            refreshed_at TIMESTAMPTZ NOT NULL
+        );
+        INSERT INTO marts.warehouse_version (id, version, refreshed_at)
+        VALUES (1, 1, now())
+        ON CONFLICT (id) DO UPDATE SET
+            version = marts.warehouse_version.version + 1,
+            refreshed_at = now();
+    {% endif %}
+{% endmacro %}
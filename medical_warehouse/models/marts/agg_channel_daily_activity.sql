@@ -0,0 +1,62 @@
+{#
+    One row per channel and day, served by /api/channels/{channel_key}/activity.
+    Keyed on channel_name because dim_channels renumbers channel_key on rebuild.
+    The loader stamps loaded_at on every upsert, so incremental runs rebuild
+    each channel/day with messages (re)loaded since the last run: refreshed
+    views, a new channel's first scrape and retried older days alike.
+#}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_name', 'activity_date'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['channel_name', 'activity_date'], 'unique': True},
+        ]
+    )
+}}
+
+WITH messages AS (
+
+    SELECT
+        c.channel_name,
+        DATE(f.message_date) AS activity_date,
+        f.view_count,
+        f.forward_count,
+        f.has_image,
+        f.loaded_at
+    FROM {{ ref('fct_messages') }} f
+    JOIN {{ ref('dim_channels') }} c
+      ON f.channel_key = c.channel_key
+
+)
+
+{% if is_incremental() %}
+, touched AS (
+
+    SELECT DISTINCT channel_name, activity_date
+    FROM messages
+    WHERE loaded_at > (
+        SELECT COALESCE(MAX(last_loaded_at), '-infinity'::TIMESTAMPTZ) - INTERVAL '{{ var("rollup_load_overlap") }}'
+        FROM {{ this }}
+    )
+
+)
+{% endif %}
+
+SELECT
+    m.channel_name,
+    m.activity_date,
+    COUNT(*) AS message_count,
+    SUM(m.view_count) AS view_count,
+    SUM(m.forward_count) AS forward_count,
+    COUNT(*) FILTER (WHERE m.has_image) AS image_message_count,
+    MAX(m.loaded_at) AS last_loaded_at
+FROM messages m
+{% if is_incremental() %}
+JOIN touched t
+  ON m.channel_name = t.channel_name
+ AND m.activity_date = t.activity_date
+{% endif %}
+GROUP BY m.channel_name, m.activity_date
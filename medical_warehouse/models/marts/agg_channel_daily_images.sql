@@ -0,0 +1,94 @@
+{#
+    Images (not detection rows) per channel, day and image category, served by
+    /api/reports/visual-content. Detections arrive whenever the detector runs,
+    often long after the message, so incremental runs rebuild every
+    channel/day that received detections since the last run (by detected_at)
+    or lost them (raw.yolo_detection_deletions, by deleted_at). A day left
+    without detections gets a zero row so delete+insert overwrites it.
+#}
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['channel_name', 'activity_date'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['channel_name', 'activity_date'], 'unique': True},
+        ]
+    )
+}}
+
+WITH detections AS (
+
+    SELECT
+        c.channel_name,
+        d.full_date AS activity_date,
+        f.message_id,
+        f.image_category,
+        f.detected_at
+    FROM {{ ref('fct_image_detections') }} f
+    JOIN {{ ref('dim_channels') }} c
+      ON f.channel_key = c.channel_key
+    JOIN {{ ref('dim_dates') }} d
+      ON f.date_key = d.date_key
+
+),
+
+deletions AS (
+
+    SELECT
+        c.channel_name,
+        DATE(m.message_date) AS activity_date,
+        MAX(x.deleted_at) AS deleted_at
+    FROM {{ ref('stg_yolo_detection_deletions') }} x
+    JOIN {{ ref('dim_channels') }} c
+      ON x.channel_name = c.channel_name
+    JOIN {{ ref('fct_messages') }} m
+      ON m.channel_key = c.channel_key
+     AND m.message_id = x.message_id
+    GROUP BY c.channel_name, DATE(m.message_date)
+
+),
+
+touched AS (
+
+    SELECT channel_name, activity_date
+    FROM detections
+    {% if is_incremental() %}
+    WHERE detected_at > (
+        SELECT COALESCE(MAX(last_detected_at), '-infinity'::TIMESTAMPTZ)
+        FROM {{ this }}
+    )
+    {% endif %}
+
+    UNION
+
+    SELECT channel_name, activity_date
+    FROM deletions
+    {% if is_incremental() %}
+    WHERE deleted_at > (
+        SELECT COALESCE(MAX(last_deleted_at), '-infinity'::TIMESTAMPTZ)
+        FROM {{ this }}
+    )
+    {% endif %}
+
+)
+
+SELECT
+    t.channel_name,
+    t.activity_date,
+    COUNT(DISTINCT d.message_id) AS image_count,
+    COUNT(DISTINCT d.message_id) FILTER (WHERE d.image_category = 'promotional') AS promotional_count,
+    COUNT(DISTINCT d.message_id) FILTER (WHERE d.image_category = 'product_display') AS product_display_count,
+    COUNT(DISTINCT d.message_id) FILTER (WHERE d.image_category = 'lifestyle') AS lifestyle_count,
+    COUNT(DISTINCT d.message_id) FILTER (WHERE d.image_category = 'other') AS other_count,
+    MAX(d.detected_at) AS last_detected_at,
+    x.deleted_at AS last_deleted_at
+FROM touched t
+LEFT JOIN detections d
+  ON d.channel_name = t.channel_name
+ AND d.activity_date = t.activity_date
+LEFT JOIN deletions x
+  ON x.channel_name = t.channel_name
+ AND x.activity_date = t.activity_date
+GROUP BY t.channel_name, t.activity_date, x.deleted_at
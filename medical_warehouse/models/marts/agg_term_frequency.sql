@@ -0,0 +1,22 @@
+{#
+    Pre-aggregated term frequencies for /api/reports/top-products, which reads
+    the top N straight off the (frequency DESC, term) index.
+#}
+{{
+    config(
+        materialized='table',
+        indexes=[
+            {'columns': ['term'], 'unique': True},
+            {'columns': ['frequency DESC', 'term']},
+        ]
+    )
+}}
+
+SELECT
+    term,
+    COUNT(*) AS frequency,
+    SUM(mention_count) AS mention_count,
+    COUNT(DISTINCT channel_key) AS channel_count,
+    MAX(date_key) AS last_date_key
+FROM {{ ref('fct_message_terms') }}
+GROUP BY term
@@ -2,30 +2,43 @@ with detections as (
 
     select
         message_id,
+        channel_name,
+        model_version,
         detected_class,
         confidence_score,
-        image_category
+        image_category,
+        reused_from,
+        detected_at
     from {{ ref('stg_yolo_detections') }}
 
 ),
 
 messages as (
 
+    -- Telegram numbers messages per channel, so message_id is only unique with the channel
     select
-        message_id,
-        channel_key,
-        date_key
-    from {{ ref('fct_messages') }}
+        c.channel_name,
+        f.message_id,
+        f.channel_key,
+        f.date_key
+    from {{ ref('fct_messages') }} f
+    join {{ ref('dim_channels') }} c
+      on f.channel_key = c.channel_key
 
 )
 
 select
     d.message_id,
+    d.channel_name,
     m.channel_key,
     m.date_key,
     d.detected_class,
     d.confidence_score,
-    d.image_category
+    d.image_category,
+    d.model_version,
+    d.reused_from,
+    d.detected_at
 from detections d
 join messages m
-  on d.message_id = m.message_id
+  on d.channel_name = m.channel_name
+ and d.message_id = m.message_id
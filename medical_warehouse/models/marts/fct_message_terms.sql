@@ -0,0 +1,27 @@
+{#
+    One row per message and canonical product term, written to
+    raw.message_terms by src/extract_terms.py (only new messages are tokenized).
+#}
+{{
+    config(
+        materialized='table',
+        indexes=[
+            {'columns': ['term']},
+            {'columns': ['channel_key', 'message_id']},
+        ]
+    )
+}}
+
+SELECT
+    f.message_id,
+    f.channel_key,
+    f.date_key,
+    t.term,
+    t.mention_count,
+    t.lexicon_version
+FROM {{ ref('stg_message_terms') }} t
+JOIN {{ ref('dim_channels') }} c
+  ON t.channel_name = c.channel_name
+JOIN {{ ref('fct_messages') }} f
+  ON f.channel_key = c.channel_key
+ AND f.message_id = t.message_id
@@ -1,12 +1,35 @@
+{#
+    Materialized as a table so the search indexes survive between queries:
+    a tsvector GIN index for whole-word matches and a pg_trgm GIN index for
+    substring (ILIKE) matches, plus btree keys for keyset pagination.
+    The text search config must match SEARCH_TEXT_CONFIG in the API.
+#}
+{{
+    config(
+        materialized='table',
+        pre_hook="CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        indexes=[
+            {'columns': ['message_tsv'], 'type': 'gin'},
+            {'columns': ['message_text gin_trgm_ops'], 'type': 'gin'},
+            {'columns': ['message_date', 'message_id', 'channel_key']},
+            {'columns': ['channel_key', 'message_date', 'message_id']},
+        ],
+        post_hook="ANALYZE {{ this }}"
+    )
+}}
+
 SELECT
     s.message_id,
     c.channel_key,
     d.date_key,
+    s.message_date,
     s.message_text,
     s.message_length,
     s.view_count,
     s.forward_count,
-    s.has_image
+    s.has_image,
+    s.loaded_at,
+    TO_TSVECTOR('{{ var("search_text_config") }}', s.message_text) AS message_tsv
 FROM {{ ref('stg_telegram_messages') }} s
 JOIN {{ ref('dim_channels') }} c
   ON s.channel_name = c.channel_name
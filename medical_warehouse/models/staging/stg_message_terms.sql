@@ -0,0 +1,12 @@
+WITH source AS (
+    SELECT * FROM raw.message_terms
+)
+
+SELECT
+    channel_name,
+    CAST(message_id AS BIGINT) AS message_id,
+    term,
+    mention_count,
+    lexicon_version,
+    extracted_at
+FROM source
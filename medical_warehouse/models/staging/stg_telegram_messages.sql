@@ -11,6 +11,7 @@ SELECT
     COALESCE(views, 0) AS view_count,
     COALESCE(forwards, 0) AS forward_count,
     has_media AS has_image,
-    image_path
+    image_path,
+    loaded_at
 FROM source
 WHERE message_text IS NOT NULL
@@ -0,0 +1,10 @@
+WITH source AS (
+    SELECT * FROM raw.yolo_detection_deletions
+)
+
+SELECT
+    CAST(message_id AS BIGINT) AS message_id,
+    channel_name,
+    image_hash,
+    deleted_at
+FROM source
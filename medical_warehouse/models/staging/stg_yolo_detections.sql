@@ -0,0 +1,15 @@
+WITH source AS (
+    SELECT * FROM raw.yolo_detections
+)
+
+SELECT
+    CAST(message_id AS BIGINT) AS message_id,
+    channel_name,
+    image_hash,
+    model_version,
+    detected_class,
+    CAST(confidence_score AS NUMERIC(6, 4)) AS confidence_score,
+    image_category,
+    reused_from,
+    detected_at
+FROM source
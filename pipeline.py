@@ -48,7 +48,7 @@ def load_raw_to_postgres():
 
     try:
         result = subprocess.run(
-            [sys.executable, "src/load_raw_to_postgres.py"],
+            [sys.executable, "scripts/load_raw_to_postgres.py", "--mode", "incremental"],
             check=True,
             capture_output=True,
             text=True
@@ -61,6 +61,26 @@ def load_raw_to_postgres():
         raise Failure("Raw data load failed")
 
 
+@op
+def extract_product_terms():
+    logger = get_dagster_logger()
+    logger.info("Extracting product terms from new messages")
+
+    try:
+        result = subprocess.run(
+            [sys.executable, "src/extract_terms.py"],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        logger.info(result.stdout)
+        return "Product terms extracted"
+
+    except subprocess.CalledProcessError as e:
+        logger.error(e.stderr)
+        raise Failure("Product term extraction failed")
+
+
 @op
 def run_dbt_transformations():
     logger = get_dagster_logger()
@@ -109,6 +129,7 @@ def run_yolo_enrichment():
 def medical_telegram_pipeline():
     scrape_telegram_data()
     load_raw_to_postgres()
+    extract_product_terms()
     run_dbt_transformations()
     run_yolo_enrichment()
 
@@ -0,0 +1,144 @@
+"""
+YOLO detector backend and scaling benchmark
+
+For each backend, measures median single-image latency, then runs
+run_yolo_pipeline over a set of images once per worker count with an empty
+detection cache, so every image is inferred, and reports images/sec.
+Without --images, copies of the ultralytics sample images are used (made
+byte-unique so they are not de-duplicated). The copies are pixel-identical,
+so near-duplicate reuse is off unless --near-duplicates is given; otherwise
+nearly every image would reuse detections instead of being inferred. Output
+goes to a temporary directory; nothing is written to Postgres.
+
+Example:
+    python scripts/benchmark_detector.py --count 512 --workers 1 2 4 8 16
+    python scripts/benchmark_detector.py --backends torch onnx openvino --workers 1 4
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Project imports
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config import DATA_PATHS, YOLO_CONFIG
+from src.yolo import detector
+from src.yolo.backends import BACKENDS, ensure_exported, load_model
+from src.yolo.batching import load_letterboxed
+from src.yolo.cache import DetectionCache
+from src.yolo.detector import run_yolo_pipeline
+
+
+class CountingSink:
+    def __init__(self):
+        self.images = 0
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def write(self, image_hash, rows):
+        self.images += 1
+        self.rows += len(rows)
+
+
+def _synthetic_images(image_root: Path, count: int):
+    from ultralytics.utils import ASSETS
+
+    samples = sorted(ASSETS.glob("*.jpg"))
+    rng = random.Random(0)
+    target = image_root / "SYN"
+    target.mkdir(parents=True)
+
+    for i in range(count):
+        data = samples[i % len(samples)].read_bytes()
+        # Bytes after the JPEG end marker are ignored by decoders but change the hash
+        (target / f"{i}.jpg").write_bytes(data + rng.randbytes(16))
+
+
+def _latency_ms(backend, image_path, runs):
+    """
+    Median single-image latency after warm-up
+    """
+    model = load_model(backend)
+    image = load_letterboxed(image_path)
+    timings = []
+    for i in range(runs + 3):
+        started = time.perf_counter()
+        model(image, imgsz=YOLO_CONFIG["imgsz"], verbose=False)
+        if i >= 3:
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_benchmark(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        DATA_PATHS["image_blobs"] = tmp / "image_store" / "blobs"
+        DATA_PATHS["image_index"] = tmp / "image_store" / "index.sqlite"
+        YOLO_CONFIG["near_duplicates"] = args.near_duplicates
+
+        if args.images:
+            image_root = Path(args.images)
+        else:
+            image_root = tmp / "images"
+            _synthetic_images(image_root, args.count)
+        first_image = next(image_root.rglob("*.jpg"))
+
+        print(f"{'backend':>10}{'latency ms':>12}{'workers':>8}{'threads':>9}{'images':>8}{'seconds':>10}{'images/s':>10}")
+        for backend in args.backends:
+            YOLO_CONFIG["backend"] = backend
+            YOLO_CONFIG["int8"] = args.int8
+            ensure_exported(backend)
+            latency = _latency_ms(backend, first_image, args.latency_runs)
+
+            for workers in args.workers:
+                threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+                cache_path = tmp / f"cache-{backend}-{workers}.sqlite"
+                sink = CountingSink()
+
+                started = time.perf_counter()
+                run_yolo_pipeline(
+                    image_root,
+                    sink=sink,
+                    batch_size=args.batch_size,
+                    cache=DetectionCache(cache_path),
+                    workers=workers,
+                    threads=threads,
+                )
+                elapsed = time.perf_counter() - started
+
+                print(
+                    f"{backend:>10}{latency:>12.1f}{workers:>8}{threads:>9}{sink.images:>8}"
+                    f"{elapsed:>10.2f}{sink.images / elapsed:>10.1f}"
+                )
+                # The in-process model is per backend; drop it before switching
+                detector._model = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YOLO backends and sharded inference")
+    parser.add_argument("--images", help="image directory (default: synthetic copies of sample images)")
+    parser.add_argument("--count", type=int, default=256, help="synthetic images")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["torch"])
+    parser.add_argument("--int8", action="store_true", help="INT8 OpenVINO model")
+    parser.add_argument("--latency-runs", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, default=0, help="threads per worker (0 = cores / workers)")
+    parser.add_argument("--batch-size", type=int, default=YOLO_CONFIG["batch_size"])
+    parser.add_argument("--near-duplicates", action="store_true",
+                        help="reuse detections for near-duplicate images (off: every image is inferred)")
+    run_benchmark(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Scraper throughput benchmark
+
+Runs the real scraper (run_scraper) against the offline FakeTelegramClient and
+reports messages/sec, images/sec and peak RSS. Needs no network or Telegram
+session; all output goes to a temporary data directory.
+
+Example:
+    python scripts/benchmark_scraper.py --channels 20 --messages 2000 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Project imports
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config import DATA_PATHS, SCRAPING_CONFIG
+from src.scraping.replay import FakeTelegramClient, synthetic_channel
+from src.scraping.scraper import run_scraper
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _use_data_root(root: Path):
+    DATA_PATHS["raw_messages"] = root / "raw" / "telegram_messages"
+    DATA_PATHS["raw_images"] = root / "raw" / "images"
+    DATA_PATHS["checkpoints"] = root / "raw" / "checkpoints.json"
+    DATA_PATHS["image_store"] = root / "raw" / "image_store"
+    DATA_PATHS["image_blobs"] = root / "raw" / "image_store" / "blobs"
+    DATA_PATHS["image_index"] = root / "raw" / "image_store" / "index.sqlite"
+
+
+def run_benchmark(args):
+    channel_map = {f"SYN{i}": f"syn_channel_{i}" for i in range(args.channels)}
+    client = FakeTelegramClient(
+        {
+            username: synthetic_channel(
+                args.messages,
+                photo_ratio=args.photo_ratio,
+                image_size=args.image_kb * 1024,
+                duplicate_ratio=args.duplicate_ratio,
+                seed=i,
+            )
+            for i, username in enumerate(channel_map.values())
+        },
+        latency=args.latency,
+        download_latency=args.download_latency,
+        flood_wait_rate=args.flood_wait_rate,
+    )
+
+    SCRAPING_CONFIG["incremental"] = False
+    SCRAPING_CONFIG["max_concurrent_channels"] = args.max_concurrent
+    SCRAPING_CONFIG["download_workers"] = args.download_workers
+    SCRAPING_CONFIG["requests_per_second"] = args.rps
+    SCRAPING_CONFIG["burst"] = max(1, int(args.rps))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _use_data_root(Path(tmp))
+
+        started = time.perf_counter()
+        result = asyncio.run(
+            run_scraper(channels=channel_map, concurrent=not args.sequential, client=client)
+        )
+        elapsed = time.perf_counter() - started
+
+    total_messages = args.channels * args.messages
+    print(f"status            {result['status']}")
+    print(f"channels          {args.channels} ({'sequential' if args.sequential else 'concurrent'})")
+    print(f"messages          {total_messages}")
+    print(f"images            {client.downloads}")
+    print(f"flood waits       {client.flood_waits}")
+    print(f"elapsed           {elapsed:.2f}s")
+    print(f"messages/sec      {total_messages / elapsed:.1f}")
+    print(f"images/sec        {client.downloads / elapsed:.1f}")
+    print(f"peak RSS          {_peak_rss_mb():.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Telegram scraper offline")
+    parser.add_argument("--channels", type=int, default=7)
+    parser.add_argument("--messages", type=int, default=1000, help="messages per channel")
+    parser.add_argument("--photo-ratio", type=float, default=0.4)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument("--image-kb", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per message page")
+    parser.add_argument("--download-latency", type=float, default=0.01, help="seconds per photo")
+    parser.add_argument("--flood-wait-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrent", type=int, default=SCRAPING_CONFIG["max_concurrent_channels"])
+    parser.add_argument("--download-workers", type=int, default=SCRAPING_CONFIG["download_workers"])
+    parser.add_argument(
+        "--rps", type=float, default=1000.0,
+        help="rate limiter budget; the default effectively measures the scraper, not the limiter",
+    )
+    parser.add_argument("--sequential", action="store_true")
+    run_benchmark(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
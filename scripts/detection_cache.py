@@ -0,0 +1,55 @@
+"""
+YOLO detection cache maintenance
+
+    stats       Cached images per model key
+    invalidate  Drop entries so the next run re-infers them
+
+Examples:
+    python scripts/detection_cache.py stats
+    python scripts/detection_cache.py invalidate --stale
+    python scripts/detection_cache.py invalidate --image 3f2a...e9
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Project imports
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.scraping.logger import setup_logging
+from src.yolo.cache import cache_stats, invalidate, model_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the YOLO detection cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="cached images per model key")
+
+    drop = sub.add_parser("invalidate", help="remove cache entries")
+    drop.add_argument("--model-key", help="only entries of this model key")
+    drop.add_argument("--current", action="store_true", help="only entries of the current model key")
+    drop.add_argument("--stale", action="store_true", help="every model key except the current one")
+    drop.add_argument("--image", nargs="+", dest="images", help="only these image sha256 hashes")
+
+    args = parser.parse_args()
+    setup_logging()
+    current = model_key()
+
+    if args.command == "stats":
+        print(f"current key  {current}")
+        for key, count in sorted(cache_stats().items()):
+            print(f"{count:>10}  {key}")
+        return
+
+    removed = invalidate(
+        model_key=current if args.current else args.model_key,
+        image_hashes=args.images,
+        keep_model_key=current if args.stale else None,
+    )
+    print(f"✅ Removed {removed} cache entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+One-time export of the YOLO weights for a CPU inference backend
+
+Examples:
+    python scripts/export_yolo_model.py --backend onnx
+    python scripts/export_yolo_model.py --backend openvino --int8
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Project imports
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config import YOLO_CONFIG
+from src.scraping.logger import setup_logging
+from src.yolo.backends import BACKENDS, ensure_exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export YOLO weights for ONNX Runtime / OpenVINO")
+    parser.add_argument("--backend", choices=BACKENDS[1:], required=True)
+    parser.add_argument("--weights", default=YOLO_CONFIG["model"])
+    parser.add_argument("--int8", action="store_true", help="INT8 quantization (openvino)")
+    args = parser.parse_args()
+    setup_logging()
+
+    path = ensure_exported(args.backend, args.weights, args.int8)
+    print(f"✅ {args.backend} model ready: {path}")
+    print(f"   run detection with YOLO_BACKEND={args.backend}{' YOLO_INT8=true' if args.int8 else ''}")
+
+
+if __name__ == "__main__":
+    main()
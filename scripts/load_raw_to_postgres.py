@@ -6,22 +6,46 @@ This is a batch / one-off script.
 Not part of application runtime.
 """
 
+import argparse
+import io
 import json
+import multiprocessing
+import re
 import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterator, List
 
 import psycopg2
 from psycopg2.extras import execute_batch
+from psycopg2.pool import ThreadedConnectionPool
 
 # Project imports
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from src.config import DATA_PATHS, DATABASE_CONFIG
-from src.logger import get_logger
+from src.config import DATA_PATHS, DATABASE_CONFIG, LOADER_CONFIG
+from src.pg_copy import copy_line
+from src.scraping.logger import get_logger, setup_logging
+from src.scraping.storage import list_lake_files, iter_records
+from src.scraping.image_store import file_sha256
 
 logger = get_logger("load_raw_to_postgres")
 
+MESSAGE_COLUMNS = (
+    "message_id",
+    "channel_name",
+    "message_date",
+    "message_text",
+    "has_media",
+    "image_path",
+    "views",
+    "forwards",
+    "raw_payload",
+)
+
 
 # --------------------------------------------------
 # Database utilities
@@ -51,8 +75,13 @@ def create_raw_table(conn):
         image_path TEXT,
         views INTEGER,
         forwards INTEGER,
-        raw_payload JSONB
+        raw_payload JSONB,
+        loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
     );
+
+    -- Tables created before loaded_at drove the incremental activity rollup
+    ALTER TABLE raw.telegram_messages
+        ADD COLUMN IF NOT EXISTS loaded_at TIMESTAMPTZ NOT NULL DEFAULT now();
     """
 
     with conn.cursor() as cur:
@@ -61,35 +90,76 @@ def create_raw_table(conn):
         logger.info("raw.telegram_messages table is ready")
 
 
+def create_incremental_objects(conn):
+    """
+    Unique key for upserts plus the load manifest.
+
+    Rows appended by earlier non-incremental loads may contain duplicates, so
+    they are removed once, before the unique index is first created.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('raw.telegram_messages_channel_message_uidx')")
+        if cur.fetchone()[0] is None:
+            cur.execute("""
+                DELETE FROM raw.telegram_messages a
+                USING raw.telegram_messages b
+                WHERE a.channel_name = b.channel_name
+                  AND a.message_id = b.message_id
+                  AND a.ctid < b.ctid
+            """)
+            logger.info(f"Removed {cur.rowcount} duplicate raw rows before adding unique key")
+            cur.execute("""
+                CREATE UNIQUE INDEX telegram_messages_channel_message_uidx
+                ON raw.telegram_messages (channel_name, message_id)
+            """)
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS raw.load_manifest (
+                file_path TEXT PRIMARY KEY,
+                file_size BIGINT NOT NULL,
+                file_mtime DOUBLE PRECISION NOT NULL,
+                content_hash TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+    conn.commit()
+    logger.info("Upsert key and raw.load_manifest are ready")
+
+
 # --------------------------------------------------
 # File handling
 # --------------------------------------------------
 
+def _message_row(msg: Dict, include_payload: bool = True) -> Dict:
+    return {
+        "message_id": msg.get("message_id"),
+        "channel_name": msg.get("channel_name"),
+        "message_date": msg.get("message_date"),
+        "message_text": msg.get("message_text"),
+        "has_media": msg.get("has_media", False),
+        "image_path": msg.get("image_path"),
+        "views": msg.get("views"),
+        "forwards": msg.get("forwards"),
+        "raw_payload": json.dumps(msg, ensure_ascii=False) if include_payload else None
+    }
+
+
 def load_json_files(base_path: Path) -> List[Dict]:
     records = []
 
     if not base_path.exists():
         raise FileNotFoundError(f"Raw data path not found: {base_path}")
 
-    for json_file in base_path.glob("*.json"):
+    # Legacy `.json` arrays and streamed `.ndjson` parts are both supported
+    for json_file in list_lake_files(base_path):
         try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            for msg in data:
-                records.append({
-                    "message_id": msg.get("message_id"),
-                    "channel_name": msg.get("channel_name"),
-                    "message_date": msg.get("message_date"),
-                    "message_text": msg.get("message_text"),
-                    "has_media": msg.get("has_media", False),
-                    "image_path": msg.get("image_path"),
-                    "views": msg.get("views"),
-                    "forwards": msg.get("forwards"),
-                    "raw_payload": json.dumps(msg)
-                })
-
-            logger.info(f"Loaded {len(data)} records from {json_file.name}")
+            count = 0
+            for msg in iter_records(json_file):
+                count += 1
+                records.append(_message_row(msg))
+
+            logger.info(f"Loaded {count} records from {json_file.name}")
 
         except Exception as e:
             logger.exception(f"Failed reading {json_file.name}")
@@ -97,6 +167,22 @@ def load_json_files(base_path: Path) -> List[Dict]:
     return records
 
 
+def iter_message_rows(base_path: Path, include_payload: bool = True) -> Iterator[Dict]:
+    """
+    Stream rows from every lake file under base_path without materialising them
+    """
+    if not base_path.exists():
+        raise FileNotFoundError(f"Raw data path not found: {base_path}")
+
+    for json_file in list_lake_files(base_path):
+        count = 0
+        for msg in iter_records(json_file):
+            count += 1
+            yield _message_row(msg, include_payload)
+
+        logger.info(f"Streamed {count} records from {json_file.name}")
+
+
 # --------------------------------------------------
 # Load into Postgres
 # --------------------------------------------------
@@ -142,21 +228,437 @@ def insert_records(conn, records: List[Dict]):
         raise
 
 
+def _encode_rows(rows: List[Dict]) -> str:
+    return "".join(copy_line(row, MESSAGE_COLUMNS) for row in rows)
+
+
+def _copy_text(cur, table: str, text: str):
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(MESSAGE_COLUMNS)}) FROM STDIN",
+        io.StringIO(text),
+    )
+
+
+def _copy_chunk(cur, table: str, rows: List[Dict]):
+    _copy_text(cur, table, _encode_rows(rows))
+
+
+def _copy_rows(cur, table: str, rows: Iterator[Dict], chunk_size: int) -> int:
+    total = 0
+    chunk = []
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _copy_chunk(cur, table, chunk)
+            total += len(chunk)
+            chunk = []
+
+    if chunk:
+        _copy_chunk(cur, table, chunk)
+        total += len(chunk)
+
+    return total
+
+
+def copy_records(conn, rows: Iterator[Dict], chunk_size: int = None, table: str = "raw.telegram_messages") -> int:
+    """
+    Stream rows into Postgres with COPY ... FROM STDIN, `chunk_size` rows at a time.
+
+    Only one chunk is held in memory, so memory stays flat however many files
+    are loaded. The whole load is one transaction.
+    """
+    chunk_size = chunk_size or LOADER_CONFIG["copy_chunk_size"]
+    started = time.perf_counter()
+
+    try:
+        with conn.cursor() as cur:
+            total = _copy_rows(cur, table, rows, chunk_size)
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        logger.exception("Failed copying records")
+        raise
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Copied {total} records into {table} in {elapsed:.2f}s "
+        f"({total / elapsed if elapsed else 0:.0f} rows/s)"
+    )
+    return total
+
+
+# --------------------------------------------------
+# Incremental, idempotent loads
+# --------------------------------------------------
+
+# A message repeated within one file keeps its last occurrence: the stage is
+# truncated per file and only ever appended to, so ctid follows file order
+UPSERT_SQL = f"""
+INSERT INTO raw.telegram_messages ({', '.join(MESSAGE_COLUMNS)})
+SELECT DISTINCT ON (channel_name, message_id) {', '.join(MESSAGE_COLUMNS)}
+FROM telegram_messages_stage
+WHERE channel_name IS NOT NULL AND message_id IS NOT NULL
+ORDER BY channel_name, message_id, ctid DESC
+ON CONFLICT (channel_name, message_id) DO UPDATE SET
+    message_date = EXCLUDED.message_date,
+    message_text = EXCLUDED.message_text,
+    has_media = EXCLUDED.has_media,
+    image_path = COALESCE(EXCLUDED.image_path, raw.telegram_messages.image_path),
+    views = EXCLUDED.views,
+    forwards = EXCLUDED.forwards,
+    raw_payload = COALESCE(EXCLUDED.raw_payload, raw.telegram_messages.raw_payload),
+    loaded_at = now()
+"""
+
+
+def ensure_append_allowed(conn):
+    """
+    The copy/insert modes append without a key, so they would fail on (or
+    duplicate past) the unique index the incremental modes create.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('raw.telegram_messages_channel_message_uidx')")
+        if cur.fetchone()[0] is not None:
+            raise ValueError(
+                "raw.telegram_messages has the incremental upsert key; "
+                "use --mode incremental or parallel to load into it"
+            )
+
+
+def _manifest_key(lake_file: Path, root: Path) -> str:
+    return lake_file.relative_to(root).as_posix()
+
+
+def load_manifest(conn) -> Dict[str, tuple]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT file_path, file_size, file_mtime, content_hash FROM raw.load_manifest")
+        return {path: (size, mtime, digest) for path, size, mtime, digest in cur.fetchall()}
+
+
+def pending_files(root: Path, manifest: Dict[str, tuple], force: bool = False, date: str = None):
+    """
+    Yield (lake_file, key, size, mtime, content_hash) for files not yet loaded.
+
+    Size and mtime are checked first so unchanged files are skipped without
+    being re-read; only candidates are hashed, and a file whose hash still
+    matches the manifest (e.g. a touched file) is skipped too.
+    """
+    for lake_file in list_lake_files(root / date if date else root):
+        key = _manifest_key(lake_file, root)
+        stat = lake_file.stat()
+        known = manifest.get(key)
+
+        if not force and known and known[0] == stat.st_size and known[1] == stat.st_mtime:
+            continue
+
+        content_hash = file_sha256(lake_file)
+        if not force and known and known[0] == stat.st_size and known[2] == content_hash:
+            continue
+
+        yield lake_file, key, stat.st_size, stat.st_mtime, content_hash
+
+
+def _create_stage(cur):
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS telegram_messages_stage
+        (LIKE raw.telegram_messages INCLUDING DEFAULTS)
+        ON COMMIT DELETE ROWS
+    """)
+
+
+def _upsert_stage(cur) -> int:
+    # Emptied after each file so a later file's values win within one transaction
+    cur.execute(UPSERT_SQL)
+    upserted = cur.rowcount
+    cur.execute("TRUNCATE telegram_messages_stage")
+    return upserted
+
+
+def _record_manifest(cur, key: str, size: int, mtime: float, content_hash: str, row_count: int):
+    cur.execute("""
+        INSERT INTO raw.load_manifest (file_path, file_size, file_mtime, content_hash, row_count)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (file_path) DO UPDATE SET
+            file_size = EXCLUDED.file_size,
+            file_mtime = EXCLUDED.file_mtime,
+            content_hash = EXCLUDED.content_hash,
+            row_count = EXCLUDED.row_count,
+            loaded_at = now()
+    """, (key, size, mtime, content_hash, row_count))
+
+
+def upsert_file(conn, lake_file: Path, key: str, size: int, mtime: float, content_hash: str,
+                include_payload: bool = True, chunk_size: int = None) -> int:
+    """
+    Load one lake file in its own transaction: COPY into a temporary staging
+    table, upsert on (channel_name, message_id), then record it in the manifest.
+    """
+    chunk_size = chunk_size or LOADER_CONFIG["copy_chunk_size"]
+
+    try:
+        with conn.cursor() as cur:
+            _create_stage(cur)
+
+            rows = (_message_row(msg, include_payload) for msg in iter_records(lake_file))
+            staged = _copy_rows(cur, "telegram_messages_stage", rows, chunk_size)
+            upserted = _upsert_stage(cur)
+
+            _record_manifest(cur, key, size, mtime, content_hash, staged)
+
+        conn.commit()
+        logger.info(f"Upserted {upserted} rows from {key} ({staged} staged)")
+        return upserted
+
+    except Exception:
+        conn.rollback()
+        logger.exception(f"Failed loading {key}")
+        raise
+
+
+def load_incremental(conn, root: Path, include_payload: bool = True, chunk_size: int = None,
+                     force: bool = False, date: str = None) -> Dict[str, int]:
+    """
+    Discover every date partition under root (or just `date`) and load only new or changed files
+    """
+    if not (root / date if date else root).exists():
+        raise FileNotFoundError(f"Raw data path not found: {root / date if date else root}")
+
+    create_incremental_objects(conn)
+    manifest = load_manifest(conn)
+
+    summary = {"files": 0, "rows": 0, "failed": 0, "skipped": 0}
+    failed_channels = set()
+    for lake_file, key, size, mtime, content_hash in pending_files(root, manifest, force, date):
+        # Files come in date order; once a channel fails, its later files wait for the next run
+        channel = _partition_of(key)[1]
+        if channel in failed_channels:
+            summary["skipped"] += 1
+            continue
+
+        try:
+            summary["rows"] += upsert_file(
+                conn, lake_file, key, size, mtime, content_hash, include_payload, chunk_size
+            )
+            summary["files"] += 1
+        except Exception:
+            summary["failed"] += 1
+            failed_channels.add(channel)
+
+    logger.info(
+        f"Incremental load done | files={summary['files']} | rows={summary['rows']} "
+        f"| failed={summary['failed']} | skipped={summary['skipped']}"
+    )
+    return summary
+
+
+# --------------------------------------------------
+# Parallel partition loads
+# --------------------------------------------------
+
+def encode_lake_file(lake_file: str, include_payload: bool = True):
+    """
+    Parse and transform one lake file into COPY text (runs in a worker process)
+    """
+    rows = [_message_row(msg, include_payload) for msg in iter_records(Path(lake_file))]
+    return _encode_rows(rows), len(rows)
+
+
+def _partition_of(key: str):
+    """
+    (date, channel) for a manifest key such as 2026-01-17/CheMed123-00003.ndjson
+    """
+    date_str, name = key.split("/", 1)
+    channel = re.sub(r"-\d+\.ndjson$", "", name)
+    return date_str, channel.removesuffix(".json")
+
+
+def _load_channel(db_pool, parse_pool, partitions, include_payload, stats):
+    """
+    Load one channel's partitions in date order, one transaction per date/channel partition.
+
+    Work is split by channel so concurrent transactions never touch the same
+    (channel_name, message_id) rows, and a later day's refresh always wins.
+    The channel stops at the first failed day: loading later days past it
+    would let the next run apply the failed day's older counts on top of them.
+    """
+    worker = threading.current_thread().name
+    conn = db_pool.getconn()
+    try:
+        for position, ((date_str, channel), files) in enumerate(partitions):
+            started = time.perf_counter()
+            encoded = [
+                parse_pool.submit(encode_lake_file, str(lake_file), include_payload)
+                for lake_file, *_ in files
+            ]
+
+            try:
+                upserted = 0
+                with conn.cursor() as cur:
+                    _create_stage(cur)
+                    for (lake_file, key, size, mtime, content_hash), future in zip(files, encoded):
+                        text, row_count = future.result()
+                        _copy_text(cur, "telegram_messages_stage", text)
+                        upserted += _upsert_stage(cur)
+                        _record_manifest(cur, key, size, mtime, content_hash, row_count)
+                conn.commit()
+
+            except Exception:
+                conn.rollback()
+                for future in encoded:
+                    future.cancel()
+                logger.exception(f"Failed loading partition {date_str}/{channel}")
+                stats[worker]["failed"] += 1
+
+                remaining = len(partitions) - position - 1
+                if remaining:
+                    logger.warning(
+                        f"Skipping {remaining} later partitions of {channel} until {date_str} loads"
+                    )
+                return
+
+            elapsed = time.perf_counter() - started
+            stats[worker]["partitions"] += 1
+            stats[worker]["rows"] += upserted
+            stats[worker]["seconds"] += elapsed
+            logger.info(f"Loaded partition {date_str}/{channel} | rows={upserted} | {elapsed:.2f}s")
+    finally:
+        db_pool.putconn(conn)
+
+
+def load_parallel(root: Path, include_payload: bool = True, force: bool = False, date: str = None,
+                  parse_workers: int = None, db_connections: int = None) -> Dict[str, Dict]:
+    """
+    Parallel incremental load: a process pool parses and transforms files
+    across cores while a bounded connection pool loads channels concurrently.
+
+    Returns per-worker stats (partitions, rows, seconds, failed).
+    """
+    parse_workers = parse_workers or LOADER_CONFIG["parse_workers"]
+    db_connections = db_connections or LOADER_CONFIG["db_connections"]
+
+    conn = get_db_connection()
+    try:
+        create_raw_table(conn)
+        create_incremental_objects(conn)
+        manifest = load_manifest(conn)
+    finally:
+        conn.close()
+
+    by_channel = defaultdict(lambda: defaultdict(list))
+    for pending in pending_files(root, manifest, force, date):
+        date_str, channel = _partition_of(pending[1])
+        by_channel[channel][(date_str, channel)].append(pending)
+
+    stats = defaultdict(lambda: {"partitions": 0, "rows": 0, "seconds": 0.0, "failed": 0})
+    if not by_channel:
+        logger.info("Parallel load: nothing new to load")
+        return stats
+
+    db_pool = ThreadedConnectionPool(1, db_connections, **DATABASE_CONFIG)
+    try:
+        # spawn: the loader threads and the connection pool must not be forked into workers
+        parse_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=parse_workers, mp_context=parse_context) as parse_pool, \
+                ThreadPoolExecutor(max_workers=db_connections, thread_name_prefix="loader") as loaders:
+            futures = [
+                loaders.submit(
+                    _load_channel, db_pool, parse_pool, sorted(partitions.items()), include_payload, stats
+                )
+                for partitions in by_channel.values()
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        db_pool.closeall()
+
+    for worker, s in sorted(stats.items()):
+        rate = s["rows"] / s["seconds"] if s["seconds"] else 0
+        logger.info(
+            f"Worker {worker} | partitions={s['partitions']} | rows={s['rows']} "
+            f"| {s['seconds']:.2f}s | {rate:.0f} rows/s | failed={s['failed']}"
+        )
+    return stats
+
+
 # --------------------------------------------------
 # Main entry point
 # --------------------------------------------------
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load raw Telegram lake files into PostgreSQL")
+    parser.add_argument(
+        "--date",
+        help="only this date partition (YYYY-MM-DD); required for the copy/insert append modes",
+    )
+    parser.add_argument(
+        "--mode", choices=("incremental", "parallel", "copy", "insert"), default="incremental",
+        help=(
+            "incremental: upsert new/changed files across all partitions (default); "
+            "parallel: incremental with a parse process pool and concurrent connections; "
+            "copy: append one partition with chunked COPY; insert: legacy execute_batch "
+            "(the append modes refuse to run once an incremental load has added the upsert key)"
+        ),
+    )
+    parser.add_argument("--workers", type=int, default=LOADER_CONFIG["parse_workers"],
+                        help="parse processes for --mode parallel")
+    parser.add_argument("--db-connections", type=int, default=LOADER_CONFIG["db_connections"],
+                        help="concurrent connections for --mode parallel")
+    parser.add_argument("--force", action="store_true", help="reload files already in the manifest")
+    parser.add_argument("--chunk-size", type=int, default=LOADER_CONFIG["copy_chunk_size"])
+    parser.add_argument(
+        "--no-payload", action="store_true",
+        help="leave raw_payload NULL instead of storing a JSON copy of each message",
+    )
+    return parser.parse_args()
+
+
+def print_parallel_summary(stats):
+    print(f"{'worker':<12}{'partitions':>12}{'rows':>12}{'seconds':>10}{'rows/s':>12}")
+    for worker, s in sorted(stats.items()):
+        rate = s["rows"] / s["seconds"] if s["seconds"] else 0
+        print(f"{worker:<12}{s['partitions']:>12}{s['rows']:>12}{s['seconds']:>10.2f}{rate:>12.0f}")
+
+
 def main():
+    args = parse_args()
+    setup_logging()
     print("Starting raw Telegram data load")
 
     try:
-        raw_path = Path(DATA_PATHS["raw"]) / "telegram_messages" / "2026-01-17"
+        root = Path(DATA_PATHS["raw_messages"])
+        include_payload = LOADER_CONFIG["store_raw_payload"] and not args.no_payload
+
+        if args.mode == "parallel":
+            stats = load_parallel(
+                root, include_payload, args.force, args.date, args.workers, args.db_connections
+            )
+            print_parallel_summary(stats)
+            if any(s["failed"] for s in stats.values()):
+                raise RuntimeError("Some partitions failed to load")
+            print("✅ Task 2 Load completed successfully")
+            return
 
         conn = get_db_connection()
         create_raw_table(conn)
 
-        records = load_json_files(raw_path)
-        insert_records(conn, records)
+        if args.mode == "incremental":
+            summary = load_incremental(
+                conn, root, include_payload, args.chunk_size, args.force, args.date
+            )
+            if summary["failed"]:
+                raise RuntimeError(f"{summary['failed']} file(s) failed to load")
+        else:
+            if not args.date:
+                raise ValueError(f"--date is required for --mode {args.mode}")
+            ensure_append_allowed(conn)
+
+            if args.mode == "copy":
+                copy_records(conn, iter_message_rows(root / args.date, include_payload), args.chunk_size)
+            else:
+                records = load_json_files(root / args.date)
+                insert_records(conn, records)
 
         conn.close()
         print("✅ Task 2 Load completed successfully")
@@ -164,6 +666,7 @@ def main():
     except Exception as e:
         print("❌ Task 2 Load failed")
         print(e)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
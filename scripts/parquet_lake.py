@@ -0,0 +1,69 @@
+"""
+Parquet data lake maintenance
+
+    convert  Write an existing raw JSON/NDJSON day into the Parquet lake
+    compact  Merge the small part files of each date/channel partition
+
+Examples:
+    python scripts/parquet_lake.py convert --date 2026-01-17
+    python scripts/parquet_lake.py compact --date 2026-01-17
+"""
+
+import argparse
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+
+# Project imports
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config import DATA_PATHS
+from src.scraping.logger import get_logger, setup_logging
+from src.scraping.parquet_sink import ParquetSink, compact_lake
+from src.scraping.storage import list_lake_files, iter_records
+
+logger = get_logger("parquet_lake")
+
+
+def convert_day(date_str):
+    day_path = DATA_PATHS["raw_messages"] / date_str
+    if not day_path.exists():
+        raise FileNotFoundError(f"Raw data path not found: {day_path}")
+
+    sinks = {}
+    with ExitStack() as stack:
+        for lake_file in list_lake_files(day_path):
+            for record in iter_records(lake_file):
+                channel = record["channel_name"]
+                if channel not in sinks:
+                    sinks[channel] = stack.enter_context(ParquetSink(date_str, channel))
+                sinks[channel].write(record)
+
+    logger.info(f"Converted {date_str} into {len(sinks)} Parquet partitions")
+    return len(sinks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the Parquet data lake")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="convert a raw JSON day to Parquet")
+    convert.add_argument("--date", required=True, help="YYYY-MM-DD")
+
+    compact = sub.add_parser("compact", help="merge small Parquet files per partition")
+    compact.add_argument("--date", help="only this YYYY-MM-DD partition")
+    compact.add_argument("--channel", help="only this channel")
+
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.command == "convert":
+        partitions = convert_day(args.date)
+        print(f"✅ Converted {args.date} ({partitions} channel partitions)")
+    else:
+        merged = compact_lake(args.date, args.channel)
+        print(f"✅ Compaction merged {merged} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -54,7 +54,29 @@ CHANNEL_METADATA = {
 SCRAPING_CONFIG = {
     "max_messages_per_channel": int(os.getenv("MAX_MESSAGES", 0)),  # 0 = no limit
     "max_retries": int(os.getenv("MAX_RETRIES", 3)),
-    "sleep_seconds": int(os.getenv("SCRAPER_SLEEP", 2)),
+    "sleep_seconds": int(os.getenv("SCRAPER_SLEEP", 2)),  # base backoff delay
+    # Account-wide token bucket for Telegram API calls (pages and downloads)
+    "requests_per_second": float(os.getenv("SCRAPER_RPS", 5)),
+    "burst": int(os.getenv("SCRAPER_BURST", 10)),
+    "max_backoff_seconds": int(os.getenv("SCRAPER_MAX_BACKOFF", 60)),
+    "max_flood_wait_seconds": int(os.getenv("SCRAPER_MAX_FLOOD_WAIT", 900)),
+    # Scrape channels as concurrent asyncio tasks on the shared client
+    "concurrent": os.getenv("SCRAPER_CONCURRENT", "true").lower() == "true",
+    "max_concurrent_channels": int(os.getenv("MAX_CONCURRENT_CHANNELS", 4)),
+    # Only fetch messages newer than the per-channel checkpoint
+    "incremental": os.getenv("SCRAPER_INCREMENTAL", "true").lower() == "true",
+    # Re-fetch posts from the last N days to refresh views/forwards (0 = off)
+    "lookback_days": int(os.getenv("SCRAPER_LOOKBACK_DAYS", 0)),
+    # NDJSON lake files: rotate a part after this many records or bytes
+    "lake_max_records": int(os.getenv("LAKE_MAX_RECORDS", 5000)),
+    "lake_max_bytes": int(os.getenv("LAKE_MAX_BYTES", 64 * 1024 * 1024)),
+    "lake_flush_every": int(os.getenv("LAKE_FLUSH_EVERY", 100)),
+    # Photo downloads run on a worker pool fed by a bounded queue
+    "download_workers": int(os.getenv("DOWNLOAD_WORKERS", 4)),
+    "download_queue_size": int(os.getenv("DOWNLOAD_QUEUE_SIZE", 32)),
+    # Optional zstd Parquet copy of the lake, partitioned by date and channel
+    "parquet_sink": os.getenv("SCRAPER_PARQUET", "false").lower() == "true",
+    "parquet_part_rows": int(os.getenv("PARQUET_PART_ROWS", 50000)),
 }
 
 # -------------------------------------------------------------------
@@ -66,14 +88,115 @@ DATA_PATHS = {
     "raw": BASE_DATA_DIR / "raw",
     "raw_messages": BASE_DATA_DIR / "raw" / "telegram_messages",
     "raw_images": BASE_DATA_DIR / "raw" / "images",
+    "checkpoints": BASE_DATA_DIR / "raw" / "checkpoints.json",
+    # Content-addressed image store: blobs keyed by sha256 + (channel, message_id) index
+    "image_store": BASE_DATA_DIR / "raw" / "image_store",
+    "image_blobs": BASE_DATA_DIR / "raw" / "image_store" / "blobs",
+    "image_index": BASE_DATA_DIR / "raw" / "image_store" / "index.sqlite",
+    "processed": BASE_DATA_DIR / "processed",
+    # Raw YOLO detections keyed by (image sha256, model key)
+    "detection_cache": BASE_DATA_DIR / "processed" / "detection_cache.sqlite",
+    "lake_parquet": BASE_DATA_DIR / "lake" / "telegram_messages",
 }
 
 # -------------------------------------------------------------------
 # Logging Configuration
 # -------------------------------------------------------------------
 LOGGING_CONFIG = {
-    "log_dir": Path("../data/logs"),
+    "log_dir": Path(os.getenv("LOG_DIR", BASE_DATA_DIR / "logs")),
     "log_file": "scraper.log",
+    "level": os.getenv("LOG_LEVEL", "INFO"),
+    # Per-message warnings/errors: at most one line per key in this window
+    "throttle_seconds": float(os.getenv("LOG_THROTTLE_SECONDS", 5)),
+    # Aggregated scrape counters are logged at this interval
+    "metrics_interval_seconds": float(os.getenv("LOG_METRICS_INTERVAL", 30)),
+}
+
+# -------------------------------------------------------------------
+# Raw Loader Configuration
+# -------------------------------------------------------------------
+LOADER_CONFIG = {
+    "copy_chunk_size": int(os.getenv("LOAD_COPY_CHUNK_SIZE", 5000)),
+    # Keep a JSONB copy of each message in raw_payload
+    "store_raw_payload": os.getenv("LOAD_RAW_PAYLOAD", "true").lower() == "true",
+    # --mode parallel: parse processes and concurrent Postgres connections
+    "parse_workers": int(os.getenv("LOAD_PARSE_WORKERS", os.cpu_count() or 1)),
+    "db_connections": int(os.getenv("LOAD_DB_CONNECTIONS", 4)),
+}
+
+# -------------------------------------------------------------------
+# YOLO Enrichment Configuration
+# -------------------------------------------------------------------
+YOLO_CONFIG = {
+    "model": os.getenv("YOLO_MODEL", "yolov8n.pt"),
+    # Detections are replaced per image for this version on re-runs
+    "model_version": os.getenv("YOLO_MODEL_VERSION")
+    or Path(os.getenv("YOLO_MODEL", "yolov8n.pt")).stem,
+    # Comma-separated: postgres, csv
+    "sinks": [s.strip() for s in os.getenv("YOLO_SINKS", "postgres").split(",") if s.strip()],
+    "copy_chunk_size": int(os.getenv("YOLO_COPY_CHUNK_SIZE", 1000)),
+    # Images per model call; decode + letterbox runs ahead on a thread pool
+    "batch_size": int(os.getenv("YOLO_BATCH_SIZE", 16)),
+    "prefetch_workers": int(os.getenv("YOLO_PREFETCH_WORKERS", 4)),
+    "imgsz": int(os.getenv("YOLO_IMGSZ", 640)),
+    # Inference thresholds; part of the detection cache key
+    "conf": float(os.getenv("YOLO_CONF", 0.25)),
+    "iou": float(os.getenv("YOLO_IOU", 0.7)),
+    # Inference backend: torch, onnx or openvino (exported once from the .pt weights)
+    "backend": os.getenv("YOLO_BACKEND", "torch"),
+    "int8": os.getenv("YOLO_INT8", "false").lower() == "true",  # openvino only
+    # Reuse detections of perceptual near duplicates (dHash Hamming distance, of 64 bits)
+    "near_duplicates": os.getenv("YOLO_NEAR_DUPLICATES", "true").lower() == "true",
+    "phash_distance": int(os.getenv("YOLO_PHASH_DISTANCE", 4)),
+    # Sharded CPU inference: worker processes x intra-op threads each
+    "workers": int(os.getenv("YOLO_WORKERS", 1)),
+    "threads": int(os.getenv("YOLO_THREADS", 0)),  # 0 = cores / workers
+    # Batches handed to a worker at a time
+    "shard_batches": int(os.getenv("YOLO_SHARD_BATCHES", 4)),
+}
+
+# -------------------------------------------------------------------
+# Product Term Extraction Configuration
+# -------------------------------------------------------------------
+TERMS_CONFIG = {
+    # variant,term CSV; changing it re-extracts every message
+    "lexicon": Path(os.getenv("TERMS_LEXICON", Path(__file__).parent / "terms" / "product_lexicon.csv")),
+    # Messages tokenized per vectorized batch (and per write transaction)
+    "batch_size": int(os.getenv("TERMS_BATCH_SIZE", 20000)),
+}
+
+# -------------------------------------------------------------------
+# API Configuration
+# -------------------------------------------------------------------
+API_CONFIG = {
+    # Async (psycopg 3) connection pool shared by all requests
+    "pool_size": int(os.getenv("API_DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.getenv("API_DB_MAX_OVERFLOW", 10)),
+    "pool_timeout": float(os.getenv("API_DB_POOL_TIMEOUT", 10)),
+    "pool_recycle": int(os.getenv("API_DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": os.getenv("API_DB_PRE_PING", "true").lower() == "true",
+    "statement_timeout_ms": int(os.getenv("API_STATEMENT_TIMEOUT_MS", 5000)),
+    # Server-side prepare after this many executions of a query (-1 = never, e.g. behind pgbouncer)
+    "prepare_threshold": int(os.getenv("API_PREPARE_THRESHOLD", 0)),
+    # Report response cache, invalidated when dbt bumps marts.warehouse_version
+    "cache_backend": os.getenv("API_CACHE_BACKEND", "memory"),  # memory or disk (shared)
+    "cache_dir": Path(os.getenv("API_CACHE_DIR", BASE_DATA_DIR / "api_cache")),
+    "cache_ttl_seconds": int(os.getenv("API_CACHE_TTL", 3600)),
+    "cache_max_entries": int(os.getenv("API_CACHE_MAX_ENTRIES", 1024)),
+    "cache_disk_bytes": int(os.getenv("API_CACHE_DISK_BYTES", 256 * 1024 * 1024)),
+    "version_check_seconds": float(os.getenv("API_VERSION_CHECK_SECONDS", 5)),
+    # Clients revalidate with If-None-Match and get 304 while the warehouse is unchanged
+    "cache_control": os.getenv("API_CACHE_CONTROL", "no-cache"),
+    # Message search; the text search config must match the dbt var search_text_config
+    "search_text_config": os.getenv("SEARCH_TEXT_CONFIG", "simple"),
+    "search_max_limit": int(os.getenv("API_SEARCH_MAX_LIMIT", 100)),
+    # Streaming exports: dedicated pool, rows fetched per server-side cursor round trip,
+    # and how long a client may stall a single chunk before the export is aborted
+    "export_connections": int(os.getenv("API_EXPORT_CONNECTIONS", 2)),
+    "export_pool_timeout": float(os.getenv("API_EXPORT_POOL_TIMEOUT", 1)),
+    "export_statement_timeout_ms": int(os.getenv("API_EXPORT_STATEMENT_TIMEOUT_MS", 30000)),
+    "export_fetch_rows": int(os.getenv("API_EXPORT_FETCH_ROWS", 2000)),
+    "export_send_timeout": float(os.getenv("API_EXPORT_SEND_TIMEOUT", 30)),
 }
 
 # -------------------------------------------------------------------
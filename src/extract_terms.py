@@ -0,0 +1,26 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Make the project root importable so `src.*` resolves when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.scraping.logger import setup_logging
+from src.terms.pipeline import run_term_extraction
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract product terms from new messages")
+    parser.add_argument("--batch-size", type=int, default=None, help="Messages per vectorized batch")
+    parser.add_argument("--full", action="store_true", help="Re-extract every message, not only new ones")
+    args = parser.parse_args()
+    setup_logging()
+
+    try:
+        summary = run_term_extraction(batch_size=args.batch_size, full=args.full)
+        print(
+            f" Product terms extracted: {summary['terms']} terms in {summary['with_terms']} "
+            f"of {summary['messages']} messages (lexicon {summary['lexicon_version']})."
+        )
+    except Exception as e:
+        print(f"❌ Term extraction failed: {e}")
+        sys.exit(1)
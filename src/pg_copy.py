@@ -0,0 +1,28 @@
+"""
+Encoding for Postgres COPY ... FROM STDIN in the default text format.
+
+Shared by the raw message loader (scripts/load_raw_to_postgres.py) and the
+detection sink (src/yolo/sinks.py).
+"""
+
+
+def copy_value(value) -> str:
+    # \N is NULL; backslash, tab, newline and CR are escaped
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_line(row, columns) -> str:
+    """
+    One COPY text line with `row`'s values in `columns` order
+    """
+    return "\t".join(copy_value(row[c]) for c in columns) + "\n"
@@ -0,0 +1,62 @@
+from datetime import datetime
+from src.config import DATA_PATHS
+from src.scraping.logger import get_logger
+import json
+import os
+
+logger = get_logger("Checkpoints")
+
+
+def load_checkpoints():
+    """
+    Return all channel checkpoints as {channel_name: {message_id, message_date, updated_at}}
+    """
+    path = DATA_PATHS["checkpoints"]
+    if not path.exists():
+        return {}
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to read checkpoints {path}: {e}")
+        return {}
+
+
+def get_checkpoint(channel_name):
+    return load_checkpoints().get(channel_name)
+
+
+def save_checkpoint(channel_name, message_id, message_date):
+    """
+    Persist the high-water mark for a channel.
+
+    The checkpoint only moves forward, and the file is replaced atomically so a
+    crash mid-write never leaves a truncated checkpoint behind.
+    """
+    path = DATA_PATHS["checkpoints"]
+    checkpoints = load_checkpoints()
+
+    current = checkpoints.get(channel_name)
+    if current and current["message_id"] >= message_id:
+        return False
+
+    checkpoints[channel_name] = {
+        "message_id": message_id,
+        "message_date": message_date,
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoints, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+        logger.info(f"Checkpoint saved | channel={channel_name} | message_id={message_id}")
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to save checkpoint for {channel_name}: {e}")
+        return False
@@ -0,0 +1,121 @@
+import asyncio
+import os
+
+from src.config import SCRAPING_CONFIG
+from src.scraping.image_store import staging_path_for, store_file
+from src.scraping.logger import get_logger, ThrottledLogger
+
+logger = get_logger("Downloads")
+throttled = ThrottledLogger(logger)
+
+
+class PhotoDownloadPool:
+    """
+    Producer/consumer pool for photo downloads.
+
+    Message iteration submits (record, media) jobs to a bounded queue and keeps
+    going; `workers` tasks stream each photo straight to disk, fill in the
+    record's `image_path` and only then hand the record to the lake writer.
+    A full queue blocks `submit`, which keeps memory bounded on image-heavy channels.
+    """
+
+    def __init__(self, client, writer, limiter, metrics, workers=None, queue_size=None):
+        self.client = client
+        self.writer = writer
+        self.limiter = limiter
+        self.metrics = metrics
+        self.workers = workers or SCRAPING_CONFIG["download_workers"]
+        self.queue = asyncio.Queue(maxsize=queue_size or SCRAPING_CONFIG["download_queue_size"])
+
+        self.downloaded = 0
+        self.errors = 0
+        # Lowest message id whose record went out without its photo (or not at all)
+        self.min_failed_id = None
+        self._tasks = []
+
+    async def __aenter__(self):
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.queue.join()
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        # Jobs still queued after an error are written without their photo,
+        # the same as a failed download
+        while not self.queue.empty():
+            record, _ = self.queue.get_nowait()
+            record["image_path"] = None
+            self._failed(record)
+            self._write(record)
+            self.queue.task_done()
+        return False
+
+    async def submit(self, record, media):
+        await self.queue.put((record, media))
+
+    async def _worker(self, worker_id):
+        while True:
+            record, media = await self.queue.get()
+            channel_name = record["channel_name"]
+            try:
+                record["image_path"] = await self._download(record, media)
+                self.downloaded += 1
+                self.metrics.incr(
+                    channel_name, images=1, bytes=os.path.getsize(record["image_path"])
+                )
+            except Exception as e:
+                self._failed(record)
+                throttled.error(
+                    f"download:{channel_name}",
+                    f"Failed image download | channel={channel_name} | id={record['message_id']} | {e}",
+                    channel=channel_name,
+                    message_id=record["message_id"],
+                    worker=worker_id,
+                )
+            except asyncio.CancelledError:
+                # Pool shut down mid-download; the record still goes out without its photo
+                self._failed(record)
+                raise
+            finally:
+                # The record is written either way; a failed download leaves image_path empty.
+                # task_done must run even if the write fails or __aexit__ waits forever
+                try:
+                    self._write(record, worker_id)
+                finally:
+                    self.queue.task_done()
+
+    def _failed(self, record):
+        self.errors += 1
+        self.metrics.incr(record["channel_name"], errors=1)
+        if self.min_failed_id is None or record["message_id"] < self.min_failed_id:
+            self.min_failed_id = record["message_id"]
+
+    def _write(self, record, worker_id=None):
+        try:
+            self.writer.write(record)
+        except Exception as e:
+            self._failed(record)
+            throttled.error(
+                f"write:{record['channel_name']}",
+                f"Failed record write | channel={record['channel_name']} | id={record['message_id']} | {e}",
+                channel=record["channel_name"],
+                message_id=record["message_id"],
+                worker=worker_id,
+            )
+
+    async def _download(self, record, media):
+        channel_name, message_id = record["channel_name"], record["message_id"]
+
+        # Stream to a staging file, then hash it into the content-addressed store;
+        # a crash never leaves a truncated blob and reposted images are stored once
+        partial = staging_path_for(channel_name, message_id)
+        await self.limiter.call(self.client.download_media, media, file=str(partial))
+
+        return store_file(partial, channel_name, message_id)
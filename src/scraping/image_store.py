@@ -0,0 +1,188 @@
+"""
+Content-addressed image store.
+
+Blobs live under data/raw/image_store/blobs/{sha[:2]}/{sha}.jpg and a small
+SQLite index maps every (channel_name, message_id) to the blob it references,
+so a promotional image reposted many times is stored (and later run through
+YOLO) once.
+"""
+
+from pathlib import Path
+from datetime import datetime
+from src.config import DATA_PATHS
+from src.scraping.logger import get_logger
+import hashlib
+import os
+import sqlite3
+
+logger = get_logger("ImageStore")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+# --------------------------------------------------
+# Index
+# --------------------------------------------------
+
+def _connect():
+    index_path = DATA_PATHS["image_index"]
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(index_path, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS image_index (
+            channel_name TEXT NOT NULL,
+            message_id INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            blob_path TEXT NOT NULL,
+            size INTEGER,
+            created_at TEXT,
+            PRIMARY KEY (channel_name, message_id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_image_index_sha256 ON image_index (sha256)")
+    return conn
+
+
+def _index(sha256, blob_path, channel_name, message_id):
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO image_index (channel_name, message_id, sha256, blob_path, size, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (channel_name, message_id) DO UPDATE SET
+                sha256 = excluded.sha256,
+                blob_path = excluded.blob_path,
+                size = excluded.size
+            """,
+            (
+                channel_name,
+                int(message_id),
+                sha256,
+                str(blob_path),
+                blob_path.stat().st_size,
+                datetime.utcnow().isoformat(),
+            ),
+        )
+    conn.close()
+
+
+def lookup(channel_name, message_id):
+    """
+    Canonical blob path for a message, or None if it has no stored image
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT blob_path FROM image_index WHERE channel_name = ? AND message_id = ?",
+            (channel_name, int(message_id)),
+        ).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def messages_for_blob(blob_path):
+    """
+    All (channel_name, message_id) pairs that reference a blob
+    """
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT channel_name, message_id FROM image_index WHERE sha256 = ? "
+            "ORDER BY channel_name, message_id",
+            (Path(blob_path).stem,),
+        ).fetchall()
+    conn.close()
+    return [(channel, str(message_id)) for channel, message_id in rows]
+
+
+def iter_blobs():
+    """
+    Yield (blob_path, [(channel_name, message_id), ...]) once per unique image
+    """
+    conn = _connect()
+    try:
+        # Streamed from the cursor, so memory does not grow with the archive
+        rows = conn.execute(
+            "SELECT sha256, blob_path, channel_name, message_id FROM image_index "
+            "ORDER BY sha256, channel_name, message_id"
+        )
+
+        current_sha, current_path, messages = None, None, []
+        for sha256, blob_path, channel_name, message_id in rows:
+            if sha256 != current_sha and messages:
+                yield Path(current_path), messages
+                messages = []
+            current_sha, current_path = sha256, blob_path
+            messages.append((channel_name, str(message_id)))
+
+        if messages:
+            yield Path(current_path), messages
+    finally:
+        conn.close()
+
+
+def is_blob(image_path):
+    return DATA_PATHS["image_blobs"] in Path(image_path).parents
+
+
+# --------------------------------------------------
+# Blobs
+# --------------------------------------------------
+
+def blob_path_for(sha256) -> Path:
+    return DATA_PATHS["image_blobs"] / sha256[:2] / f"{sha256}.jpg"
+
+
+def staging_path_for(channel_name, message_id) -> Path:
+    """
+    Scratch location for a download before it is hashed into the store
+    """
+    path = DATA_PATHS["image_store"] / "staging" / f"{channel_name}-{message_id}.part"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_bytes(image_bytes, channel_name, message_id):
+    """
+    Store an in-memory image and index it; the disk write is skipped for known blobs
+    """
+    sha256 = hashlib.sha256(image_bytes).hexdigest()
+    blob_path = blob_path_for(sha256)
+
+    if not blob_path.exists():
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = blob_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(image_bytes)
+        os.replace(tmp_path, blob_path)
+    else:
+        logger.debug(f"Duplicate image | channel={channel_name} | id={message_id} | blob={sha256}")
+
+    _index(sha256, blob_path, channel_name, message_id)
+    return str(blob_path)
+
+
+def store_file(path, channel_name, message_id):
+    """
+    Move a downloaded file into the store and index it; duplicates are discarded
+    """
+    path = Path(path)
+    sha256 = file_sha256(path)
+    blob_path = blob_path_for(sha256)
+
+    if blob_path.exists():
+        path.unlink()
+        logger.debug(f"Duplicate image | channel={channel_name} | id={message_id} | blob={sha256}")
+    else:
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, blob_path)
+
+    _index(sha256, blob_path, channel_name, message_id)
+    return str(blob_path)
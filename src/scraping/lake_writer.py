@@ -0,0 +1,144 @@
+from src.config import DATA_PATHS, SCRAPING_CONFIG
+from src.scraping.logger import get_logger
+import json
+import os
+import re
+
+logger = get_logger("LakeWriter")
+
+
+class LakeWriter:
+    """
+    Stream records for one channel/day into the data lake as NDJSON.
+
+    Records are appended to a hidden ``.tmp`` part file as they arrive. A part
+    is committed (fsync + atomic rename to ``{channel}-{part:05d}.ndjson``) once
+    it reaches ``max_records`` or ``max_bytes``, and when the writer is closed,
+    so readers only ever see complete files. Parts left behind by a crashed
+    run are recovered and committed the next time the channel is written.
+    """
+
+    def __init__(self, date_str, channel_name, max_records=None, max_bytes=None, flush_every=None):
+        self.channel_name = channel_name
+        self.directory = DATA_PATHS["raw_messages"] / date_str
+        self.max_records = max_records or SCRAPING_CONFIG["lake_max_records"]
+        self.max_bytes = max_bytes or SCRAPING_CONFIG["lake_max_bytes"]
+        self.flush_every = flush_every or SCRAPING_CONFIG["lake_flush_every"]
+
+        self.records_written = 0
+        self.committed_files = []
+
+        self._file = None
+        self._tmp_path = None
+        self._part = None
+        self._part_records = 0
+        self._part_bytes = 0
+
+    # --------------------------------------------------
+    # Context manager
+    # --------------------------------------------------
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Commit whatever was written even on failure: every line is a full record
+        self.close()
+        return False
+
+    def open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._recover_stale_parts()
+        self._part = self._next_part_number()
+
+    # --------------------------------------------------
+    # Writing
+    # --------------------------------------------------
+
+    def write(self, record):
+        if self._file is None:
+            self._start_part()
+
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        self._file.write(line)
+
+        self.records_written += 1
+        self._part_records += 1
+        self._part_bytes += len(line)
+
+        if self._part_records % self.flush_every == 0:
+            self._file.flush()
+
+        if self._part_records >= self.max_records or self._part_bytes >= self.max_bytes:
+            self._commit_part()
+
+    def close(self):
+        if self._file is not None:
+            self._commit_part()
+
+    # --------------------------------------------------
+    # Part files
+    # --------------------------------------------------
+
+    def _part_name(self, part):
+        return f"{self.channel_name}-{part:05d}.ndjson"
+
+    def _next_part_number(self):
+        pattern = re.compile(rf"^\.?{re.escape(self.channel_name)}-(\d+)\.ndjson(\.tmp)?$")
+        parts = [
+            int(m.group(1))
+            for p in self.directory.iterdir()
+            if (m := pattern.match(p.name))
+        ]
+        return max(parts, default=-1) + 1
+
+    def _start_part(self):
+        self._tmp_path = self.directory / f".{self._part_name(self._part)}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._part_records = 0
+        self._part_bytes = 0
+
+    def _commit_part(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        final_path = self.directory / self._part_name(self._part)
+        os.replace(self._tmp_path, final_path)
+        self.committed_files.append(final_path)
+        logger.info(f"Committed lake file: {final_path} ({self._part_records} records)")
+
+        self._file = None
+        self._tmp_path = None
+        self._part += 1
+
+    def _recover_stale_parts(self):
+        for tmp_path in self.directory.glob(f".{self.channel_name}-*.ndjson.tmp"):
+            with open(tmp_path, "rb+") as f:
+                data = f.read()
+                # Drop a trailing partial line left by a crash mid-write
+                complete = data[: data.rfind(b"\n") + 1]
+                f.seek(0)
+                f.truncate()
+                f.write(complete)
+
+            final_path = tmp_path.with_name(tmp_path.name[1:-len(".tmp")])
+            if complete:
+                os.replace(tmp_path, final_path)
+                logger.warning(f"Recovered uncommitted lake file: {final_path}")
+            else:
+                tmp_path.unlink()
+
+
+class TeeWriter:
+    """
+    Fan each record out to several writers (e.g. NDJSON lake + Parquet sink)
+    """
+
+    def __init__(self, *writers):
+        self.writers = writers
+
+    def write(self, record):
+        for writer in self.writers:
+            writer.write(record)
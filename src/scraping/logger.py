@@ -1,20 +1,202 @@
+"""
+Process-wide logging for the scrape and load hot paths.
+
+Log records are pushed onto an in-memory queue by a QueueHandler and written
+as JSON lines by a background QueueListener thread, so the asyncio event loop
+never blocks on disk I/O. `get_logger` only names and levels a logger;
+the file handler is attached to the root logger by `setup_logging`, which
+entry points and `run_scraper` call. Importing a module therefore never
+creates directories or opens the log; LOG_DIR moves the log elsewhere
+(the tests point it at a temporary directory).
+
+Per-message events go through ThrottledLogger and volume is reported by
+ScrapeMetrics as periodic aggregated counter lines instead of one line per item.
+"""
+
+import atexit
+import json
 import logging
-from pathlib import Path
+import queue
+import threading
+import time
+import weakref
+from collections import defaultdict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from src.config import LOGGING_CONFIG
+
+_queue_handler = None
+_listener = None
+_file_handler = None
+_setup_lock = threading.Lock()
+_throttled = weakref.WeakSet()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line; structured fields passed as extra={"fields": {...}} are merged in
+    """
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def setup_logging():
+    """
+    Start the background log writer once per process and route every logger
+    to it; later calls are no-ops
+    """
+    global _queue_handler, _listener, _file_handler
+
+    with _setup_lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        log_dir = LOGGING_CONFIG["log_dir"]
+        log_dir.mkdir(parents=True, exist_ok=True)
+
+        _file_handler = logging.FileHandler(log_dir / LOGGING_CONFIG["log_file"], encoding="utf-8")
+        _file_handler.setFormatter(JsonFormatter())
+
+        log_queue = queue.Queue(-1)
+        _listener = QueueListener(log_queue, _file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        _queue_handler = QueueHandler(log_queue)
+        logging.getLogger().addHandler(_queue_handler)
+        return _queue_handler
+
+
+def logging_configured():
+    return _queue_handler is not None
+
+
+def shutdown_logging():
+    """
+    Report pending throttled counts, drain the queue to disk and detach the
+    handler; a later `setup_logging` starts over
+    """
+    global _queue_handler, _listener, _file_handler
+
+    with _setup_lock:
+        if _queue_handler is None:
+            return
+
+        for throttled in list(_throttled):
+            throttled.flush()
+        _listener.stop()
+        _file_handler.close()
+        logging.getLogger().removeHandler(_queue_handler)
+        atexit.unregister(shutdown_logging)
+        _queue_handler = _listener = _file_handler = None
 
-LOG_DIR = Path("../data/logs")
-LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 def get_logger(name: str):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+    logger.setLevel(LOGGING_CONFIG["level"])
+    return logger
 
-    file_handler = logging.FileHandler(LOG_DIR / "scraper.log")
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-    )
-    file_handler.setFormatter(formatter)
 
-    if not logger.handlers:
-        logger.addHandler(file_handler)
+# --------------------------------------------------
+# Hot-path helpers
+# --------------------------------------------------
 
-    return logger
+class ThrottledLogger:
+    """
+    Emit at most one line per key every `interval` seconds.
+
+    Suppressed repeats are counted and reported on the next emitted line, so a
+    channel failing on every message logs a handful of lines, not thousands.
+    Counts with no later line are reported by `flush()`, which
+    `shutdown_logging` calls for every instance.
+    """
+
+    def __init__(self, logger, interval=None, clock=time.monotonic):
+        self.logger = logger
+        self.interval = LOGGING_CONFIG["throttle_seconds"] if interval is None else interval
+        self._clock = clock
+        self._last = {}
+        self._suppressed = defaultdict(int)
+        _throttled.add(self)
+
+    def log(self, level, key, message, **fields):
+        now = self._clock()
+        last = self._last.get(key)
+        if last is not None and now - last < self.interval:
+            self._suppressed[key] += 1
+            return False
+
+        self._last[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            fields["suppressed"] = suppressed
+
+        self.logger.log(level, message, extra={"fields": fields})
+        return True
+
+    def flush(self):
+        """
+        Emit one line per key with repeats suppressed since its last line
+        """
+        while self._suppressed:
+            key, suppressed = self._suppressed.popitem()
+            self.logger.warning(
+                f"Suppressed {suppressed} repeated lines | key={key}",
+                extra={"fields": {"key": key, "suppressed": suppressed}},
+            )
+
+    def error(self, key, message, **fields):
+        return self.log(logging.ERROR, key, message, **fields)
+
+    def warning(self, key, message, **fields):
+        return self.log(logging.WARNING, key, message, **fields)
+
+
+class ScrapeMetrics:
+    """
+    Per-channel counters (messages, images, bytes, errors) logged as one
+    aggregated line every `interval` seconds and once more on `report()`.
+    """
+
+    FIELDS = ("messages", "images", "bytes", "errors")
+
+    def __init__(self, logger, interval=None, clock=time.monotonic):
+        self.logger = logger
+        self.interval = LOGGING_CONFIG["metrics_interval_seconds"] if interval is None else interval
+        self._clock = clock
+        self._last_report = clock()
+        self.counters = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def incr(self, channel, **counts):
+        channel_counters = self.counters[channel]
+        for field, value in counts.items():
+            channel_counters[field] += value
+
+        if self._clock() - self._last_report >= self.interval:
+            self.report()
+
+    def totals(self):
+        return {
+            field: sum(c[field] for c in self.counters.values())
+            for field in self.FIELDS
+        }
+
+    def report(self):
+        self._last_report = self._clock()
+        self.logger.info(
+            "scrape metrics",
+            extra={"fields": {"totals": self.totals(), "channels": dict(self.counters)}},
+        )
@@ -0,0 +1,197 @@
+"""
+Optional columnar sink for the data lake.
+
+Messages are written as zstd-compressed Parquet, hive-partitioned by scrape
+date and channel:
+
+    data/lake/telegram_messages/date=YYYY-MM-DD/channel=<channel_name>/part-00000.parquet
+
+The schema mirrors the raw.telegram_messages columns used by
+scripts/load_raw_to_postgres.py. pyarrow is only needed when the sink is
+enabled (SCRAPER_PARQUET=true).
+"""
+
+from datetime import datetime
+from src.config import DATA_PATHS, SCRAPING_CONFIG
+from src.scraping.logger import get_logger
+import os
+import re
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = ds = pq = None
+
+logger = get_logger("ParquetSink")
+
+COMPRESSION = "zstd"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the Parquet lake sink (pip install pyarrow)")
+
+
+def message_schema():
+    _require_pyarrow()
+    return pa.schema([
+        ("message_id", pa.int64()),
+        ("channel_code", pa.string()),
+        ("channel_name", pa.string()),
+        ("message_date", pa.timestamp("us", tz="UTC")),
+        ("message_text", pa.string()),
+        ("has_media", pa.bool_()),
+        ("image_path", pa.string()),
+        ("views", pa.int64()),
+        ("forwards", pa.int64()),
+    ])
+
+
+def partition_dir(date_str, channel_name):
+    return DATA_PATHS["lake_parquet"] / f"date={date_str}" / f"channel={channel_name}"
+
+
+def _to_row(record, names):
+    row = {name: record.get(name) for name in names}
+    if row["message_date"]:
+        row["message_date"] = datetime.fromisoformat(row["message_date"])
+    row["has_media"] = bool(row["has_media"])
+    return row
+
+
+def _write_table_atomic(table, path):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        pq.write_table(table, f, compression=COMPRESSION)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ParquetSink:
+    """
+    Buffer records for one channel/day and write them as Parquet part files.
+
+    Used next to LakeWriter (see TeeWriter); a part is written every
+    `part_rows` records and on close.
+    """
+
+    def __init__(self, date_str, channel_name, part_rows=None):
+        _require_pyarrow()
+        self.directory = partition_dir(date_str, channel_name)
+        self.part_rows = part_rows or SCRAPING_CONFIG["parquet_part_rows"]
+        self.schema = message_schema()
+        self.committed_files = []
+        self._rows = []
+        self._part = None
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._part = _next_part_number(self.directory)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def write(self, record):
+        self._rows.append(_to_row(record, self.schema.names))
+        if len(self._rows) >= self.part_rows:
+            self._flush()
+
+    def close(self):
+        if self._rows:
+            self._flush()
+
+    def _flush(self):
+        table = pa.Table.from_pylist(self._rows, schema=self.schema)
+        path = self.directory / f"part-{self._part:05d}.parquet"
+        _write_table_atomic(table, path)
+
+        self.committed_files.append(path)
+        logger.info(f"Wrote Parquet part: {path} ({table.num_rows} rows)")
+        self._rows = []
+        self._part += 1
+
+
+def _next_part_number(directory):
+    pattern = re.compile(r"^part-(\d+)\.parquet$")
+    parts = [int(m.group(1)) for p in directory.iterdir() if (m := pattern.match(p.name))]
+    return max(parts, default=-1) + 1
+
+
+# --------------------------------------------------
+# Compaction
+# --------------------------------------------------
+
+def compact_partition(directory):
+    """
+    Merge all part files of one date/channel partition into a single file.
+
+    Rows are de-duplicated on message_id (the latest part wins, so refreshed
+    views/forwards are kept) and sorted by message_id. Returns the number of
+    files merged.
+
+    The merged file is committed under the next part number, so it outranks
+    every input, and only then are the inputs removed. A crash at any point
+    leaves either the inputs alone or the inputs plus a newer superset of
+    them; the next compaction resolves both correctly.
+    """
+    _require_pyarrow()
+    parts = sorted(directory.glob("part-*.parquet"))
+    if len(parts) < 2:
+        return 0
+
+    latest = {}
+    for part in parts:
+        for row in pq.read_table(part, schema=message_schema()).to_pylist():
+            latest[row["message_id"]] = row
+
+    rows = [latest[k] for k in sorted(latest)]
+    table = pa.Table.from_pylist(rows, schema=message_schema())
+
+    merged = directory / f"part-{_next_part_number(directory):05d}.parquet"
+    _write_table_atomic(table, merged)
+
+    for part in parts:
+        part.unlink()
+
+    # Renumber so the partition restarts at part-00000 and new parts follow it
+    compacted = directory / "part-00000.parquet"
+    os.replace(merged, compacted)
+
+    logger.info(f"Compacted {len(parts)} files into {compacted} ({table.num_rows} rows)")
+    return len(parts)
+
+
+def compact_lake(date_str=None, channel_name=None):
+    """
+    Compact every partition, optionally restricted to one date and/or channel
+    """
+    root = DATA_PATHS["lake_parquet"]
+    date_glob = f"date={date_str}" if date_str else "date=*"
+    channel_glob = f"channel={channel_name}" if channel_name else "channel=*"
+
+    merged = 0
+    for directory in sorted(root.glob(f"{date_glob}/{channel_glob}")):
+        merged += compact_partition(directory)
+    return merged
+
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+
+def message_dataset():
+    """
+    The lake as a pyarrow dataset, for column pruning and partition/predicate pushdown, e.g.
+
+        message_dataset().to_table(
+            columns=["message_id", "views"],
+            filter=(ds.field("date") >= "2026-01-01") & (ds.field("channel") == "CheMed123"),
+        )
+    """
+    _require_pyarrow()
+    return ds.dataset(DATA_PATHS["lake_parquet"], format="parquet", partitioning="hive")
@@ -0,0 +1,173 @@
+import asyncio
+import random
+import time
+
+from telethon.errors import FloodWaitError
+
+from src.config import SCRAPING_CONFIG
+from src.scraping.logger import get_logger
+
+logger = get_logger("RateLimit")
+
+# Errors worth retrying with backoff; anything else (disk errors included) is raised straight away
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, asyncio.TimeoutError)
+
+
+class RateLimiter:
+    """
+    Adaptive token bucket plus FloodWait-aware retry for Telethon calls.
+
+    One limiter is shared by every channel task on a client, since Telegram
+    rate-limits per account. The refill rate follows AIMD: it is halved on each
+    FloodWait and creeps back up by `rate_step` per successful call, so the
+    scraper settles near the highest throughput the account is allowed.
+    `clock` and `sleep` are injectable so the limiter can be tested without waiting.
+    """
+
+    def __init__(
+        self,
+        rate=None,
+        burst=None,
+        max_retries=None,
+        base_delay=None,
+        max_delay=None,
+        max_flood_wait=None,
+        page_size=100,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+    ):
+        self.max_rate = rate or SCRAPING_CONFIG["requests_per_second"]
+        self.min_rate = self.max_rate / 50
+        self.rate_step = self.max_rate / 20
+        self.rate = self.max_rate
+        self.burst = burst or SCRAPING_CONFIG["burst"]
+
+        self.max_retries = SCRAPING_CONFIG["max_retries"] if max_retries is None else max_retries
+        self.base_delay = SCRAPING_CONFIG["sleep_seconds"] if base_delay is None else base_delay
+        self.max_delay = max_delay or SCRAPING_CONFIG["max_backoff_seconds"]
+        self.max_flood_wait = max_flood_wait or SCRAPING_CONFIG["max_flood_wait_seconds"]
+        self.page_size = page_size
+
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+        self.flood_waits = 0
+        self.retries = 0
+
+    # --------------------------------------------------
+    # Token bucket
+    # --------------------------------------------------
+
+    async def acquire(self):
+        """
+        Take one token, sleeping until it is available.
+
+        Tokens are reserved before sleeping (the balance may go negative), so
+        concurrent callers queue up fairly without needing a lock.
+        """
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        self._tokens -= 1
+        if self._tokens < 0:
+            await self._sleep(-self._tokens / self.rate)
+
+    def _on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.rate_step)
+
+    async def _on_flood_wait(self, error, context):
+        self.flood_waits += 1
+        if error.seconds > self.max_flood_wait:
+            logger.error(f"FloodWait of {error.seconds}s exceeds limit | {context}")
+            raise error
+
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0)
+        logger.warning(
+            f"FloodWait {error.seconds}s | {context} | rate lowered to {self.rate:.2f} req/s"
+        )
+        await self._sleep(error.seconds + 1)
+
+    async def _on_transient(self, error, attempt, context):
+        if attempt > self.max_retries:
+            logger.error(f"Giving up after {self.max_retries} retries | {context} | {error}")
+            raise error
+
+        self.retries += 1
+        delay = self.backoff_delay(attempt)
+        logger.warning(f"Retry {attempt}/{self.max_retries} in {delay:.1f}s | {context} | {error}")
+        await self._sleep(delay)
+
+    def backoff_delay(self, attempt):
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    # --------------------------------------------------
+    # Wrapped client calls
+    # --------------------------------------------------
+
+    async def call(self, func, *args, **kwargs):
+        """
+        Await `func(*args, **kwargs)` under the rate limit, retrying on FloodWait and transient errors
+        """
+        context = getattr(func, "__name__", "call")
+        attempt = 0
+
+        while True:
+            await self.acquire()
+            try:
+                result = await func(*args, **kwargs)
+                self._on_success()
+                return result
+
+            except FloodWaitError as e:
+                await self._on_flood_wait(e, context)
+
+            except TRANSIENT_ERRORS as e:
+                attempt += 1
+                await self._on_transient(e, attempt, context)
+
+    async def iter_messages(self, client, entity, limit=None, **kwargs):
+        """
+        Rate-limited `client.iter_messages` that resumes after failures.
+
+        A token is taken per page of `page_size` messages. If a page fails the
+        iteration restarts with `offset_id` set to the last message yielded, so
+        nothing is skipped or yielded twice.
+        """
+        yielded = 0
+        offset_id = kwargs.pop("offset_id", 0)
+        attempt = 0
+
+        while limit is None or yielded < limit:
+            remaining = None if limit is None else limit - yielded
+            await self.acquire()
+
+            try:
+                in_page = 0
+                async for message in client.iter_messages(
+                    entity, limit=remaining, offset_id=offset_id, **kwargs
+                ):
+                    yield message
+                    yielded += 1
+                    offset_id = message.id
+                    attempt = 0
+
+                    in_page += 1
+                    if in_page >= self.page_size:
+                        self._on_success()
+                        await self.acquire()
+                        in_page = 0
+
+                self._on_success()
+                return
+
+            except FloodWaitError as e:
+                await self._on_flood_wait(e, f"iter_messages {entity} after id={offset_id}")
+
+            except TRANSIENT_ERRORS as e:
+                attempt += 1
+                await self._on_transient(e, attempt, f"iter_messages {entity} after id={offset_id}")
@@ -1,82 +1,269 @@
 import asyncio
-from datetime import datetime
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
 from tqdm import tqdm
 from telethon.tl.types import MessageMediaPhoto
 
 from src.config import TELEGRAM_CHANNELS, SCRAPING_CONFIG
-from src.telegram_client import create_client
-from src.storage import save_json, save_image
-from src.logger import get_logger
+from src.scraping.telegram_client import create_client
+from src.scraping.image_store import lookup as lookup_image
+from src.scraping.lake_writer import LakeWriter, TeeWriter
+from src.scraping.parquet_sink import ParquetSink
+from src.scraping.downloads import PhotoDownloadPool
+from src.scraping.rate_limit import RateLimiter
+from src.scraping.checkpoints import get_checkpoint, save_checkpoint
+from src.scraping.logger import get_logger, setup_logging, ThrottledLogger, ScrapeMetrics
 
 logger = get_logger("Scraper")
+throttled = ThrottledLogger(logger)
 
 
-async def scrape_channel(client, channel_code, channel_username):
+def _incremental_window(channel_username):
     """
-    Scrape messages from a single Telegram channel
+    Return (min_id, last_id, cutoff) for an incremental scrape.
+
+    Without a look-back window only messages above the checkpoint are fetched
+    (min_id). With one, iteration also covers already-scraped posts newer than
+    the cutoff date so their views/forwards get refreshed.
     """
-    records = []
+    if not SCRAPING_CONFIG["incremental"]:
+        return 0, 0, None
+
+    checkpoint = get_checkpoint(channel_username)
+    if not checkpoint:
+        return 0, 0, None
+
+    last_id = checkpoint["message_id"]
+    lookback_days = SCRAPING_CONFIG["lookback_days"]
+    if lookback_days <= 0:
+        return last_id, last_id, None
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=lookback_days)
+    return 0, last_id, cutoff
+
+
+def _note_failure(summary, message_id):
+    if summary["min_failed_id"] is None or message_id < summary["min_failed_id"]:
+        summary["min_failed_id"] = message_id
+
+
+async def scrape_channel(
+    client, channel_code, channel_username, writer, progress=None, limiter=None, metrics=None
+):
+    """
+    Scrape messages from a single Telegram channel, streaming each record to `writer`
+
+    Photos are handed to a PhotoDownloadPool so iteration never waits on a
+    download. All client calls go through `limiter`, which should be shared by
+    every channel on the same client, and volume is counted in `metrics`
+    rather than logged per message. Returns a summary with message/image/error counts, the newest
+    message seen and the oldest one that failed.
+    """
+    summary = {
+        "messages": 0, "images": 0, "errors": 0,
+        "max_message_id": 0, "max_message_date": None, "min_failed_id": None,
+    }
     limit = SCRAPING_CONFIG["max_messages_per_channel"] or None
+    limiter = limiter or RateLimiter()
+    metrics = metrics or ScrapeMetrics(logger)
+    min_id, last_id, cutoff = _incremental_window(channel_username)
+
+    if last_id:
+        logger.info(
+            f"Incremental scrape | channel={channel_username} | after={last_id} | lookback_cutoff={cutoff}"
+        )
+
+    async with PhotoDownloadPool(client, writer, limiter, metrics) as downloads:
+        async for message in limiter.iter_messages(
+            client, channel_username, limit=limit, min_id=min_id
+        ):
+            # Past the checkpoint and outside the look-back window: nothing left to refresh
+            if cutoff and message.id <= last_id and message.date and message.date < cutoff:
+                break
 
-    async for message in client.iter_messages(channel_username, limit=limit):
-        try:
-            record = {
-                "message_id": message.id,
-                "channel_code": channel_code,
-                "channel_name": channel_username,
-                "message_date": message.date.isoformat() if message.date else None,
-                "message_text": message.text,
-                "views": message.views,
-                "forwards": message.forwards,
-                "has_media": bool(message.media),
-                "image_path": None,
-            }
-
-            # If message has an image, save it
-            if isinstance(message.media, MessageMediaPhoto):
-                image_bytes = await client.download_media(message.media, file=bytes)
-                record["image_path"] = save_image(
-                    image_bytes, channel_username, message.id
+            try:
+                record = {
+                    "message_id": message.id,
+                    "channel_code": channel_code,
+                    "channel_name": channel_username,
+                    "message_date": message.date.isoformat() if message.date else None,
+                    "message_text": message.text,
+                    "views": message.views,
+                    "forwards": message.forwards,
+                    "has_media": bool(message.media),
+                    "image_path": None,
+                }
+
+                if message.id > summary["max_message_id"]:
+                    summary["max_message_id"] = message.id
+                    summary["max_message_date"] = record["message_date"]
+                summary["messages"] += 1
+                metrics.incr(channel_username, messages=1)
+
+                # If message has an image, queue it (refreshed posts keep the file we already have)
+                if isinstance(message.media, MessageMediaPhoto):
+                    existing = lookup_image(channel_username, message.id) if message.id <= last_id else None
+                    if existing:
+                        record["image_path"] = existing
+                    else:
+                        # The pool writes the record once the photo is on disk
+                        await downloads.submit(record, message.media)
+                        continue
+
+                writer.write(record)
+
+            except Exception as e:
+                summary["errors"] += 1
+                metrics.incr(channel_username, errors=1)
+                _note_failure(summary, message.id)
+                throttled.error(
+                    f"message:{channel_username}",
+                    f"Failed message | channel={channel_username} | id={message.id} | {e}",
+                    channel=channel_username,
+                    message_id=message.id,
                 )
 
-            records.append(record)
+            finally:
+                if progress is not None:
+                    progress.update(1)
 
-        except Exception as e:
-            logger.error(
-                f"Failed message | channel={channel_username} | id={message.id} | {e}"
+    summary["images"] = downloads.downloaded
+    summary["errors"] += downloads.errors
+    if downloads.min_failed_id is not None:
+        _note_failure(summary, downloads.min_failed_id)
+
+    logger.info(f"Scraped {summary['messages']} messages from {channel_username}")
+    return summary
+
+
+async def scrape_and_save_channel(
+    client, channel_code, channel_username, date_str, progress=None, limiter=None, metrics=None
+):
+    """
+    Scrape a single channel and persist it to the data lake.
+
+    Returns the channel status: SUCCESS, PARTIAL_FAILURE or FAILED.
+    """
+    try:
+        logger.info(f"Starting scrape for channel: {channel_username}")
+        with ExitStack() as stack:
+            writer = stack.enter_context(LakeWriter(date_str, channel_username))
+            if SCRAPING_CONFIG["parquet_sink"]:
+                writer = TeeWriter(
+                    writer, stack.enter_context(ParquetSink(date_str, channel_username))
+                )
+
+            summary = await scrape_channel(
+                client, channel_code, channel_username, writer, progress, limiter, metrics
+            )
+
+        # Records are committed to the lake at this point, so the checkpoint can advance,
+        # but only to just below the oldest failed message so the next run refetches it
+        checkpoint_id, checkpoint_date = summary["max_message_id"], summary["max_message_date"]
+        if summary["min_failed_id"] is not None and summary["min_failed_id"] <= checkpoint_id:
+            checkpoint_id, checkpoint_date = summary["min_failed_id"] - 1, None
+        if checkpoint_id > 0:
+            save_checkpoint(channel_username, checkpoint_id, checkpoint_date)
+
+        if not summary["errors"]:
+            logger.info(f"Channel SUCCESS: {channel_username}")
+            return "SUCCESS"
+
+        logger.warning(f"Channel PARTIAL FAILURE: {channel_username}")
+        return "PARTIAL_FAILURE"
+
+    except Exception as e:
+        logger.error(f"Channel scrape FAILED: {channel_username} | {e}")
+        return "FAILED"
+
+
+async def _scrape_sequential(client, channels, date_str, message_bar, limiter, metrics):
+    results = {}
+    for code, username in tqdm(channels.items(), desc="Channels"):
+        results[username] = await scrape_and_save_channel(
+            client, code, username, date_str, message_bar, limiter, metrics
+        )
+    return results
+
+
+async def _scrape_concurrent(client, channels, date_str, message_bar, limiter, metrics):
+    """
+    Scrape all channels as asyncio tasks sharing one Telethon client,
+    with at most `max_concurrent_channels` channels in flight.
+    """
+    semaphore = asyncio.Semaphore(max(1, SCRAPING_CONFIG["max_concurrent_channels"]))
+
+    async def _bounded(code, username):
+        async with semaphore:
+            status = await scrape_and_save_channel(
+                client, code, username, date_str, message_bar, limiter, metrics
             )
+        return username, status
+
+    tasks = [
+        asyncio.create_task(_bounded(code, username))
+        for code, username in channels.items()
+    ]
+
+    results = {}
+    with tqdm(total=len(tasks), desc="Channels") as channel_bar:
+        for finished in asyncio.as_completed(tasks):
+            username, status = await finished
+            results[username] = status
+            channel_bar.set_postfix_str(f"{username}={status}")
+            channel_bar.update(1)
 
-    logger.info(f"Scraped {len(records)} messages from {channel_username}")
-    return records
+    return results
 
 
-async def run_scraper():
+async def run_scraper(channels=None, concurrent=None, client=None):
     """
     Main scraper function
+
+    Channels are scraped concurrently unless `concurrent` (or
+    SCRAPING_CONFIG["concurrent"]) is False. `client` defaults to a live
+    Telethon client; tests and benchmarks pass a FakeTelegramClient.
+    Starts the JSON-lines log writer if the caller has not.
     """
-    client = create_client()
+    setup_logging()
+    channels = channels or TELEGRAM_CHANNELS
+    if concurrent is None:
+        concurrent = SCRAPING_CONFIG["concurrent"]
+
+    client = client or create_client()
+    limiter = RateLimiter()
+    metrics = ScrapeMetrics(logger)
     today = datetime.utcnow().strftime("%Y-%m-%d")
 
     try:
         await client.start()
-        logger.info("Telegram scraper started")
+        logger.info(
+            f"Telegram scraper started | channels={len(channels)} | concurrent={concurrent}"
+        )
 
-        for code, username in tqdm(TELEGRAM_CHANNELS.items(), desc="Channels"):
-            try:
-                logger.info(f"Starting scrape for channel: {username}")
-                data = await scrape_channel(client, code, username)
-                success = save_json(data, today, username)
+        with tqdm(desc="Messages", unit="msg") as message_bar:
+            if concurrent:
+                results = await _scrape_concurrent(
+                    client, channels, today, message_bar, limiter, metrics
+                )
+            else:
+                results = await _scrape_sequential(
+                    client, channels, today, message_bar, limiter, metrics
+                )
+        metrics.report()
 
-                if success:
-                    logger.info(f"Channel SUCCESS: {username}")
-                else:
-                    logger.warning(f"Channel PARTIAL FAILURE: {username}")
+        logger.info(
+            f"Rate limiter | flood_waits={limiter.flood_waits} | retries={limiter.retries} "
+            f"| final_rate={limiter.rate:.2f} req/s"
+        )
 
-            except Exception as e:
-                logger.error(f"Channel scrape FAILED: {username} | {e}")
+        failed = [name for name, status in results.items() if status != "SUCCESS"]
+        if failed:
+            logger.warning(f"Channels not fully scraped: {', '.join(failed)}")
+            return {"status": "PARTIAL_FAILURE", "channels": results}
 
         logger.info("All channels scraped successfully")
-        return {"status": "SUCCESS"}
+        return {"status": "SUCCESS", "channels": results}
 
     except Exception as e:
         logger.critical(f"Scraping pipeline FAILED completely: {e}")
@@ -1,40 +1,44 @@
 from pathlib import Path
-from src.config import DATA_PATHS
-from src.logger import get_logger
+from src.scraping.logger import get_logger
+from src.scraping.image_store import store_bytes
 import json
 
 logger = get_logger("Storage")
 
-def save_json(data, date_str, channel_name):
-    try:
-        # Use path from config
-        path = DATA_PATHS["raw_messages"] / date_str
-        path.mkdir(parents=True, exist_ok=True)
-
-        file_path = path / f"{channel_name}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        logger.info(f"Saved JSON: {file_path}")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to save JSON for {channel_name}: {e}")
-        return False
+def list_lake_files(base_path: Path):
+    """
+    Committed message files under base_path: legacy `.json` arrays and streamed `.ndjson` parts
+    """
+    return sorted(
+        p for p in base_path.rglob("*")
+        if p.suffix in (".json", ".ndjson") and not p.name.startswith(".")
+    )
+
+
+def iter_records(file_path: Path):
+    """
+    Yield message records from a lake file in either format
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        if file_path.suffix == ".ndjson":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
 
 
 def save_image(image_bytes, channel_name, message_id):
-    try:
-        # Use path from config
-        path = DATA_PATHS["raw_images"] / channel_name
-        path.mkdir(parents=True, exist_ok=True)
+    """
+    Save an image to the content-addressed store and return its canonical blob path.
 
-        image_path = path / f"{message_id}.jpg"
-        with open(image_path, "wb") as f:
-            f.write(image_bytes)
+    Byte-identical reposts resolve to the same blob and are not written again.
+    """
+    try:
+        image_path = store_bytes(image_bytes, channel_name, message_id)
 
-        logger.info(f"Saved image: {image_path}")
-        return str(image_path)
+        logger.debug(f"Saved image: {image_path}")
+        return image_path
 
     except Exception as e:
         logger.error(f"Failed to save image {message_id}: {e}")
@@ -1,6 +1,6 @@
 from telethon import TelegramClient
 from src.config import TELEGRAM_CONFIG
-from src.logger import get_logger
+from src.scraping.logger import get_logger
 
 logger = get_logger("TelegramClient")
 
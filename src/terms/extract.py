@@ -0,0 +1,76 @@
+"""
+Vectorized product-term extraction.
+
+A batch of messages is tokenized with pandas string methods, exploded to one
+row per token, and turned into 1..max_ngram-grams by shifting the token column
+within each message. Every n-gram is looked up in the lexicon with one
+`Series.map`; where a multi-word match covers a shorter one ("vitamin c" vs
+"vitamin") only the longest is kept.
+"""
+
+import pandas as pd
+
+from .lexicon import Lexicon, normalize_text
+
+TERM_COLUMNS = ("channel_name", "message_id", "term", "mention_count")
+
+
+def _ngrams(tokens: pd.DataFrame, max_ngram: int) -> pd.DataFrame:
+    """
+    (row, pos, n, gram) for every n-gram of up to `max_ngram` tokens
+    """
+    by_message = tokens.groupby("row", sort=False)["token"]
+    frames = []
+    gram = tokens["token"]
+    for n in range(1, max_ngram + 1):
+        if n > 1:
+            # NaN past the end of a message, so n-grams never span two messages
+            gram = gram + " " + by_message.shift(-(n - 1))
+        frames.append(pd.DataFrame({"row": tokens["row"], "pos": tokens["pos"], "n": n, "gram": gram}).dropna())
+    return pd.concat(frames, ignore_index=True)
+
+
+def _drop_covered(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Remove matches lying inside a longer match of the same message
+    """
+    longer = matches[matches["n"] > 1]
+    if longer.empty:
+        return matches
+
+    pairs = matches.reset_index().merge(longer, on="row", suffixes=("", "_long"))
+    covered = pairs[
+        (pairs["n_long"] > pairs["n"])
+        & (pairs["pos_long"] <= pairs["pos"])
+        & (pairs["pos"] + pairs["n"] <= pairs["pos_long"] + pairs["n_long"])
+    ]["index"].unique()
+    return matches.drop(index=covered)
+
+
+def extract_terms(messages: pd.DataFrame, lexicon: Lexicon) -> pd.DataFrame:
+    """
+    One row per (message, term) with the number of mentions, for a frame with
+    channel_name, message_id and message_text columns
+    """
+    messages = messages.reset_index(drop=True)
+    tokens = (
+        normalize_text(messages["message_text"])
+        .str.split()
+        .explode()
+        .dropna()
+        .rename("token")
+        .rename_axis("row")
+        .reset_index()
+    )
+    if tokens.empty:
+        return pd.DataFrame(columns=TERM_COLUMNS)
+
+    tokens["pos"] = tokens.groupby("row", sort=False).cumcount()
+
+    grams = _ngrams(tokens, lexicon.max_ngram)
+    grams["term"] = grams["gram"].map(lexicon.variants)
+    matches = _drop_covered(grams.dropna(subset=["term"]))
+
+    counts = matches.groupby(["row", "term"]).size().rename("mention_count").reset_index()
+    counts = counts.join(messages[["channel_name", "message_id"]], on="row")
+    return counts[list(TERM_COLUMNS)].reset_index(drop=True)
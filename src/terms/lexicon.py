@@ -0,0 +1,75 @@
+"""
+Product lexicon for term extraction.
+
+The lexicon is a CSV of `variant,term` pairs mapping every spelling, brand
+name or Amharic form of a product to one canonical term, e.g.
+
+    panadol,paracetamol
+    ፓራሲታሞል,paracetamol
+    vitamin c,vitamin c
+
+Variants may span several words; the extractor matches n-grams up to the
+longest variant. Variants go through the same `normalize_text` as messages, so
+the file is case- and punctuation-insensitive.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+from src.config import TERMS_CONFIG
+
+# Anything but letters/digits separates tokens; Ethiopic letters count as \w,
+# its punctuation (፡ ። ፣ ...) does not
+_SEPARATORS = r"[\W_]+"
+
+
+def normalize_text(texts: pd.Series) -> pd.Series:
+    """
+    NFKC, casefolded, punctuation collapsed to single spaces
+    """
+    # object dtype keeps Python's Unicode-aware re; Arrow-backed strings treat \W as ASCII only
+    return (
+        texts.fillna("")
+        .astype(str)
+        .astype(object)
+        .str.normalize("NFKC")
+        .str.casefold()
+        .str.replace(_SEPARATORS, " ", regex=True)
+        .str.strip()
+    )
+
+
+class Lexicon(NamedTuple):
+    variants: dict
+    max_ngram: int
+    version: str
+
+
+def load_lexicon(path=None) -> Lexicon:
+    path = Path(path or TERMS_CONFIG["lexicon"])
+    raw = path.read_bytes()
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    missing = {"variant", "term"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns {sorted(missing)}")
+
+    variants = normalize_text(frame["variant"])
+    terms = frame["term"].str.strip().str.casefold()
+    keep = variants.ne("") & terms.ne("")
+    mapping = dict(zip(variants[keep], terms[keep]))
+
+    conflicts = (
+        pd.DataFrame({"variant": variants[keep], "term": terms[keep]})
+        .groupby("variant")["term"].nunique()
+    )
+    if (conflicts > 1).any():
+        raise ValueError(f"{path} maps {sorted(conflicts[conflicts > 1].index)} to more than one term")
+
+    max_ngram = max((len(v.split()) for v in mapping), default=1)
+    # Changing the lexicon re-extracts every message under the new version
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    return Lexicon(mapping, max_ngram, version)
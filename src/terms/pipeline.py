@@ -0,0 +1,155 @@
+"""
+Term extraction stage: raw.telegram_messages -> raw.message_terms.
+
+Only messages without an extraction under the current lexicon version are
+read (raw.message_terms_state remembers what was processed), through a
+server-side cursor in batches of `batch_size`. Each batch replaces its
+messages' terms and marks them processed in one transaction, so an
+interrupted run resumes after the last committed batch.
+
+dbt builds marts.fct_message_terms and marts.agg_term_frequency from the
+raw table.
+"""
+
+import io
+import time
+
+import pandas as pd
+import psycopg2
+
+from src.config import DATABASE_CONFIG, LOGGING_CONFIG, TERMS_CONFIG
+from src.scraping.logger import get_logger
+from .extract import TERM_COLUMNS, extract_terms
+from .lexicon import load_lexicon
+
+logger = get_logger("TermExtraction")
+
+
+def create_term_tables(conn):
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS raw;")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS raw.message_terms (
+                channel_name TEXT NOT NULL,
+                message_id BIGINT NOT NULL,
+                term TEXT NOT NULL,
+                mention_count INTEGER NOT NULL,
+                lexicon_version TEXT NOT NULL,
+                extracted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS message_terms_message_idx
+            ON raw.message_terms (channel_name, message_id);
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS raw.message_terms_state (
+                channel_name TEXT NOT NULL,
+                message_id BIGINT NOT NULL,
+                lexicon_version TEXT NOT NULL,
+                extracted_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (channel_name, message_id)
+            );
+        """)
+    conn.commit()
+
+
+def _pending_messages_sql(full):
+    if full:
+        return """
+            SELECT channel_name, message_id, message_text
+            FROM raw.telegram_messages
+            WHERE message_text IS NOT NULL
+        """
+    return """
+        SELECT m.channel_name, m.message_id, m.message_text
+        FROM raw.telegram_messages m
+        LEFT JOIN raw.message_terms_state s
+          ON s.channel_name = m.channel_name
+         AND s.message_id = m.message_id
+         AND s.lexicon_version = %(version)s
+        WHERE m.message_text IS NOT NULL
+          AND s.message_id IS NULL
+    """
+
+
+def write_terms(conn, messages: pd.DataFrame, terms: pd.DataFrame, version):
+    """
+    Replace the terms of every message in `messages` and mark them processed
+    """
+    keys = (messages["channel_name"].tolist(), messages["message_id"].tolist())
+
+    buffer = io.StringIO()
+    terms.assign(lexicon_version=version).to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                DELETE FROM raw.message_terms t
+                USING unnest(%s::text[], %s::bigint[]) AS k(channel_name, message_id)
+                WHERE t.channel_name = k.channel_name AND t.message_id = k.message_id
+            """, keys)
+            cur.copy_expert(
+                f"COPY raw.message_terms ({', '.join(TERM_COLUMNS)}, lexicon_version) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+            cur.execute("""
+                INSERT INTO raw.message_terms_state (channel_name, message_id, lexicon_version)
+                SELECT channel_name, message_id, %s
+                FROM unnest(%s::text[], %s::bigint[]) AS k(channel_name, message_id)
+                ON CONFLICT (channel_name, message_id) DO UPDATE SET
+                    lexicon_version = EXCLUDED.lexicon_version,
+                    extracted_at = now()
+            """, (version, *keys))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def run_term_extraction(batch_size: int = None, full: bool = False, lexicon=None):
+    """
+    Extract product terms from messages not yet processed under the current
+    lexicon (every message with `full`). Returns a summary dict.
+    """
+    batch_size = batch_size or TERMS_CONFIG["batch_size"]
+    lexicon = lexicon or load_lexicon()
+    summary = {"messages": 0, "with_terms": 0, "terms": 0, "lexicon_version": lexicon.version}
+    last_report = time.monotonic()
+
+    # The reader keeps its cursor open while the writer commits each batch
+    reader = psycopg2.connect(**DATABASE_CONFIG)
+    writer = psycopg2.connect(**DATABASE_CONFIG)
+    try:
+        create_term_tables(writer)
+
+        with reader.cursor(name="pending_messages") as cur:
+            cur.itersize = batch_size
+            cur.execute(_pending_messages_sql(full), {"version": lexicon.version})
+
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+
+                messages = pd.DataFrame(rows, columns=["channel_name", "message_id", "message_text"])
+                terms = extract_terms(messages, lexicon)
+                write_terms(writer, messages, terms, lexicon.version)
+
+                summary["messages"] += len(messages)
+                summary["with_terms"] += terms[["channel_name", "message_id"]].drop_duplicates().shape[0]
+                summary["terms"] += len(terms)
+
+                if time.monotonic() - last_report >= LOGGING_CONFIG["metrics_interval_seconds"]:
+                    last_report = time.monotonic()
+                    logger.info("term extraction progress", extra={"fields": dict(summary)})
+    finally:
+        reader.close()
+        writer.close()
+
+    logger.info(
+        f"Extracted {summary['terms']} terms from {summary['messages']} messages "
+        f"(lexicon {lexicon.version})"
+    )
+    return summary
@@ -0,0 +1,143 @@
+"""
+Inference backends for the YOLO detector.
+
+    torch     the .pt weights as-is (default)
+    onnx      ONNX Runtime, exported once from the .pt weights
+    openvino  OpenVINO IR, optionally INT8-quantized (YOLO_INT8=true)
+
+Exports are written next to the weights by ultralytics and reused on later
+runs. Every backend is loaded through `ultralytics.YOLO`, so results expose
+the same `names`/`boxes` and the detector produces identical
+(label, confidence) tuples for `classify_image` whichever backend runs.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.config import YOLO_CONFIG
+from src.scraping.logger import get_logger
+
+logger = get_logger("YoloBackends")
+
+BACKENDS = ("torch", "onnx", "openvino")
+
+
+def _export_path(backend, weights, int8):
+    weights = Path(weights)
+    if backend == "onnx":
+        return weights.with_suffix(".onnx")
+    suffix = "_int8_openvino_model" if int8 else "_openvino_model"
+    return weights.with_name(f"{weights.stem}{suffix}")
+
+
+def ensure_exported(backend=None, weights=None, int8=None):
+    """
+    Path of the weights for `backend`, exporting them from the .pt file on first use
+    """
+    backend = backend or YOLO_CONFIG["backend"]
+    weights = weights or YOLO_CONFIG["model"]
+    int8 = YOLO_CONFIG["int8"] if int8 is None else int8
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown YOLO backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    if backend == "torch":
+        return str(weights)
+
+    path = _export_path(backend, weights, int8)
+    if path.exists():
+        return str(path)
+
+    from ultralytics import YOLO
+
+    logger.info(f"Exporting {weights} to {backend}{' (INT8)' if int8 else ''}")
+    # dynamic axes so the detector can feed whole batches
+    exported = YOLO(weights).export(
+        format=backend,
+        imgsz=YOLO_CONFIG["imgsz"],
+        dynamic=True,
+        int8=int8 and backend == "openvino",
+    )
+    return str(exported)
+
+
+def load_model(backend=None):
+    """
+    The ultralytics model for `backend`, with the thread limit set by
+    `limit_threads` applied to its ONNX Runtime session / OpenVINO core
+    """
+    from ultralytics import YOLO
+
+    backend = backend or YOLO_CONFIG["backend"]
+    model = YOLO(ensure_exported(backend), task="detect")
+
+    threads = _thread_limit["threads"]
+    if threads and backend != "torch":
+        import numpy as np
+
+        # ultralytics builds the session on the first prediction, so warm up while
+        # the limit is in place; later calls reuse the same session
+        with _session_threads(backend, threads):
+            model(np.zeros((YOLO_CONFIG["imgsz"], YOLO_CONFIG["imgsz"], 3), dtype=np.uint8),
+                  imgsz=YOLO_CONFIG["imgsz"], verbose=False)
+    return model
+
+
+_thread_limit = {"threads": None}
+
+
+def limit_threads(backend, threads):
+    """
+    Cap the intra-op threads of `backend` in this process, so `workers`
+    processes x `threads` never oversubscribe the CPU. Call before the model
+    is loaded.
+
+    torch takes the limit process-wide; for ONNX Runtime and OpenVINO it is
+    applied by `load_model`.
+    """
+    _thread_limit["threads"] = threads
+
+    if backend == "torch":
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+@contextmanager
+def _session_threads(backend, threads):
+    """
+    Apply `threads` to ONNX Runtime sessions / OpenVINO cores created inside the block.
+
+    ultralytics constructs both itself and takes no session options, so their
+    constructors are wrapped for the duration of the model load only.
+    """
+    if backend == "onnx":
+        import onnxruntime
+
+        cls = onnxruntime.InferenceSession
+        original = cls.__init__
+
+        def __init__(self, path_or_bytes, sess_options=None, *args, **kwargs):
+            sess_options = sess_options or onnxruntime.SessionOptions()
+            sess_options.intra_op_num_threads = threads
+            sess_options.inter_op_num_threads = 1
+            original(self, path_or_bytes, sess_options, *args, **kwargs)
+
+    elif backend == "openvino":
+        import openvino
+
+        cls = openvino.Core
+        original = cls.__init__
+
+        def __init__(self, *args, **kwargs):
+            original(self, *args, **kwargs)
+            self.set_property("CPU", {"INFERENCE_NUM_THREADS": threads})
+
+    else:
+        yield
+        return
+
+    cls.__init__ = __init__
+    try:
+        yield
+    finally:
+        cls.__init__ = original
@@ -0,0 +1,109 @@
+"""
+Batched input for YOLO inference.
+
+Images are decoded and letterboxed on a small thread pool (OpenCV releases
+the GIL) while the model runs on the previous batch, so inference never
+waits on JPEG decoding. Letterboxing to the inference size up front makes
+every image in a batch the same shape and leaves ultralytics' own
+preprocessing with nothing to resize.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from src.config import YOLO_CONFIG
+from src.scraping.logger import get_logger
+from src.yolo.phash import dhash
+
+try:
+    import cv2
+    from ultralytics.data.augment import LetterBox
+except ImportError:  # only needed when running inference
+    cv2 = LetterBox = None
+
+logger = get_logger("YoloBatching")
+
+
+def load_letterboxed(image_path, imgsz=None):
+    """
+    BGR array letterboxed to imgsz x imgsz, or None if the file cannot be decoded
+    """
+    imgsz = imgsz or YOLO_CONFIG["imgsz"]
+    image = cv2.imread(str(image_path))
+    if image is None:
+        return None
+    return LetterBox(new_shape=(imgsz, imgsz), auto=False)(image=image)
+
+
+def load_with_phash(image_path, imgsz=None):
+    """
+    (letterboxed image, dHash of the original) from a single decode, or None
+    """
+    image = cv2.imread(str(image_path))
+    if image is None:
+        return None
+    imgsz = imgsz or YOLO_CONFIG["imgsz"]
+    return LetterBox(new_shape=(imgsz, imgsz), auto=False)(image=image), dhash(image)
+
+
+def chunked(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def bounded_map(pool, fn, items, window):
+    """
+    `pool.map(fn, items)` with at most `window` tasks in flight.
+
+    `items` is consumed only as results are taken, and results come back in
+    input order, so memory stays bounded and the caller sees each result as
+    soon as it and everything before it are done.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_batches(items, load, batch_size=None, workers=None, prefetch=2):
+    """
+    Yield (items, loaded) batches, loading up to `prefetch` batches ahead on a thread pool.
+
+    `items` are (image_path, ...) tuples; `load(image_path)` returning None
+    drops the item from its batch (e.g. a corrupt JPEG).
+    """
+    batch_size = batch_size or YOLO_CONFIG["batch_size"]
+    workers = workers or YOLO_CONFIG["prefetch_workers"]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yolo-prefetch") as pool:
+        pending = deque()
+        chunks = chunked(items, batch_size)
+
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append((chunk, [pool.submit(load, item[0]) for item in chunk]))
+
+        for _ in range(prefetch):
+            submit_next()
+
+        while pending:
+            chunk, futures = pending.popleft()
+            submit_next()
+
+            batch_items, loaded = [], []
+            for item, future in zip(chunk, futures):
+                image = future.result()
+                if image is None:
+                    logger.warning(f"Skipping unreadable image: {item[0]}")
+                    continue
+                batch_items.append(item)
+                loaded.append(image)
+
+            if batch_items:
+                yield batch_items, loaded
@@ -0,0 +1,209 @@
+"""
+Persistent YOLO detection cache.
+
+Raw detections (label, confidence) are stored in SQLite keyed by
+(image sha256, model key). The model key covers the model version, a hash of
+the weights file, the inference backend and thresholds, so changing any of them makes
+every image a cache miss for the new key while the old entries stay
+available until pruned.
+
+`classify_image` is applied when rows are rebuilt from the cache, so changing
+the category rules never needs re-inference.
+
+A second table remembers the sha256 of legacy image files by
+(path, size, mtime), so unchanged files are not re-hashed every run.
+
+Entries also keep the image's dHash (see src/yolo/phash.py) and, for near
+duplicates, the image_hash whose detections were reused.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from src.config import DATA_PATHS, YOLO_CONFIG
+from src.scraping.image_store import file_sha256, is_blob
+
+
+def model_key():
+    """
+    Identity of the current model configuration: version, weights hash, backend and thresholds
+    """
+    weights = Path(YOLO_CONFIG["model"])
+    # Weights that ultralytics downloads on first use are identified by name only
+    weights_id = file_sha256(weights)[:12] if weights.exists() else weights.name
+    backend = YOLO_CONFIG["backend"]
+    if backend == "openvino" and YOLO_CONFIG["int8"]:
+        backend += "-int8"
+    return (
+        f"{YOLO_CONFIG['model_version']}:{weights_id}:{backend}"
+        f":conf={YOLO_CONFIG['conf']}:iou={YOLO_CONFIG['iou']}:imgsz={YOLO_CONFIG['imgsz']}"
+    )
+
+
+def _connect(path=None):
+    path = Path(path or DATA_PATHS["detection_cache"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS detections (
+            image_hash TEXT NOT NULL,
+            model_key TEXT NOT NULL,
+            objects TEXT NOT NULL,
+            created_at TEXT,
+            phash TEXT,
+            reused_from TEXT,
+            PRIMARY KEY (image_hash, model_key)
+        )
+    """)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(detections)")}
+    for column in ("phash", "reused_from"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE detections ADD COLUMN {column} TEXT")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS file_hashes (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+class CachedDetections(NamedTuple):
+    objects: list
+    reused_from: str = None
+
+
+class DetectionCache:
+    """
+    Detection cache for one model key; writes are committed on close.
+    """
+
+    def __init__(self, path=None, key=None):
+        self.path = path
+        self.key = key or model_key()
+        self.hits = 0
+        self.misses = 0
+        self._conn = _connect(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+    def image_hash(self, image_path):
+        image_path = Path(image_path)
+        if is_blob(image_path):
+            return image_path.stem
+
+        stat = image_path.stat()
+        row = self._conn.execute(
+            "SELECT sha256 FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (str(image_path), stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return row[0]
+
+        sha256 = file_sha256(image_path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+            (str(image_path), stat.st_size, stat.st_mtime_ns, sha256),
+        )
+        return sha256
+
+    def get(self, image_hash):
+        """
+        CachedDetections([(label, confidence), ...], reused_from) for an image, or None on a miss
+        """
+        row = self._conn.execute(
+            "SELECT objects, reused_from FROM detections WHERE image_hash = ? AND model_key = ?",
+            (image_hash, self.key),
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return CachedDetections([tuple(obj) for obj in json.loads(row[0])], row[1])
+
+    def put(self, image_hash, objects, phash=None, reused_from=None):
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO detections (image_hash, model_key, objects, created_at, phash, reused_from)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                image_hash,
+                self.key,
+                json.dumps(objects),
+                datetime.utcnow().isoformat(),
+                None if phash is None else f"{phash:016x}",
+                reused_from,
+            ),
+        )
+
+    def iter_perceptual(self):
+        """
+        (image_hash, phash, objects) of every image inferred (not reused) under this model key
+        """
+        rows = self._conn.execute(
+            "SELECT image_hash, phash, objects FROM detections "
+            "WHERE model_key = ? AND phash IS NOT NULL AND reused_from IS NULL",
+            (self.key,),
+        )
+        for image_hash, phash, objects in rows:
+            yield image_hash, int(phash, 16), [tuple(obj) for obj in json.loads(objects)]
+
+    def commit(self):
+        self._conn.commit()
+
+
+# --------------------------------------------------
+# Maintenance
+# --------------------------------------------------
+
+def cache_stats(path=None):
+    """
+    {model_key: cached image count}
+    """
+    conn = _connect(path)
+    rows = conn.execute("SELECT model_key, COUNT(*) FROM detections GROUP BY model_key").fetchall()
+    conn.close()
+    return dict(rows)
+
+
+def invalidate(model_key=None, image_hashes=None, keep_model_key=None, path=None):
+    """
+    Delete cache entries for a model key and/or specific images, or every
+    model key except `keep_model_key`. Returns the number of entries removed.
+    """
+    clauses, params = [], []
+    if model_key:
+        clauses.append("model_key = ?")
+        params.append(model_key)
+    if image_hashes:
+        clauses.append(f"image_hash IN ({', '.join('?' * len(image_hashes))})")
+        params.extend(image_hashes)
+    if keep_model_key:
+        clauses.append("model_key != ?")
+        params.append(keep_model_key)
+    if not clauses:
+        raise ValueError("Refusing to invalidate the whole detection cache without a filter")
+
+    conn = _connect(path)
+    with conn:
+        removed = conn.execute(f"DELETE FROM detections WHERE {' AND '.join(clauses)}", params).rowcount
+    conn.close()
+    return removed
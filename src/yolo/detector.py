@@ -1,48 +1,208 @@
-from ultralytics import YOLO
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
+import multiprocessing
+import os
+import time
+from src.config import LOGGING_CONFIG, YOLO_CONFIG
+from src.scraping.logger import get_logger, logging_configured, setup_logging
+from .backends import ensure_exported, limit_threads, load_model
+from .batching import bounded_map, chunked, iter_batches, load_with_phash
+from .cache import DetectionCache
 from .classifier import classify_image
-from .utils import extract_channel_and_message_id
-import csv
+from .phash import PerceptualIndex
+from .sinks import build_sinks
+from .utils import iter_unique_images
 
-model = YOLO("yolov8n.pt")
+logger = get_logger("YoloDetector")
 
-def run_yolo_pipeline(image_root: Path, output_csv: str):
-    results_rows = []
+_model = None
+_index = None
 
-    for image_path in image_root.rglob("*.jpg"):
-        channel_code, message_id = extract_channel_and_message_id(image_path)
 
-        detections = model(image_path, verbose=False)[0]
+def get_model():
+    """
+    The process-wide YOLO model for YOLO_BACKEND, loaded on first use (once per worker process)
+    """
+    global _model
+    if _model is None:
+        _model = load_model()
+    return _model
 
-        detected_objects = [
-            (model.names[int(box.cls)], float(box.conf))
-            for box in detections.boxes
-        ]
 
-        if not detected_objects:
-            continue
+def run_yolo_pipeline(image_root: Path, output_csv: str = None, sink=None, batch_size: int = None,
+                      cache: DetectionCache = None, workers: int = None, threads: int = None):
+    """
+    Run detection over every unique image and stream the rows into `sink`
+    (by default the sinks configured in YOLO_SINKS) one image at a time.
 
-        image_category = classify_image(detected_objects)
+    Only images missing from the detection cache for the current model key
+    are inferred; the rest of the output is rebuilt from the cache. Misses go
+    through the model `batch_size` at a time (YOLO_BATCH_SIZE) while the next
+    batches are decoded and letterboxed in the background.
 
-        for label, confidence in detected_objects:
-            results_rows.append({
-                "message_id": message_id,
-                "channel_code": channel_code,
-                "detected_class": label,
-                "confidence_score": round(confidence, 4),
-                "image_category": image_category
-            })
+    With `workers` > 1 (YOLO_WORKERS) misses are sharded across processes,
+    each with its own model and `threads` intra-op threads (YOLO_THREADS);
+    results are merged back in image order.
 
-    _write_results(output_csv, results_rows)
+    With YOLO_NEAR_DUPLICATES, a miss whose dHash is within
+    YOLO_PHASH_DISTANCE bits of an already inferred image reuses that image's
+    detections; its rows record the source image in `reused_from`.
+    """
+    sink = sink or build_sinks(output_csv)
+    cache = cache or DetectionCache()
+    workers = workers or YOLO_CONFIG["workers"]
+    threads = threads or YOLO_CONFIG["threads"] or max(1, (os.cpu_count() or 1) // workers)
+    summary = {"images": 0, "inferred": 0, "reused": 0, "empty": 0, "rows": 0}
+    last_report = time.monotonic()
 
+    def emit(sha256, messages, detected_objects, reused_from=None):
+        rows = _detection_rows(sha256, messages, detected_objects, reused_from)
+        sink.write(sha256, rows)
+        summary["images"] += 1
+        summary["empty"] += not detected_objects
+        summary["rows"] += len(rows)
 
-def _write_results(output_csv: str, rows: list[dict]):
-    if not rows:
-        raise ValueError("No YOLO detections produced")
+    def misses():
+        # Cache hits are written out as they are found; only misses reach the model
+        for image_path, messages in iter_unique_images(image_root):
+            sha256 = cache.image_hash(image_path)
+            cached = cache.get(sha256)
+            if cached is None:
+                yield image_path, messages, sha256
+            else:
+                emit(sha256, messages, cached.objects, cached.reused_from)
 
-    fieldnames = rows[0].keys()
+    with sink, cache:
+        index = PerceptualIndex.from_cache(cache) if YOLO_CONFIG["near_duplicates"] else None
 
-    with open(output_csv, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+        # Each unique image is inferred once; byte-identical reposts share the result
+        for items, outcomes in _infer(misses(), batch_size, workers, threads, index):
+            for (image_path, messages, sha256), (detected_objects, phash, reused_from) in zip(items, outcomes):
+                # Zero-detection images are cached too, so they are never re-inferred
+                cache.put(sha256, detected_objects, phash, reused_from)
+                emit(sha256, messages, detected_objects, reused_from)
+                summary["reused" if reused_from else "inferred"] += 1
+
+            # Checkpoint: a restarted run picks up after the last committed batch
+            cache.commit()
+
+            if time.monotonic() - last_report >= LOGGING_CONFIG["metrics_interval_seconds"]:
+                last_report = time.monotonic()
+                logger.info("detection progress", extra={"fields": dict(summary)})
+
+    logger.info(
+        f"Detection finished: {summary['images']} images, {summary['inferred']} inferred, "
+        f"{summary['reused']} reused from near duplicates, "
+        f"{summary['empty']} without detections, {summary['rows']} rows | key={cache.key}"
+    )
+    return summary
+
+
+# --------------------------------------------------
+# Inference
+# --------------------------------------------------
+
+def _infer(items, batch_size, workers, threads, index=None):
+    """
+    Yield (items, outcomes) per batch, in input order (see `infer_batches`)
+    """
+    batch_size = batch_size or YOLO_CONFIG["batch_size"]
+
+    if workers <= 1:
+        limit_threads(YOLO_CONFIG["backend"], threads)
+        yield from infer_batches(items, batch_size, index)
+        return
+
+    # Export once here rather than racing in every worker
+    ensure_exported()
+
+    # spawn: each worker imports torch fresh instead of forking a threaded parent
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        # Each worker gets a snapshot of the index and extends it with its own shards
+        initargs=(threads, YOLO_CONFIG["backend"], YOLO_CONFIG["int8"], index, logging_configured()),
+    ) as pool:
+        shards = chunked(items, batch_size * YOLO_CONFIG["shard_batches"])
+        # A few shards per worker in flight: enough to keep every worker busy while
+        # the caller checkpoints finished shards, without draining `items` up front
+        for batches in bounded_map(pool, partial(_infer_shard, batch_size=batch_size), shards, 2 * workers):
+            yield from batches
+
+
+def _infer_shard(items, batch_size):
+    return list(infer_batches(items, batch_size, _index))
+
+
+def _init_worker(threads, backend, int8, index, log_to_file):
+    global _index
+    if log_to_file:
+        setup_logging()
+    # Spawned workers re-read the config from the environment; keep the parent's choice
+    YOLO_CONFIG["backend"] = backend
+    YOLO_CONFIG["int8"] = int8
+    _index = index
+    limit_threads(backend, threads)
+
+
+def infer_batches(items, batch_size, index=None):
+    """
+    Run the model over (image_path, messages, sha256) items.
+
+    Yields (items, outcomes) per batch with one (detected_objects, phash,
+    reused_from) outcome per item; near duplicates found in `index` skip the
+    model and carry the image_hash they were copied from.
+    """
+    model = get_model()
+    for batch, loaded in iter_batches(items, load_with_phash, batch_size):
+        outcomes = [None] * len(batch)
+        to_infer = []
+
+        for i, (_, phash) in enumerate(loaded):
+            match = index.find(phash) if index is not None else None
+            if match is None:
+                to_infer.append(i)
+            else:
+                source_hash, objects = match
+                outcomes[i] = (objects, phash, source_hash)
+
+        if to_infer:
+            results = model(
+                [loaded[i][0] for i in to_infer],
+                imgsz=YOLO_CONFIG["imgsz"],
+                conf=YOLO_CONFIG["conf"],
+                iou=YOLO_CONFIG["iou"],
+                verbose=False,
+            )
+            for i, result in zip(to_infer, results):
+                objects = [(model.names[int(box.cls)], round(float(box.conf), 4)) for box in result.boxes]
+                phash = loaded[i][1]
+                outcomes[i] = (objects, phash, None)
+                if index is not None:
+                    index.add(phash, batch[i][2], objects)
+
+        yield batch, outcomes
+
+
+def _detection_rows(sha256, messages, detected_objects, reused_from=None) -> list[dict]:
+    if not detected_objects:
+        return []
+
+    image_category = classify_image(detected_objects)
+
+    return [
+        {
+            "message_id": message_id,
+            "channel_name": channel_name,
+            "image_hash": sha256,
+            "model_version": YOLO_CONFIG["model_version"],
+            "detected_class": label,
+            "confidence_score": confidence,
+            "image_category": image_category,
+            "reused_from": reused_from,
+        }
+        for channel_name, message_id in messages
+        for label, confidence in detected_objects
+    ]
@@ -1,34 +1,46 @@
 import sys
 import os
 # Add parent directory to path so we can import from src
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from pathlib import Path
-import pandas as pd
-from sqlalchemy import create_engine
-from src.config import DATABASE_CONFIG
+import csv
+from itertools import groupby
+from src.scraping.logger import setup_logging
+from src.yolo.sinks import DETECTION_COLUMNS, PostgresDetectionSink
 
 def load_yolo_csv_to_postgres(csv_path: str):
-    engine = create_engine(
-        f"postgresql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}"
-        f"@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['dbname']}"
-    )
+    """
+    Backfill raw.yolo_detections from a CSV written by the csv detection sink.
 
-    df = pd.read_csv(csv_path)
+    Detection normally streams straight into Postgres (YOLO_SINKS=postgres);
+    rows are replaced per image, so loading twice is safe.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = set(reader.fieldnames or ())
+        # Older CSVs call channel_name channel_code
+        legacy_channel = "channel_name" not in fieldnames and "channel_code" in fieldnames
+        if legacy_channel:
+            fieldnames.add("channel_name")
+        # reused_from only exists in CSVs written since near-duplicate reuse
+        missing = set(DETECTION_COLUMNS) - {"reused_from"} - fieldnames
+        if missing:
+            raise ValueError(
+                f"{csv_path} is missing {sorted(missing)}; re-run src/yolo_detect.py with YOLO_SINKS=postgres"
+            )
 
-    # Select only columns for raw table
-    df = df[['message_id', 'detected_class', 'confidence_score', 'image_category']]
-
-    df.to_sql(
-        "yolo_detections",
-        engine,
-        schema="raw",
-        if_exists="append",
-        index=False
-    )
+        # The CSV sink writes one image's rows contiguously
+        with PostgresDetectionSink() as sink:
+            for sha256, rows in groupby(reader, key=lambda r: r["image_hash"]):
+                rows = list(rows)
+                if legacy_channel:
+                    for row in rows:
+                        row["channel_name"] = row.pop("channel_code")
+                sink.write(sha256, [{c: row.get(c) or None for c in DETECTION_COLUMNS} for row in rows])
 
     print("✅ YOLO detections loaded into PostgreSQL")
 
 if __name__ == "__main__":
-    csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "processed", "yolo_detections.csv")
+    setup_logging()
+    csv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "processed", "yolo_detections.csv")
     load_yolo_csv_to_postgres(csv_path)
@@ -0,0 +1,110 @@
+"""
+Perceptual near-duplicate lookup for the detector.
+
+Reposted product photos are often re-compressed, resized or lightly cropped,
+so their bytes (and sha256) differ while the picture does not. A 64-bit dHash
+survives those edits; images within a small Hamming distance of an already
+inferred image reuse its detections instead of running the model.
+
+Lookups use a BK-tree, so finding a neighbour within radius r touches a
+small part of the index instead of every stored hash.
+"""
+
+from src.config import YOLO_CONFIG
+
+try:
+    import cv2
+except ImportError:  # only needed when running inference
+    cv2 = None
+
+
+def dhash(image, hash_size=8):
+    """
+    Difference hash of a BGR or grayscale image as a 64-bit int
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return sum(1 << i for i, bit in enumerate(bits) if bit)
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Metric tree over integer hashes with Hamming distance
+    """
+
+    def __init__(self):
+        self._root = None
+        self.size = 0
+
+    def add(self, key, value):
+        self.size += 1
+        if self._root is None:
+            self._root = (key, value, {})
+            return
+
+        node = self._root
+        while True:
+            distance = hamming(key, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (key, value, {})
+                return
+            node = child
+
+    def nearest(self, key, radius):
+        """
+        (distance, value) of the closest key within `radius`, or None
+        """
+        if self._root is None:
+            return None
+
+        best = None
+        stack = [self._root]
+        while stack:
+            node_key, value, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= radius and (best is None or distance < best[0]):
+                best = (distance, value)
+                if distance == 0:
+                    break
+
+            # Triangle inequality: only children within [d - r, d + r] can match
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+
+        return best
+
+
+class PerceptualIndex:
+    """
+    Inferred images by dHash: `find` returns (image_hash, objects) of a near
+    duplicate within `distance` bits, `add` registers a newly inferred image.
+    """
+
+    def __init__(self, distance=None):
+        self.distance = YOLO_CONFIG["phash_distance"] if distance is None else distance
+        self._tree = BKTree()
+
+    @classmethod
+    def from_cache(cls, cache, distance=None):
+        index = cls(distance)
+        for image_hash, phash, objects in cache.iter_perceptual():
+            index.add(phash, image_hash, objects)
+        return index
+
+    def __len__(self):
+        return self._tree.size
+
+    def add(self, phash, image_hash, objects):
+        self._tree.add(phash, (image_hash, objects))
+
+    def find(self, phash):
+        match = self._tree.nearest(phash, self.distance)
+        return match[1] if match else None
@@ -0,0 +1,308 @@
+"""
+Detection sinks for the YOLO pipeline.
+
+A sink receives the detections of one image at a time through
+`write(image_hash, rows)` and is used as a context manager:
+
+* CsvDetectionSink      -> data/processed/yolo_detections.csv
+* PostgresDetectionSink -> raw.yolo_detections, streamed with chunked COPY
+* TeeSink               -> fan out to several sinks
+
+The Postgres sink replaces the rows of every image it sees, whatever model
+version wrote them, so re-running detection (or switching YOLO_MODEL_VERSION)
+never leaves two sets of rows for one image. Rows whose
+detections did not change keep their original `detected_at`, which the
+incremental image rollup uses to find new detections.
+"""
+
+import csv
+import io
+import os
+from pathlib import Path
+
+import psycopg2
+
+from src.config import DATABASE_CONFIG, YOLO_CONFIG
+from src.pg_copy import copy_line
+from src.scraping.logger import get_logger
+
+logger = get_logger("DetectionSink")
+
+DETECTION_COLUMNS = (
+    "message_id",
+    "channel_name",
+    "image_hash",
+    "model_version",
+    "detected_class",
+    "confidence_score",
+    "image_category",
+    "reused_from",
+)
+
+
+def build_sinks(output_csv=None, names=None):
+    """
+    Sink for the configured YOLO_SINKS names ("postgres", "csv")
+    """
+    names = names or YOLO_CONFIG["sinks"]
+    sinks = []
+    for name in names:
+        if name == "postgres":
+            sinks.append(PostgresDetectionSink())
+        elif name == "csv":
+            if not output_csv:
+                raise ValueError("The csv detection sink needs an output path")
+            sinks.append(CsvDetectionSink(output_csv))
+        else:
+            raise ValueError(f"Unknown detection sink: {name}")
+
+    return sinks[0] if len(sinks) == 1 else TeeSink(*sinks)
+
+
+class TeeSink:
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def __enter__(self):
+        for sink in self.sinks:
+            sink.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for sink in self.sinks:
+            sink.__exit__(exc_type, exc, tb)
+        return False
+
+    def write(self, image_hash, rows):
+        for sink in self.sinks:
+            sink.write(image_hash, rows)
+
+
+# --------------------------------------------------
+# CSV
+# --------------------------------------------------
+
+class CsvDetectionSink:
+    """
+    Write detections to a hidden temp file, renamed over `output_csv` only
+    when the run completes, so a crash never leaves a truncated CSV behind.
+    """
+
+    def __init__(self, output_csv):
+        self.output_csv = Path(output_csv)
+        self._tmp_path = self.output_csv.with_name(f".{self.output_csv.name}.tmp")
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        self._file = open(self._tmp_path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=DETECTION_COLUMNS)
+        self._writer.writeheader()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.output_csv)
+        else:
+            self._tmp_path.unlink(missing_ok=True)
+        return False
+
+    def write(self, image_hash, rows):
+        self._writer.writerows(rows)
+
+
+# --------------------------------------------------
+# Postgres
+# --------------------------------------------------
+
+def create_detection_table(conn):
+    with conn.cursor() as cur:
+        cur.execute("CREATE SCHEMA IF NOT EXISTS raw;")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS raw.yolo_detections (
+                message_id BIGINT,
+                detected_class TEXT,
+                confidence_score DOUBLE PRECISION,
+                image_category TEXT
+            );
+        """)
+        # channel_name used to be called channel_code although it always held the username
+        cur.execute("""
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = 'raw' AND table_name = 'yolo_detections' AND column_name = 'channel_code'
+                ) AND NOT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_schema = 'raw' AND table_name = 'yolo_detections' AND column_name = 'channel_name'
+                ) THEN
+                    ALTER TABLE raw.yolo_detections RENAME COLUMN channel_code TO channel_name;
+                END IF;
+            END $$;
+        """)
+        # Columns missing from tables created by the old pandas loader
+        cur.execute("""
+            ALTER TABLE raw.yolo_detections
+                ADD COLUMN IF NOT EXISTS channel_name TEXT,
+                ADD COLUMN IF NOT EXISTS image_hash TEXT,
+                ADD COLUMN IF NOT EXISTS model_version TEXT,
+                ADD COLUMN IF NOT EXISTS reused_from TEXT,
+                ADD COLUMN IF NOT EXISTS detected_at TIMESTAMPTZ DEFAULT now();
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS yolo_detections_image_model_idx
+            ON raw.yolo_detections (image_hash, model_version);
+        """)
+        # Incremental image rollups pick up new detections by detected_at
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS yolo_detections_detected_at_idx
+            ON raw.yolo_detections (detected_at);
+        """)
+        # (message, image) pairs whose detections were cleared and not replaced,
+        # so the image rollup can rebuild days that lost all their rows
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS raw.yolo_detection_deletions (
+                channel_name TEXT,
+                message_id BIGINT,
+                image_hash TEXT,
+                deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS yolo_detection_deletions_deleted_at_idx
+            ON raw.yolo_detection_deletions (deleted_at);
+        """)
+    conn.commit()
+
+
+_STAGE_TABLE = "yolo_detections_stage"
+
+# Fingerprint of one message's detections of one image
+_FINGERPRINT = (
+    "string_agg(concat_ws('|', detected_class, confidence_score, image_category, reused_from), ',' "
+    "ORDER BY detected_class, confidence_score, image_category, reused_from)"
+)
+
+_REPLACE_SQL = f"""
+WITH old AS (
+    DELETE FROM raw.yolo_detections
+    WHERE image_hash = ANY(%(images)s)
+    RETURNING *
+),
+old_sets AS (
+    SELECT channel_name, message_id, image_hash, MIN(detected_at) AS detected_at, {_FINGERPRINT} AS fingerprint
+    FROM old
+    GROUP BY channel_name, message_id, image_hash
+),
+new_sets AS (
+    SELECT channel_name, message_id, image_hash, {_FINGERPRINT} AS fingerprint
+    FROM {_STAGE_TABLE}
+    GROUP BY channel_name, message_id, image_hash
+),
+cleared AS (
+    INSERT INTO raw.yolo_detection_deletions (channel_name, message_id, image_hash)
+    SELECT o.channel_name, o.message_id, o.image_hash
+    FROM old_sets o
+    WHERE NOT EXISTS (
+        SELECT 1 FROM new_sets n
+        WHERE n.channel_name IS NOT DISTINCT FROM o.channel_name
+          AND n.message_id IS NOT DISTINCT FROM o.message_id
+          AND n.image_hash = o.image_hash
+    )
+)
+INSERT INTO raw.yolo_detections ({', '.join(DETECTION_COLUMNS)}, detected_at)
+SELECT {', '.join(f's.{c}' for c in DETECTION_COLUMNS)},
+       CASE WHEN o.fingerprint = n.fingerprint THEN COALESCE(o.detected_at, now()) ELSE now() END
+FROM {_STAGE_TABLE} s
+JOIN new_sets n
+  ON n.channel_name IS NOT DISTINCT FROM s.channel_name
+ AND n.message_id IS NOT DISTINCT FROM s.message_id
+ AND n.image_hash = s.image_hash
+LEFT JOIN old_sets o
+  ON o.channel_name IS NOT DISTINCT FROM s.channel_name
+ AND o.message_id IS NOT DISTINCT FROM s.message_id
+ AND o.image_hash = s.image_hash
+"""
+
+
+class PostgresDetectionSink:
+    """
+    Stream detections into raw.yolo_detections.
+
+    Rows are buffered and flushed every `chunk_size` rows in one transaction
+    that COPYs them into a temporary stage, deletes the buffered images' rows
+    (from any model version) and inserts the staged ones. Images with no
+    detections still clear their previous rows; cleared (message, image) pairs
+    that get no new rows are logged in raw.yolo_detection_deletions.
+
+    Cache hits are re-emitted on every run, so a (message, image) whose
+    detections are unchanged keeps its previous `detected_at`; only new or
+    changed detections get now().
+    """
+
+    def __init__(self, conn=None, chunk_size=None):
+        self.conn = conn
+        self.chunk_size = chunk_size or YOLO_CONFIG["copy_chunk_size"]
+        self.rows_written = 0
+        self._owns_conn = conn is None
+        self._images = set()
+        self._rows = []
+
+    def __enter__(self):
+        if self.conn is None:
+            self.conn = psycopg2.connect(**DATABASE_CONFIG)
+        create_detection_table(self.conn)
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE}
+                (LIKE raw.yolo_detections) ON COMMIT DELETE ROWS;
+            """)
+        self.conn.commit()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Buffered images are complete, so keep them even when the run failed
+        try:
+            self.flush()
+        except Exception:
+            if exc_type is None:
+                raise
+            logger.exception("Could not flush buffered detections after a failed run")
+        finally:
+            if self._owns_conn:
+                self.conn.close()
+        return False
+
+    def write(self, image_hash, rows):
+        self._images.add(image_hash)
+        self._rows.extend(rows)
+        if len(self._rows) >= self.chunk_size or len(self._images) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._images:
+            return
+
+        buffer = io.StringIO()
+        for row in self._rows:
+            buffer.write(copy_line(row, DETECTION_COLUMNS))
+        buffer.seek(0)
+
+        try:
+            with self.conn.cursor() as cur:
+                cur.copy_expert(
+                    f"COPY {_STAGE_TABLE} ({', '.join(DETECTION_COLUMNS)}) FROM STDIN",
+                    buffer,
+                )
+                cur.execute(_REPLACE_SQL, {"images": list(self._images)})
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        self.rows_written += len(self._rows)
+        logger.info(f"Flushed {len(self._rows)} detections for {len(self._images)} images")
+        self._images = set()
+        self._rows = []
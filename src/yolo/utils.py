@@ -1,12 +1,48 @@
 from pathlib import Path
+from src.scraping.image_store import is_blob, messages_for_blob, iter_blobs
 
 def extract_channel_and_message_id(image_path: Path) -> tuple[str, str]:
     """
-    Extract channel_code and message_id from image path.
+    Extract channel_name and message_id from image path.
 
     Expected structure:
-    data/raw/images/{channel_code}/{message_id}.jpg
+    data/raw/images/{channel_name}/{message_id}.jpg
+
+    Content-addressed blobs are resolved through the image index; a blob shared
+    by several messages resolves to the first of them (see `resolve_messages`).
+    """
+    return resolve_messages(image_path)[0]
+
+
+def resolve_messages(image_path: Path) -> list[tuple[str, str]]:
     """
-    channel_code = image_path.parent.name
-    message_id = image_path.stem
-    return channel_code, message_id
+    Every (channel_name, message_id) that references an image.
+    """
+    image_path = Path(image_path)
+
+    if is_blob(image_path):
+        messages = messages_for_blob(image_path)
+        if not messages:
+            raise ValueError(f"Blob not found in image index: {image_path}")
+        return messages
+
+    return [(image_path.parent.name, image_path.stem)]
+
+
+def iter_unique_images(image_root: Path):
+    """
+    Yield (image_path, messages) once per unique image.
+
+    Indexed blobs come from the content-addressed store; files still in the
+    legacy data/raw/images/{channel}/{message_id}.jpg layout follow, skipping
+    any message the index already covers.
+    """
+    indexed = set()
+    for blob_path, messages in iter_blobs():
+        indexed.update(messages)
+        yield blob_path, messages
+
+    for image_path in sorted(Path(image_root).rglob("*.jpg")):
+        messages = resolve_messages(image_path)
+        if messages[0] not in indexed:
+            yield image_path, messages
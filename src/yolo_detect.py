@@ -1,10 +1,26 @@
 import sys
-from yolo.detector import run_yolo_pipeline
+from pathlib import Path
+
+# Make the project root importable so `src.*` resolves when run as a script
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.config import DATA_PATHS
+from src.scraping.logger import setup_logging
+from src.yolo.detector import run_yolo_pipeline
 
 if __name__ == "__main__":
+    setup_logging()
     try:
-        run_yolo_pipeline()
-        print(" YOLO detections generated.")
+        DATA_PATHS["processed"].mkdir(parents=True, exist_ok=True)
+        summary = run_yolo_pipeline(
+            DATA_PATHS["raw_images"],
+            str(DATA_PATHS["processed"] / "yolo_detections.csv"),
+        )
+        print(
+            f" YOLO detections generated: {summary['images']} images "
+            f"({summary['inferred']} inferred, {summary['empty']} without detections), "
+            f"{summary['rows']} rows."
+        )
     except Exception as e:
         print(f"❌ Task 3 failed: {e}")
         sys.exit(1)
@@ -0,0 +1,12 @@
+import pytest
+
+from src.config import LOGGING_CONFIG
+from src.scraping.logger import shutdown_logging
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _log_to_tmp(tmp_path_factory):
+    # Scraper runs start the file logger; keep it out of data/logs
+    LOGGING_CONFIG["log_dir"] = tmp_path_factory.mktemp("logs")
+    yield
+    shutdown_logging()
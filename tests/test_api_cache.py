@@ -0,0 +1,42 @@
+from starlette.requests import Request
+
+from api.cache import LRUCache, _etag, _not_modified, cache_key
+
+
+def _request(query_string="", headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/reports/top-products",
+        "query_string": query_string.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    })
+
+
+def test_lru_evicts_oldest_and_expires():
+    now = [0.0]
+    cache = LRUCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"  # a becomes most recent
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+
+
+def test_cache_key_ignores_parameter_order():
+    assert cache_key(_request("limit=5&channel=x")) == cache_key(_request("channel=x&limit=5"))
+    assert cache_key(_request("limit=5")) != cache_key(_request("limit=6"))
+
+
+def test_etag_revalidation():
+    etag = _etag(3, "v3:/api/reports/top-products?[]")
+
+    assert _not_modified(_request(headers={"If-None-Match": etag}), etag)
+    assert _not_modified(_request(headers={"If-None-Match": f'W/{etag}, "other"'}), etag)
+    assert not _not_modified(_request(headers={"If-None-Match": _etag(4, "v4:x")}), etag)
+    assert not _not_modified(_request(), etag)
@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from api.export import build_export_query, encode_rows
+
+
+def test_message_export_filters():
+    sql, params = build_export_query(
+        "messages", channel_key=2, date_from=date(2025, 1, 1), date_to=date(2025, 1, 31), category="promotional"
+    )
+    sql = str(sql)
+
+    assert sql.startswith("SELECT f.message_id")
+    assert "EXISTS (SELECT 1 FROM marts.fct_image_detections d" in sql
+    # message ids repeat across channels
+    assert "d.channel_key = f.channel_key AND d.message_id = f.message_id" in sql
+    assert sql.endswith("ORDER BY f.message_date, f.message_id")
+    assert params == {
+        "channel_key": 2,
+        "date_from": datetime(2025, 1, 1),
+        "date_to": datetime(2025, 2, 1),
+        "category": "promotional",
+    }
+
+
+def test_detection_export_filters_on_date_key():
+    sql, params = build_export_query("detections", date_from=date(2025, 3, 1), date_to=date(2025, 3, 2))
+
+    assert "FROM marts.fct_image_detections f WHERE f.date_key >= :date_from" in str(sql)
+    assert params == {"date_from": 20250301, "date_to": 20250302}
+
+
+def test_encode_rows():
+    columns = ("message_id", "message_date", "message_text")
+    rows = [(1, datetime(2025, 1, 1, 9, 30), 'ፓራሲታሞል, "500mg"\nnew stock')]
+
+    lines = encode_rows("ndjson", columns, rows).decode("utf-8").splitlines()
+    assert json.loads(lines[0]) == {
+        "message_id": 1,
+        "message_date": "2025-01-01T09:30:00",
+        "message_text": 'ፓራሲታሞል, "500mg"\nnew stock',
+    }
+
+    records = list(csv.reader(io.StringIO(encode_rows("csv", columns, rows).decode("utf-8"))))
+    assert records == [["1", "2025-01-01T09:30:00", 'ፓራሲታሞል, "500mg"\nnew stock']]
@@ -0,0 +1,68 @@
+from datetime import date, datetime
+
+import pytest
+
+from api.search import InvalidCursor, build_search_query, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    relevance = encode_cursor(
+        "relevance", {"word_hit": True, "rank": 0.1 + 0.2, "message_id": 42, "channel_key": 3}
+    )
+    assert decode_cursor(relevance, "relevance") == (True, 0.1 + 0.2, 42, 3)
+
+    recent = encode_cursor(
+        "recent", {"message_date": datetime(2025, 3, 1, 8, 30), "message_id": 7, "channel_key": 2}
+    )
+    assert decode_cursor(recent, "recent") == (datetime(2025, 3, 1, 8, 30), 7, 2)
+
+
+def test_cursor_rejects_garbage_and_other_sort():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", "recent")
+
+    relevance = encode_cursor(
+        "relevance", {"word_hit": False, "rank": 1.0, "message_id": 1, "channel_key": 1}
+    )
+    with pytest.raises(InvalidCursor):
+        decode_cursor(relevance, "recent")
+
+
+def test_query_uses_keyset_and_filters():
+    sql, params = build_search_query(
+        "paracetamol", 20, sort="recent", channel_key=3,
+        date_from=date(2025, 1, 1), date_to=date(2025, 1, 31),
+        after=(datetime(2025, 1, 15), 99, 3),
+    )
+    sql = str(sql)
+
+    assert "OFFSET" not in sql
+    assert (
+        "(m.message_date, m.message_id, m.channel_key) "
+        "< (:after_message_date, :after_message_id, :after_channel_key)"
+    ) in sql
+    assert "ORDER BY m.message_date DESC, m.message_id DESC, m.channel_key DESC" in sql
+    assert params["after_channel_key"] == 3
+    assert "f.channel_key = :channel_key" in sql
+    assert params["limit"] == 21
+    assert params["date_to"] == datetime(2025, 2, 1)
+
+
+def test_substring_match_needs_three_characters():
+    sql, params = build_search_query("50%_x", 10)
+    assert "ILIKE :pattern" in str(sql)
+    assert params["pattern"] == "%50\\%\\_x%"
+
+    sql, params = build_search_query("ab", 10)
+    assert "ILIKE" not in str(sql)
+    assert "pattern" not in params
+
+
+def test_relevance_puts_whole_word_hits_first_and_binds_the_config():
+    sql, params = build_search_query("paracetamol", 10, after=(False, 0.4, 12, 2))
+    sql = str(sql)
+
+    assert "websearch_to_tsquery(CAST(:text_config AS regconfig), :query)" in sql
+    assert params["text_config"] == "simple"
+    assert "ORDER BY m.word_hit DESC, m.rank DESC, m.message_id DESC, m.channel_key DESC" in sql
+    assert params["after_word_hit"] is False and params["after_rank"] == 0.4
@@ -0,0 +1,16 @@
+from src.config import DATA_PATHS
+from src.scraping.checkpoints import get_checkpoint, save_checkpoint
+
+
+def test_checkpoint_only_moves_forward(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "checkpoints", tmp_path / "checkpoints.json")
+
+    assert get_checkpoint("CheMed123") is None
+
+    assert save_checkpoint("CheMed123", 120, "2026-01-17T08:00:00+00:00")
+    assert not save_checkpoint("CheMed123", 100, "2026-01-16T08:00:00+00:00")
+
+    checkpoint = get_checkpoint("CheMed123")
+    assert checkpoint["message_id"] == 120
+    assert checkpoint["message_date"] == "2026-01-17T08:00:00+00:00"
+    assert not (tmp_path / "checkpoints.tmp").exists()
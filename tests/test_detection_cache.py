@@ -0,0 +1,61 @@
+import pytest
+
+from src.config import DATA_PATHS
+from src.yolo.cache import DetectionCache, cache_stats, invalidate
+
+
+def test_cache_round_trip_per_model_key(tmp_path):
+    path = tmp_path / "cache.sqlite"
+
+    with DetectionCache(path, key="v1") as cache:
+        assert cache.get("abc") is None
+        cache.put("abc", [("bottle", 0.91), ("person", 0.5)])
+
+    with DetectionCache(path, key="v1") as cache:
+        assert cache.get("abc").objects == [("bottle", 0.91), ("person", 0.5)]
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    with DetectionCache(path, key="v2") as cache:
+        assert cache.get("abc") is None
+
+
+def test_legacy_files_are_hashed_once(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "image_blobs", tmp_path / "blobs")
+    image = tmp_path / "CHEMED" / "12.jpg"
+    image.parent.mkdir()
+    image.write_bytes(b"jpeg")
+
+    with DetectionCache(tmp_path / "cache.sqlite", key="v1") as cache:
+        first = cache.image_hash(image)
+
+    calls = []
+    monkeypatch.setattr("src.yolo.cache.file_sha256", lambda p: calls.append(p))
+    with DetectionCache(tmp_path / "cache.sqlite", key="v1") as cache:
+        assert cache.image_hash(image) == first
+    assert calls == []
+
+
+def test_selective_invalidation(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    for key in ("v1", "v2"):
+        with DetectionCache(path, key=key) as cache:
+            cache.put("a", [])
+            cache.put("b", [("bottle", 0.9)])
+
+    assert invalidate(image_hashes=["a"], model_key="v2", path=path) == 1
+    assert invalidate(keep_model_key="v2", path=path) == 2
+    assert cache_stats(path) == {"v2": 1}
+
+    with pytest.raises(ValueError):
+        invalidate(path=path)
+
+
+def test_perceptual_entries_skip_reused_images(tmp_path):
+    with DetectionCache(tmp_path / "cache.sqlite", key="v1") as cache:
+        cache.put("a", [("bottle", 0.9)], phash=2**63 + 5)
+        cache.put("b", [("bottle", 0.9)], phash=2**63 + 4, reused_from="a")
+        cache.put("c", [], phash=None)
+
+    with DetectionCache(tmp_path / "cache.sqlite", key="v1") as cache:
+        assert list(cache.iter_perceptual()) == [("a", 2**63 + 5, [("bottle", 0.9)])]
+        assert cache.get("b").reused_from == "a"
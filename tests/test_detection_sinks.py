@@ -0,0 +1,57 @@
+import csv
+
+import pytest
+
+from src.yolo.sinks import DETECTION_COLUMNS, CsvDetectionSink, TeeSink, build_sinks
+
+
+def _rows(image_hash, n):
+    return [
+        {
+            "message_id": str(i),
+            "channel_name": "CHEMED",
+            "image_hash": image_hash,
+            "model_version": "yolov8n",
+            "detected_class": "bottle",
+            "confidence_score": 0.91,
+            "image_category": "product_display",
+        }
+        for i in range(n)
+    ]
+
+
+def test_csv_sink_keeps_channel_name(tmp_path):
+    output = tmp_path / "detections.csv"
+
+    with TeeSink(CsvDetectionSink(output)) as sink:
+        sink.write("a" * 64, _rows("a" * 64, 2))
+        sink.write("b" * 64, [])
+
+    with open(output, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+
+    assert tuple(reader.fieldnames) == DETECTION_COLUMNS
+    assert [r["channel_name"] for r in rows] == ["CHEMED", "CHEMED"]
+
+
+def test_build_sinks_validates_names(tmp_path):
+    assert isinstance(build_sinks(tmp_path / "d.csv", ["csv"]), CsvDetectionSink)
+
+    with pytest.raises(ValueError):
+        build_sinks(None, ["csv"])
+    with pytest.raises(ValueError):
+        build_sinks(tmp_path / "d.csv", ["parquet"])
+
+
+def test_csv_sink_keeps_previous_file_on_failure(tmp_path):
+    output = tmp_path / "detections.csv"
+    output.write_text("previous run\n", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        with CsvDetectionSink(output) as sink:
+            sink.write("a" * 64, _rows("a" * 64, 1))
+            raise RuntimeError("inference crashed")
+
+    assert output.read_text(encoding="utf-8") == "previous run\n"
+    assert list(tmp_path.iterdir()) == [output]
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+import pytest
+
+from src.config import DATA_PATHS
+from src.scraping.downloads import PhotoDownloadPool
+from src.scraping.logger import ScrapeMetrics
+
+
+class DirectLimiter:
+    async def call(self, func, *args, **kwargs):
+        return await func(*args, **kwargs)
+
+
+class StallingClient:
+    """
+    Writes a small payload per download; with `stall` set, downloads block until released
+    """
+
+    def __init__(self, stall=False):
+        self.release = asyncio.Event()
+        if not stall:
+            self.release.set()
+
+    async def download_media(self, media, file=None):
+        await self.release.wait()
+        with open(file, "wb") as f:
+            f.write(media)
+        return file
+
+
+class RecordingWriter:
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.records = []
+
+    def write(self, record):
+        if record["message_id"] in self.fail_ids:
+            raise OSError("disk full")
+        self.records.append(record)
+
+
+@pytest.fixture(autouse=True)
+def image_store(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "raw_images", tmp_path / "images")
+    monkeypatch.setitem(DATA_PATHS, "image_store", tmp_path / "image_store")
+    monkeypatch.setitem(DATA_PATHS, "image_blobs", tmp_path / "image_store" / "blobs")
+    monkeypatch.setitem(DATA_PATHS, "image_index", tmp_path / "image_store" / "index.sqlite")
+
+
+def _record(message_id):
+    return {"message_id": message_id, "channel_name": "CheMed123", "image_path": None}
+
+
+def _pool(client, writer, **kwargs):
+    metrics = ScrapeMetrics(logging.getLogger("test"), interval=3600)
+    return PhotoDownloadPool(client, writer, DirectLimiter(), metrics, **kwargs)
+
+
+def test_failed_write_does_not_hang_the_pool():
+    writer = RecordingWriter(fail_ids={2})
+
+    async def run():
+        async with _pool(StallingClient(), writer, workers=2, queue_size=4) as pool:
+            for message_id in range(1, 6):
+                await pool.submit(_record(message_id), f"photo-{message_id}".encode())
+        return pool
+
+    pool = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert sorted(r["message_id"] for r in writer.records) == [1, 3, 4, 5]
+    assert all(r["image_path"] for r in writer.records)
+    assert pool.errors == 1
+
+
+def test_queued_jobs_are_written_without_photo_on_error():
+    writer = RecordingWriter()
+
+    async def run():
+        pool = _pool(StallingClient(stall=True), writer, workers=1, queue_size=10)
+        with pytest.raises(RuntimeError):
+            async with pool:
+                for message_id in range(1, 5):
+                    await pool.submit(_record(message_id), b"photo")
+                await asyncio.sleep(0)
+                raise RuntimeError("iteration failed")
+        return pool
+
+    pool = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    # The in-flight download and everything still queued land in the lake, unfilled
+    assert sorted(r["message_id"] for r in writer.records) == [1, 2, 3, 4]
+    assert all(r["image_path"] is None for r in writer.records)
+    assert pool.errors == 4
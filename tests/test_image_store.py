@@ -0,0 +1,45 @@
+from src.config import DATA_PATHS
+from src.scraping.image_store import store_bytes, store_file, lookup
+from src.yolo.utils import extract_channel_and_message_id, iter_unique_images
+
+
+def _use_tmp_store(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "image_store", tmp_path / "store")
+    monkeypatch.setitem(DATA_PATHS, "image_blobs", tmp_path / "store" / "blobs")
+    monkeypatch.setitem(DATA_PATHS, "image_index", tmp_path / "store" / "index.sqlite")
+
+
+def test_duplicate_images_share_one_blob(tmp_path, monkeypatch):
+    _use_tmp_store(tmp_path, monkeypatch)
+
+    first = store_bytes(b"same promo image", "CheMed123", 10)
+
+    download = tmp_path / "download.part"
+    download.write_bytes(b"same promo image")
+    second = store_file(download, "Vimax123", 42)
+
+    assert first == second
+    assert not download.exists()
+    assert len(list((tmp_path / "store" / "blobs").rglob("*.jpg"))) == 1
+    assert lookup("Vimax123", 42) == first
+    assert lookup("Vimax123", 43) is None
+
+
+def test_detector_sees_each_unique_image_once(tmp_path, monkeypatch):
+    _use_tmp_store(tmp_path, monkeypatch)
+
+    store_bytes(b"promo", "CheMed123", 10)
+    store_bytes(b"promo", "Vimax123", 42)
+    store_bytes(b"other", "CheMed123", 11)
+
+    legacy = tmp_path / "images" / "tikvahpharma" / "7.jpg"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b"legacy")
+
+    images = list(iter_unique_images(tmp_path / "images"))
+    assert len(images) == 3
+
+    shared = [messages for _, messages in images if len(messages) == 2]
+    assert shared == [[("CheMed123", "10"), ("Vimax123", "42")]]
+    assert images[-1] == (legacy, [("tikvahpharma", "7")])
+    assert extract_channel_and_message_id(legacy) == ("tikvahpharma", "7")
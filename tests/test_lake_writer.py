@@ -0,0 +1,41 @@
+from src.config import DATA_PATHS
+from src.scraping.lake_writer import LakeWriter
+from src.scraping.storage import list_lake_files, iter_records
+
+
+def _record(message_id):
+    return {"message_id": message_id, "channel_name": "CheMed123", "message_text": "ሰላም"}
+
+
+def test_writer_rotates_and_commits_parts(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "raw_messages", tmp_path)
+
+    with LakeWriter("2026-01-17", "CheMed123", max_records=2) as writer:
+        for message_id in range(5):
+            writer.write(_record(message_id))
+
+    files = list_lake_files(tmp_path)
+    assert [f.name for f in files] == [
+        "CheMed123-00000.ndjson",
+        "CheMed123-00001.ndjson",
+        "CheMed123-00002.ndjson",
+    ]
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    records = [r for f in files for r in iter_records(f)]
+    assert [r["message_id"] for r in records] == [0, 1, 2, 3, 4]
+    assert records[0]["message_text"] == "ሰላም"
+
+
+def test_writer_recovers_crashed_part(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "raw_messages", tmp_path)
+    day = tmp_path / "2026-01-17"
+    day.mkdir()
+    (day / ".CheMed123-00000.ndjson.tmp").write_text('{"message_id": 1}\n{"message_', encoding="utf-8")
+
+    with LakeWriter("2026-01-17", "CheMed123") as writer:
+        writer.write(_record(2))
+
+    files = list_lake_files(tmp_path)
+    assert [f.name for f in files] == ["CheMed123-00000.ndjson", "CheMed123-00001.ndjson"]
+    assert [r["message_id"] for r in iter_records(files[0])] == [1]
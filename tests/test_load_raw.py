@@ -0,0 +1,325 @@
+import contextlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.config import DATA_PATHS
+from src.pg_copy import copy_value
+from src.scraping.image_store import file_sha256
+from src.scraping.lake_writer import LakeWriter
+from src.scraping.storage import list_lake_files
+from scripts import load_raw_to_postgres as loader
+
+
+def _record(message_id, channel_name="CheMed123", **fields):
+    return {
+        "message_id": message_id,
+        "channel_code": "CHEMED",
+        "channel_name": channel_name,
+        "message_date": "2026-01-17T08:30:00+00:00",
+        "message_text": "Paracetamol 500mg",
+        "views": 10,
+        "forwards": 0,
+        "has_media": False,
+        "image_path": None,
+        **fields,
+    }
+
+
+def _write_day(date_str, channel_name, message_ids):
+    with LakeWriter(date_str, channel_name) as writer:
+        for message_id in message_ids:
+            writer.write(_record(message_id, channel_name))
+
+
+class RecordingCursor:
+    """
+    Collects COPY payloads; optionally answers one fetchone()
+    """
+
+    def __init__(self, fetched=None, fail_on_copy=None):
+        self.fetched = fetched
+        self.fail_on_copy = fail_on_copy
+        self.copies = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchone(self):
+        return (self.fetched,)
+
+    def copy_expert(self, sql, file):
+        if len(self.copies) == self.fail_on_copy:
+            raise RuntimeError("COPY failed")
+        self.copies.append((sql, file.read()))
+
+
+class RecordingConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_copy_value_escapes_text_format():
+    assert copy_value(None) == "\\N"
+    assert copy_value(True) == "t"
+    assert copy_value(False) == "f"
+    assert copy_value(42) == "42"
+    assert copy_value("a\\tb") == "a\\\\tb"
+    assert copy_value("col1\tcol2\nline2\r\n") == "col1\\tcol2\\nline2\\r\\n"
+    assert copy_value("C:\\path\\N") == "C:\\\\path\\\\N"
+    assert copy_value("ፓራሲታሞል 500mg") == "ፓራሲታሞል 500mg"
+
+
+def test_encode_rows_keeps_one_line_per_row():
+    rows = [
+        loader._message_row(_record(1, message_text="ሰላም\tዓለም\nሁለተኛ መስመር")),
+        loader._message_row(_record(2, message_text=None), include_payload=False),
+    ]
+
+    lines = loader._encode_rows(rows).split("\n")
+
+    assert lines[-1] == "" and len(lines) == 3
+    first, second = (line.split("\t") for line in lines[:2])
+    assert len(first) == len(second) == len(loader.MESSAGE_COLUMNS)
+    assert first[loader.MESSAGE_COLUMNS.index("message_text")] == "ሰላም\\tዓለም\\nሁለተኛ መስመር"
+    assert second[loader.MESSAGE_COLUMNS.index("message_text")] == "\\N"
+    assert second[loader.MESSAGE_COLUMNS.index("raw_payload")] == "\\N"
+
+
+def test_copy_records_streams_fixed_size_chunks():
+    cursor = RecordingCursor()
+    conn = RecordingConnection(cursor)
+    rows = (loader._message_row(_record(i)) for i in range(5))
+
+    assert loader.copy_records(conn, rows, chunk_size=2) == 5
+
+    assert [text.count("\n") for _, text in cursor.copies] == [2, 2, 1]
+    assert all(sql.startswith("COPY raw.telegram_messages (message_id,") for sql, _ in cursor.copies)
+    assert conn.commits == 1
+
+
+def test_copy_records_rolls_back_the_whole_load():
+    conn = RecordingConnection(RecordingCursor(fail_on_copy=1))
+    rows = (loader._message_row(_record(i)) for i in range(5))
+
+    with pytest.raises(RuntimeError):
+        loader.copy_records(conn, rows, chunk_size=2)
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+def test_append_modes_refuse_the_upsert_key():
+    loader.ensure_append_allowed(RecordingConnection(RecordingCursor(fetched=None)))
+
+    keyed = RecordingConnection(RecordingCursor(fetched="telegram_messages_channel_message_uidx"))
+    with pytest.raises(ValueError, match="upsert key"):
+        loader.ensure_append_allowed(keyed)
+
+
+def test_incremental_load_stops_channel_at_failed_day(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "raw_messages", tmp_path)
+    for date_str in ("2026-01-17", "2026-01-18", "2026-01-19"):
+        _write_day(date_str, "CheMed123", [1, 2])
+        _write_day(date_str, "lobelia4cosmetics", [1, 2])
+
+    loaded = []
+
+    def fake_upsert(conn, lake_file, key, *args):
+        if key == "2026-01-18/CheMed123-00000.ndjson":
+            raise RuntimeError("connection reset")
+        loaded.append(key)
+        return 2
+
+    monkeypatch.setattr(loader, "create_incremental_objects", lambda conn: None)
+    monkeypatch.setattr(loader, "load_manifest", lambda conn: {})
+    monkeypatch.setattr(loader, "upsert_file", fake_upsert)
+
+    summary = loader.load_incremental(None, tmp_path)
+
+    # Later CheMed123 days wait for the failed one; other channels are unaffected
+    assert summary == {"files": 4, "rows": 8, "failed": 1, "skipped": 1}
+    assert loaded == [
+        "2026-01-17/CheMed123-00000.ndjson",
+        "2026-01-17/lobelia4cosmetics-00000.ndjson",
+        "2026-01-18/lobelia4cosmetics-00000.ndjson",
+        "2026-01-19/lobelia4cosmetics-00000.ndjson",
+    ]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def cursor(self):
+        return contextlib.nullcontext(None)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class FakeConnectionPool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn):
+        pass
+
+
+def test_parallel_channel_load_stops_at_failed_day(monkeypatch):
+    copied = []
+
+    def fake_copy(cur, table, text):
+        if text == "2026-01-18":
+            raise RuntimeError("connection reset")
+        copied.append(text)
+
+    monkeypatch.setattr(loader, "_create_stage", lambda cur: None)
+    monkeypatch.setattr(loader, "_copy_text", fake_copy)
+    monkeypatch.setattr(loader, "_upsert_stage", lambda cur: 2)
+    monkeypatch.setattr(loader, "_record_manifest", lambda cur, *args: None)
+
+    partitions = [
+        ((date_str, "CheMed123"), [(date_str, f"{date_str}/CheMed123-00000.ndjson", 1, 1.0, "h")])
+        for date_str in ("2026-01-17", "2026-01-18", "2026-01-19")
+    ]
+    stats = defaultdict(lambda: {"partitions": 0, "rows": 0, "seconds": 0.0, "failed": 0})
+    db_pool = FakeConnectionPool()
+
+    with ThreadPoolExecutor(max_workers=1) as parse_pool:
+        # encode_lake_file stand-in: the "COPY text" is the partition's date
+        monkeypatch.setattr(loader, "encode_lake_file", lambda lake_file, include_payload: (lake_file, 1))
+        loader._load_channel(db_pool, parse_pool, partitions, True, stats)
+
+    assert copied == ["2026-01-17"]
+    assert db_pool.conn.commits == 1
+    (worker_stats,) = stats.values()
+    assert worker_stats["partitions"] == 1 and worker_stats["failed"] == 1
+
+
+# --------------------------------------------------
+# Incremental loads
+# --------------------------------------------------
+
+def _pending_keys(root, manifest, **kwargs):
+    return [key for _, key, *_ in loader.pending_files(root, manifest, **kwargs)]
+
+
+def _manifest_entry(lake_file):
+    stat = lake_file.stat()
+    return (stat.st_size, stat.st_mtime, file_sha256(lake_file))
+
+
+def test_pending_files_skips_loaded_and_touched_files(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "raw_messages", tmp_path)
+    _write_day("2026-01-17", "CheMed123", [1, 2])
+    _write_day("2026-01-17", "lobelia4cosmetics", [1])
+    chemed, lobelia = sorted(tmp_path.rglob("*.ndjson"))
+
+    manifest = {
+        "2026-01-17/CheMed123-00000.ndjson": _manifest_entry(chemed),
+        "2026-01-17/lobelia4cosmetics-00000.ndjson": _manifest_entry(lobelia),
+    }
+    assert _pending_keys(tmp_path, manifest) == []
+
+    # Same bytes, new mtime: hashed, then skipped
+    os.utime(chemed, (0, 0))
+    assert _pending_keys(tmp_path, manifest) == []
+
+    # Changed contents are loaded again
+    with open(lobelia, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_record(2, "lobelia4cosmetics")) + "\n")
+    assert _pending_keys(tmp_path, manifest) == ["2026-01-17/lobelia4cosmetics-00000.ndjson"]
+
+    assert len(_pending_keys(tmp_path, manifest, force=True)) == 2
+
+
+@pytest.fixture
+def scratch_db():
+    """
+    A connection to a throwaway database from TEST_DATABASE_DSN; the raw
+    tables in it are dropped before and after each test.
+    """
+    dsn = os.getenv("TEST_DATABASE_DSN")
+    if not dsn:
+        pytest.skip("TEST_DATABASE_DSN is not set")
+    psycopg2 = pytest.importorskip("psycopg2")
+
+    conn = psycopg2.connect(dsn)
+
+    def drop():
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS raw.telegram_messages, raw.load_manifest")
+        conn.commit()
+
+    drop()
+    loader.create_raw_table(conn)
+    loader.create_incremental_objects(conn)
+    yield conn
+    conn.rollback()
+    drop()
+    conn.close()
+
+
+def _upsert(conn, root, lake_file):
+    key, (size, mtime, content_hash) = loader._manifest_key(lake_file, root), _manifest_entry(lake_file)
+    return loader.upsert_file(conn, lake_file, key, size, mtime, content_hash, chunk_size=2)
+
+
+def test_upsert_file_dedups_within_a_file_and_reloads_changes(scratch_db, tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "raw_messages", tmp_path)
+    with LakeWriter("2026-01-17", "CheMed123") as writer:
+        writer.write(_record(1, views=10, image_path="blobs/ab/abc.jpg"))
+        writer.write(_record(2, views=10))
+        # A look-back refresh of message 1 later in the same file
+        writer.write(_record(1, views=15))
+    (lake_file,) = list_lake_files(tmp_path)
+
+    assert _upsert(scratch_db, tmp_path, lake_file) == 2
+
+    with scratch_db.cursor() as cur:
+        cur.execute("SELECT message_id, views, image_path FROM raw.telegram_messages ORDER BY message_id")
+        # The last occurrence within the file wins
+        assert cur.fetchall() == [(1, 15, None), (2, 10, None)]
+        cur.execute("SELECT MAX(loaded_at) FROM raw.telegram_messages")
+        (first_load,) = cur.fetchone()
+
+    # The file grows: only the new state is applied, and the manifest follows it
+    with open(lake_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_record(2, views=40, image_path="blobs/cd/cde.jpg")) + "\n")
+    _upsert(scratch_db, tmp_path, lake_file)
+
+    manifest = loader.load_manifest(scratch_db)
+    with scratch_db.cursor() as cur:
+        cur.execute("SELECT message_id, views, image_path FROM raw.telegram_messages ORDER BY message_id")
+        assert cur.fetchall() == [(1, 15, None), (2, 40, "blobs/cd/cde.jpg")]
+        # Reloaded rows are stamped again, so the activity rollup rebuilds their days
+        cur.execute("SELECT message_id FROM raw.telegram_messages WHERE loaded_at > %s ORDER BY message_id", (first_load,))
+        assert cur.fetchall() == [(1,), (2,)]
+        cur.execute("SELECT row_count FROM raw.load_manifest")
+        assert cur.fetchone() == (4,)
+    assert manifest == {"2026-01-17/CheMed123-00000.ndjson": _manifest_entry(lake_file)}
@@ -0,0 +1,84 @@
+import json
+import logging
+
+from src.scraping.logger import JsonFormatter, ScrapeMetrics, ThrottledLogger
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _capture(name):
+    logger = logging.getLogger(name)
+    logger.handlers = []
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ListHandler()
+    logger.addHandler(handler)
+    return logger, handler
+
+
+def test_throttled_logger_counts_suppressed_lines():
+    logger, handler = _capture("test.throttled")
+    now = [0.0]
+    throttled = ThrottledLogger(logger, interval=5, clock=lambda: now[0])
+
+    for _ in range(10):
+        throttled.error("message:CheMed123", "Failed message", channel="CheMed123")
+    now[0] = 6.0
+    throttled.error("message:CheMed123", "Failed message", channel="CheMed123")
+
+    assert len(handler.records) == 2
+    line = json.loads(JsonFormatter().format(handler.records[1]))
+    assert line["message"] == "Failed message"
+    assert line["channel"] == "CheMed123"
+    assert line["suppressed"] == 9
+
+
+def test_scrape_metrics_aggregate_per_channel():
+    logger, handler = _capture("test.metrics")
+    now = [0.0]
+    metrics = ScrapeMetrics(logger, interval=30, clock=lambda: now[0])
+
+    for _ in range(100):
+        metrics.incr("CheMed123", messages=1)
+    metrics.incr("Vimax123", messages=1, images=1, bytes=2048)
+    assert not handler.records
+
+    now[0] = 31.0
+    metrics.incr("Vimax123", errors=1)
+
+    assert len(handler.records) == 1
+    line = json.loads(JsonFormatter().format(handler.records[0]))
+    assert line["totals"] == {"messages": 101, "images": 1, "bytes": 2048, "errors": 1}
+    assert line["channels"]["CheMed123"]["messages"] == 100
+
+
+def test_throttled_logger_flushes_pending_counts():
+    logger, handler = _capture("test.throttled.flush")
+    throttled = ThrottledLogger(logger, interval=5, clock=lambda: 0.0)
+
+    for _ in range(4):
+        throttled.error("download:CheMed123", "Failed image download")
+    throttled.flush()
+    throttled.flush()
+
+    assert len(handler.records) == 2
+    line = json.loads(JsonFormatter().format(handler.records[1]))
+    assert line["key"] == "download:CheMed123"
+    assert line["suppressed"] == 3
+
+
+def test_get_logger_has_no_side_effects():
+    import src.scraping.logger as log_module
+
+    log_module.shutdown_logging()
+    logger = log_module.get_logger("test.side_effects")
+
+    assert not logger.handlers
+    assert not log_module.logging_configured()
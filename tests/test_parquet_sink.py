@@ -0,0 +1,75 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.dataset as ds
+
+from src.config import DATA_PATHS
+from src.scraping.parquet_sink import ParquetSink, compact_lake, message_dataset
+
+
+def _record(message_id, views):
+    return {
+        "message_id": message_id,
+        "channel_code": "CHEMED",
+        "channel_name": "CheMed123",
+        "message_date": "2026-01-17T08:30:00+00:00",
+        "message_text": "Paracetamol 500mg",
+        "views": views,
+        "forwards": 0,
+        "has_media": False,
+        "image_path": None,
+    }
+
+
+def test_sink_partitions_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "lake_parquet", tmp_path)
+
+    with ParquetSink("2026-01-17", "CheMed123", part_rows=2) as sink:
+        for message_id in range(1, 6):
+            sink.write(_record(message_id, views=10))
+
+    # A look-back refresh of message 5 lands in a later part
+    with ParquetSink("2026-01-17", "CheMed123") as sink:
+        sink.write(_record(5, views=99))
+
+    partition = tmp_path / "date=2026-01-17" / "channel=CheMed123"
+    assert len(list(partition.glob("part-*.parquet"))) == 4
+
+    assert compact_lake("2026-01-17") == 4
+    assert [p.name for p in partition.glob("*.parquet")] == ["part-00000.parquet"]
+
+    table = message_dataset().to_table(
+        columns=["message_id", "views"],
+        filter=(ds.field("channel") == "CheMed123") & (ds.field("message_id") >= 4),
+    )
+    assert table.to_pydict() == {"message_id": [4, 5], "views": [10, 99]}
+
+
+def test_compaction_recovers_from_crash_before_inputs_are_removed(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "lake_parquet", tmp_path)
+    partition = tmp_path / "date=2026-01-17" / "channel=CheMed123"
+
+    with ParquetSink("2026-01-17", "CheMed123", part_rows=2) as sink:
+        for message_id in range(1, 4):
+            sink.write(_record(message_id, views=10))
+    with ParquetSink("2026-01-17", "CheMed123") as sink:
+        sink.write(_record(1, views=50))
+
+    # Crash right after the merged file is committed, before any input is removed
+    def crash(self, *args, **kwargs):
+        raise OSError("crash")
+
+    with monkeypatch.context() as m:
+        m.setattr(type(partition), "unlink", crash)
+        with pytest.raises(OSError):
+            compact_lake("2026-01-17")
+    assert len(list(partition.glob("part-*.parquet"))) == 4
+
+    # A refresh lands after the crash; the rerun must keep it and drop nothing
+    with ParquetSink("2026-01-17", "CheMed123") as sink:
+        sink.write(_record(2, views=70))
+    compact_lake("2026-01-17")
+
+    assert [p.name for p in partition.glob("*.parquet")] == ["part-00000.parquet"]
+    table = message_dataset().to_table(columns=["message_id", "views"])
+    assert table.to_pydict() == {"message_id": [1, 2, 3], "views": [50, 70, 10]}
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from src.yolo.phash import BKTree, PerceptualIndex, hamming
+
+
+def test_bk_tree_nearest_matches_linear_scan():
+    rng = random.Random(7)
+    keys = [rng.getrandbits(64) for _ in range(500)]
+    tree = BKTree()
+    for key in keys:
+        tree.add(key, key)
+
+    for _ in range(50):
+        probe = rng.choice(keys) ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64))
+        expected = min(hamming(probe, k) for k in keys)
+        match = tree.nearest(probe, radius=4)
+        if expected <= 4:
+            assert match is not None and match[0] == expected
+        else:
+            assert match is None
+
+
+def test_index_reuses_within_distance_only():
+    index = PerceptualIndex(distance=3)
+    index.add(0b1111, "a" * 64, [("bottle", 0.9)])
+
+    assert index.find(0b1110) == ("a" * 64, [("bottle", 0.9)])
+    assert index.find(0b1111 ^ (0b1111 << 20)) is None
+    assert len(index) == 1
+
+
+def test_dhash_survives_resize():
+    np = pytest.importorskip("numpy")
+    cv2 = pytest.importorskip("cv2")
+    from src.yolo.phash import dhash
+
+    rng = np.random.default_rng(0)
+    image = cv2.resize(rng.integers(0, 255, (16, 16, 3), dtype=np.uint8), (320, 240))
+    resized = cv2.resize(image, (160, 120), interpolation=cv2.INTER_AREA)
+
+    assert hamming(dhash(image), dhash(resized)) <= 4
@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import FloodWaitError
+
+from src.scraping.rate_limit import RateLimiter
+
+
+class FlakyClient:
+    """
+    Serves message ids newest-first and fails once at a chosen position
+    """
+
+    def __init__(self, ids, fail_after, error):
+        self.ids = ids
+        self.fail_after = fail_after
+        self.error = error
+        self.calls = []
+
+    async def iter_messages(self, entity, limit=None, offset_id=0, **kwargs):
+        self.calls.append(offset_id)
+        ids = [i for i in self.ids if not offset_id or i < offset_id][:limit]
+        for position, message_id in enumerate(ids):
+            if self.error and position == self.fail_after:
+                error, self.error = self.error, None
+                raise error
+            yield SimpleNamespace(id=message_id)
+
+
+def _limiter(sleeps, **kwargs):
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    return RateLimiter(
+        rate=10, burst=100, max_retries=2, base_delay=1, max_delay=4,
+        max_flood_wait=60, clock=lambda: 0.0, sleep=fake_sleep, **kwargs
+    )
+
+
+async def _collect(limiter, client, limit=None):
+    return [m.id async for m in limiter.iter_messages(client, "CheMed123", limit=limit)]
+
+
+def test_flood_wait_is_honoured_and_iteration_resumes():
+    sleeps = []
+    limiter = _limiter(sleeps)
+    client = FlakyClient(list(range(10, 0, -1)), 4, FloodWaitError(request=None, capture=7))
+
+    ids = asyncio.run(_collect(limiter, client))
+
+    assert ids == list(range(10, 0, -1))
+    assert client.calls == [0, 7]  # resumed after the last message yielded
+    assert 8 in sleeps  # FloodWait seconds + 1
+    assert limiter.flood_waits == 1
+    assert limiter.rate < limiter.max_rate
+
+
+def test_transient_errors_back_off_then_give_up():
+    sleeps = []
+    limiter = _limiter(sleeps)
+    attempts = []
+
+    async def always_down():
+        attempts.append(1)
+        raise ConnectionError("network down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(limiter.call(always_down))
+
+    assert len(attempts) == 3  # first try + max_retries
+    assert all(0 <= s <= 4 for s in sleeps)
+
+
+def test_disk_errors_are_not_retried():
+    sleeps = []
+    limiter = _limiter(sleeps)
+    attempts = []
+
+    async def disk_full():
+        attempts.append(1)
+        raise OSError(28, "No space left on device")
+
+    with pytest.raises(OSError):
+        asyncio.run(limiter.call(disk_full))
+
+    assert len(attempts) == 1
+    assert sleeps == []
+
+
+def test_limit_is_respected_across_resumes():
+    limiter = _limiter([])
+    client = FlakyClient(list(range(10, 0, -1)), 2, ConnectionError("reset"))
+
+    assert asyncio.run(_collect(limiter, client, limit=5)) == [10, 9, 8, 7, 6]
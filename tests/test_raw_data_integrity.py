@@ -1,7 +1,8 @@
-import json
 from pathlib import Path
 from datetime import datetime
 
+from src.scraping.storage import list_lake_files, iter_records
+
 RAW_DATA_PATH = Path("data/raw/telegram_messages")
 
 REQUIRED_FIELDS = {
@@ -18,18 +19,15 @@ REQUIRED_FIELDS = {
 def test_raw_telegram_json_integrity():
     assert RAW_DATA_PATH.exists(), "Raw data directory does not exist"
 
-    json_files = list(RAW_DATA_PATH.rglob("*.json"))
+    json_files = list_lake_files(RAW_DATA_PATH)
     assert json_files, "No raw Telegram JSON files found"
 
     for file in json_files:
-        with open(file, "r", encoding="utf-8") as f:
-            records = json.load(f)
-
-        assert isinstance(records, list), f"{file} does not contain a list"
-
         message_ids = set()
 
-        for record in records:
+        for record in iter_records(file):
+            assert isinstance(record, dict), f"{file} does not contain a list of records"
+
             # Required fields check
             missing = REQUIRED_FIELDS - record.keys()
             assert not missing, f"{file} missing fields: {missing}"
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import pytest
+
+from src.config import DATA_PATHS, LOGGING_CONFIG, SCRAPING_CONFIG
+from src.scraping.checkpoints import get_checkpoint
+from src.scraping.logger import shutdown_logging
+from src.scraping.replay import FakeTelegramClient, synthetic_channel
+from src.scraping.scraper import run_scraper
+from src.scraping.storage import list_lake_files, iter_records
+
+CHANNELS = {"CHEMED": "CheMed123", "LOBELIA": "lobelia4cosmetics"}
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setitem(DATA_PATHS, "raw_messages", tmp_path / "telegram_messages")
+    monkeypatch.setitem(DATA_PATHS, "raw_images", tmp_path / "images")
+    monkeypatch.setitem(DATA_PATHS, "checkpoints", tmp_path / "checkpoints.json")
+    monkeypatch.setitem(DATA_PATHS, "image_store", tmp_path / "image_store")
+    monkeypatch.setitem(DATA_PATHS, "image_blobs", tmp_path / "image_store" / "blobs")
+    monkeypatch.setitem(DATA_PATHS, "image_index", tmp_path / "image_store" / "index.sqlite")
+    monkeypatch.setitem(SCRAPING_CONFIG, "requests_per_second", 1000.0)
+    monkeypatch.setitem(SCRAPING_CONFIG, "burst", 1000)
+    monkeypatch.setitem(SCRAPING_CONFIG, "incremental", True)
+    monkeypatch.setitem(SCRAPING_CONFIG, "lookback_days", 0)
+    return tmp_path
+
+
+def _lake_records(root):
+    return [r for f in list_lake_files(root / "telegram_messages") for r in iter_records(f)]
+
+
+def test_run_scraper_offline_end_to_end(data_root):
+    client = FakeTelegramClient(
+        {
+            "CheMed123": synthetic_channel(250, photo_ratio=0.5, image_size=256, duplicate_ratio=0.5, seed=1),
+            "lobelia4cosmetics": synthetic_channel(120, photo_ratio=0.9, image_size=256, seed=2),
+        },
+        latency=0.001,
+        download_latency=0.001,
+    )
+
+    result = asyncio.run(run_scraper(channels=CHANNELS, concurrent=True, client=client))
+
+    assert result["status"] == "SUCCESS"
+    assert result["channels"] == {"CheMed123": "SUCCESS", "lobelia4cosmetics": "SUCCESS"}
+    assert not client.connected
+
+    records = _lake_records(data_root)
+    assert len(records) == 370
+    photos = [r for r in records if r["has_media"]]
+    assert photos and all(r["image_path"] for r in photos)
+
+    # Reposted photos collapse onto fewer blobs than photo messages
+    blobs = list((data_root / "image_store" / "blobs").rglob("*.jpg"))
+    assert len(blobs) < len(photos)
+
+    assert get_checkpoint("CheMed123")["message_id"] == 250
+
+
+def test_second_run_only_fetches_new_messages(data_root):
+    messages = synthetic_channel(60, photo_ratio=0.5, image_size=128, seed=3)
+    channels = {"CHEMED": "CheMed123"}
+
+    first = FakeTelegramClient({"CheMed123": messages[:50]})
+    asyncio.run(run_scraper(channels=channels, client=first))
+
+    second = FakeTelegramClient({"CheMed123": messages})
+    asyncio.run(run_scraper(channels=channels, client=second))
+
+    new_photos = sum(1 for m in messages[50:] if m.media is not None)
+    assert second.downloads == new_photos
+    assert sorted(r["message_id"] for r in _lake_records(data_root)) == list(range(1, 61))
+
+
+class FailingDownloads(FakeTelegramClient):
+    """
+    Fails the download of the given message ids
+    """
+
+    def __init__(self, channels, fail_ids, **kwargs):
+        super().__init__(channels, **kwargs)
+        self.fail_payloads = {
+            id(m.media.payload) for msgs in channels.values() for m in msgs if m.id in fail_ids
+        }
+
+    async def download_media(self, media, file=None):
+        if id(media.payload) in self.fail_payloads:
+            raise ValueError("corrupt media")
+        return await super().download_media(media, file=file)
+
+
+def test_partial_failure_keeps_failed_messages_above_checkpoint(data_root):
+    messages = synthetic_channel(60, photo_ratio=1.0, image_size=128, seed=4)
+    channels = {"CHEMED": "CheMed123"}
+
+    first = FailingDownloads({"CheMed123": messages}, fail_ids={25, 40})
+    result = asyncio.run(run_scraper(channels=channels, client=first))
+
+    assert result["channels"] == {"CheMed123": "PARTIAL_FAILURE"}
+    assert get_checkpoint("CheMed123")["message_id"] == 24
+
+    # The next run refetches everything from the oldest failure up and fills in the photos
+    second = FakeTelegramClient({"CheMed123": messages})
+    asyncio.run(run_scraper(channels=channels, client=second))
+
+    assert get_checkpoint("CheMed123")["message_id"] == 60
+    latest = {r["message_id"]: r for r in _lake_records(data_root)}
+    assert latest[25]["image_path"] and latest[40]["image_path"]
+
+
+def test_scraper_run_writes_json_log_lines(data_root, monkeypatch):
+    shutdown_logging()
+    monkeypatch.setitem(LOGGING_CONFIG, "log_dir", data_root / "logs")
+    client = FakeTelegramClient({"CheMed123": synthetic_channel(20, photo_ratio=0.5, image_size=64, seed=5)})
+
+    asyncio.run(run_scraper(channels={"CHEMED": "CheMed123"}, client=client))
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in (data_root / "logs" / LOGGING_CONFIG["log_file"]).open(encoding="utf-8")]
+    messages = [line["message"] for line in lines]
+    assert "All channels scraped successfully" in messages
+    metrics = next(line for line in lines if line["message"] == "scrape metrics")
+    assert metrics["totals"]["messages"] == 20
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from src.terms.extract import extract_terms
+from src.terms.lexicon import load_lexicon, normalize_text
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    path = tmp_path / "lexicon.csv"
+    path.write_text(
+        "variant,term\n"
+        "Paracetamol,paracetamol\n"
+        "panadol,paracetamol\n"
+        "ፓራሲታሞል,paracetamol\n"
+        "vitamin,multivitamin\n"
+        "Vitamin C,vitamin c\n"
+        "blood pressure monitor,blood pressure monitor\n",
+        encoding="utf-8",
+    )
+    return load_lexicon(path)
+
+
+def test_normalize_text_keeps_amharic_words():
+    texts = pd.Series(["Vitamin-C, 500mg!", "ፓራሲታሞል፡ በቅናሽ።", None])
+    assert normalize_text(texts).tolist() == ["vitamin c 500mg", "ፓራሲታሞል በቅናሽ", ""]
+
+
+def test_lexicon_normalizes_variants(lexicon):
+    assert lexicon.variants["vitamin c"] == "vitamin c"
+    assert lexicon.max_ngram == 3
+    assert len(lexicon.version) == 12
+
+
+def test_extract_terms_prefers_longest_match(lexicon):
+    messages = pd.DataFrame({
+        "channel_name": ["a", "a", "b"],
+        "message_id": [1, 2, 1],
+        "message_text": [
+            "PANADOL and paracetamol, plus Vitamin-C",
+            "ፓራሲታሞል፡ በቅናሽ። blood pressure monitor; vitamin",
+            None,
+        ],
+    })
+
+    terms = extract_terms(messages, lexicon)
+    rows = set(terms.itertuples(index=False, name=None))
+
+    assert rows == {
+        ("a", 1, "paracetamol", 2),
+        ("a", 1, "vitamin c", 1),
+        ("a", 2, "paracetamol", 1),
+        ("a", 2, "blood pressure monitor", 1),
+        ("a", 2, "multivitamin", 1),
+    }
+
+
+def test_conflicting_variants_are_rejected(tmp_path):
+    path = tmp_path / "lexicon.csv"
+    path.write_text("variant,term\nglasses,eyeglasses\nGlasses,drinking glasses\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_lexicon(path)
@@ -0,0 +1,57 @@
+import pytest
+
+from src.yolo.backends import _export_path, ensure_exported
+
+
+def test_export_paths(tmp_path):
+    weights = tmp_path / "yolov8n.pt"
+    assert _export_path("onnx", weights, False) == tmp_path / "yolov8n.onnx"
+    assert _export_path("openvino", weights, False) == tmp_path / "yolov8n_openvino_model"
+    assert _export_path("openvino", weights, True) == tmp_path / "yolov8n_int8_openvino_model"
+
+    assert ensure_exported("torch", weights) == str(weights)
+    with pytest.raises(ValueError):
+        ensure_exported("tensorrt", weights)
+
+
+def _detections(backend, images):
+    from src.yolo.backends import load_model
+    from src.yolo.batching import load_letterboxed
+    from src.config import YOLO_CONFIG
+
+    model = load_model(backend)
+    results = model([load_letterboxed(p) for p in images], imgsz=YOLO_CONFIG["imgsz"], verbose=False)
+    return [
+        sorted((model.names[int(box.cls)], float(box.conf)) for box in result.boxes)
+        for result in results
+    ]
+
+
+def _all_matched(detections, others, tolerance):
+    """
+    Every confident detection has a same-label counterpart within `tolerance`
+    """
+    return all(
+        any(label == other_label and abs(conf - other_conf) <= tolerance for other_label, other_conf in others)
+        for label, conf in detections
+        if conf >= 0.5
+    )
+
+
+def test_onnx_matches_torch_detections(tmp_path, monkeypatch):
+    pytest.importorskip("ultralytics")
+    pytest.importorskip("onnxruntime")
+    from ultralytics.utils import ASSETS
+    from src.config import YOLO_CONFIG
+
+    # The weights are downloaded and exported next to YOLO_MODEL; keep both out of the repo
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(YOLO_CONFIG, "model", str(tmp_path / "yolov8n.pt"))
+
+    images = sorted(ASSETS.glob("*.jpg"))
+    torch_results = _detections("torch", images)
+    onnx_results = _detections("onnx", images)
+
+    for expected, actual in zip(torch_results, onnx_results):
+        assert _all_matched(expected, actual, tolerance=0.02)
+        assert _all_matched(actual, expected, tolerance=0.02)
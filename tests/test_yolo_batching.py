@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.yolo.batching import bounded_map, iter_batches
+
+
+def test_batches_keep_order_and_skip_unreadable():
+    items = [(f"img{i}.jpg", [("CHEMED", str(i))]) for i in range(7)]
+
+    def load(path):
+        return None if path == "img3.jpg" else path.upper()
+
+    batches = list(iter_batches(items, load, batch_size=3, workers=2))
+
+    assert [len(batch) for batch, _ in batches] == [3, 2, 1]
+    assert [item[0] for batch, _ in batches for item in batch] == [
+        "img0.jpg", "img1.jpg", "img2.jpg", "img4.jpg", "img5.jpg", "img6.jpg",
+    ]
+    assert batches[1][1] == ["IMG4.JPG", "IMG5.JPG"]
+
+
+def test_loading_is_bounded_by_prefetch():
+    loaded = []
+    lock = threading.Lock()
+
+    def load(path):
+        with lock:
+            loaded.append(path)
+        return path
+
+    items = ((f"img{i}.jpg",) for i in range(100))
+    batches = iter_batches(items, load, batch_size=4, workers=2, prefetch=2)
+    next(batches)
+
+    # The first batch plus at most `prefetch` more have been submitted
+    assert len(loaded) <= 4 * 3
+
+
+def test_bounded_map_consumes_input_lazily_and_keeps_order():
+    consumed = []
+
+    def items():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = bounded_map(pool, lambda x: x * x, items(), window=3)
+        assert next(results) == 0
+        # only the window has been submitted, not the whole input
+        assert len(consumed) == 3
+        assert list(results) == [x * x for x in range(1, 10)]